@@ -1,14 +1,25 @@
 # backend/app/api/v1/endpoints/ai_assistant.py
+import asyncio
+import binascii
+from contextlib import contextmanager
 from functools import lru_cache
 
+from app.core.config import settings
 from app.services.ai_orchestrator import AIOrchestratorService
+from app.services.blob_store import BlobNotFoundError, get_blob_store
 from app.services.langchain_orchestrator import LangChainOrchestrator
 from app.services.multimodal_pipeline import MultimodalPipeline
 from app.services.stt_service import STTService
+from app.services.task_events import (
+    TaskEventBroker,
+    get_task_event_broker,
+    stream_task_events,
+)
+from app.services.task_scheduler import INTERACTIVE, PRIORITIES, AdmissionError
 from app.services.tts_service import TTSService
 from app.services.vision_service import VisionService
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -53,6 +64,23 @@ def get_multimodal_pipeline() -> MultimodalPipeline:
     )
 
 
+@contextmanager
+def admission_control():
+    """Turns a job rejected by the task scheduler into a 429 response."""
+    try:
+        yield
+    except AdmissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={
+                "Retry-After": str(int(settings.SCHEDULER_DISPATCH_INTERVAL_SECONDS))
+            },
+        )
+
+
+TASK_PRIORITY_PATTERN = f"^({'|'.join(PRIORITIES)})$"
+
 # --- Pydantic Models ---
 
 
@@ -85,6 +113,14 @@ class TaskStatusResponse(BaseModel):
     result: str | None = None
 
 
+class TaskStatusBatchRequest(BaseModel):
+    task_ids: list[str]
+
+
+class TaskStatusBatchResponse(BaseModel):
+    tasks: list[dict]
+
+
 # --- Synchronous Endpoints (Existing) ---
 
 
@@ -94,7 +130,7 @@ async def process_text_input(
     langchain_orchestrator: LangChainOrchestrator = Depends(get_langchain_orchestrator),
     tts_service: TTSService = Depends(get_tts_service),
 ):
-    response = await langchain_orchestrator.run_text_pipeline(input.text)
+    response = await langchain_orchestrator.run_text_pipeline(input.text, use_rag=True)
     audio_base64 = None
     if response.response_text:
         audio_base64 = await tts_service.generate_audio(response.response_text)
@@ -115,7 +151,7 @@ async def process_audio_input(
     text = await stt_service.transcribe_audio(input.audio_base64)
     if not text:
         raise HTTPException(status_code=400, detail="Could not convert audio to text")
-    response = await langchain_orchestrator.run_text_pipeline(text)
+    response = await langchain_orchestrator.run_text_pipeline(text, use_rag=True)
     audio_base64 = None
     if response.response_text:
         audio_base64 = await tts_service.generate_audio(response.response_text)
@@ -134,11 +170,25 @@ async def process_audio_input(
 def submit_image_processing_task(
     input: ImageInput,
     ai_orchestrator: AIOrchestratorService = Depends(get_ai_orchestrator),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    user_id: str | None = Header(None, alias="X-User-Id"),
+    priority: str = Query(INTERACTIVE, pattern=TASK_PRIORITY_PATTERN),
 ):
     """
     Accepts an image and submits it to the background multimodal pipeline task.
+    Resubmitting the same image (or Idempotency-Key) returns the same task id.
+    Bulk clients should submit with `priority=batch`.
     """
-    task_id = ai_orchestrator.submit_multimodal_pipeline(input.image_base64)
+    try:
+        with admission_control():
+            task_id = ai_orchestrator.submit_multimodal_pipeline(
+                input.image_base64,
+                user_id=user_id,
+                idempotency_key=idempotency_key,
+                priority=priority,
+            )
+    except binascii.Error:
+        raise HTTPException(status_code=400, detail="image_base64 is not valid base64.")
     return JSONResponse(
         content={"task_id": task_id, "status": "PENDING"},
         status_code=status.HTTP_202_ACCEPTED,
@@ -156,17 +206,81 @@ def submit_image_processing_task(
 async def submit_text_generation_task(
     input: TextInput,
     ai_orchestrator: AIOrchestratorService = Depends(get_ai_orchestrator),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    user_id: str | None = Header(None, alias="X-User-Id"),
+    priority: str = Query(INTERACTIVE, pattern=TASK_PRIORITY_PATTERN),
 ):
-    task_id = ai_orchestrator.submit_long_llm_generation(input.text)
+    with admission_control():
+        task_id = ai_orchestrator.submit_long_llm_generation(
+            input.text,
+            user_id=user_id,
+            idempotency_key=idempotency_key,
+            priority=priority,
+        )
     return JSONResponse(
         content={"task_id": task_id, "status": "PENDING"},
         status_code=status.HTTP_202_ACCEPTED,
     )
 
 
+@router.post("/background/tasks/status", response_model=TaskStatusBatchResponse)
+def get_task_statuses(
+    request: TaskStatusBatchRequest,
+    ai_orchestrator: AIOrchestratorService = Depends(get_ai_orchestrator),
+):
+    """
+    Returns the status and result of many tasks in one request. A plain
+    function: the Redis and result backend lookups block, so FastAPI runs
+    it in its thread pool.
+    """
+    if len(request.task_ids) > settings.TASK_STATUS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.TASK_STATUS_BATCH_MAX_IDS} task ids per request.",
+        )
+    return {"tasks": ai_orchestrator.get_task_statuses(request.task_ids)}
+
+
 @router.get("/background/tasks/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(
     task_id: str, ai_orchestrator: AIOrchestratorService = Depends(get_ai_orchestrator)
 ):
     task_info = ai_orchestrator.get_task_status_and_result(task_id)
     return task_info
+
+
+@router.get("/background/tasks/{task_id}/events")
+async def stream_task_status(
+    task_id: str,
+    ai_orchestrator: AIOrchestratorService = Depends(get_ai_orchestrator),
+    broker: TaskEventBroker = Depends(get_task_event_broker),
+):
+    """
+    Streams the task's progress and its result as Server-Sent Events, so
+    clients are notified as soon as the result exists instead of polling.
+    Audio is sent as a blob reference (`audio_ref`), see `get_blob`.
+    The blocking status lookup runs in a worker thread (`stream_task_events`
+    calls it through `asyncio.to_thread`).
+    """
+    return StreamingResponse(
+        stream_task_events(
+            task_id,
+            broker,
+            lambda task_id: ai_orchestrator.get_task_statuses([task_id])[0],
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/background/blobs/{ref}")
+async def get_blob(ref: str):
+    """
+    Returns a payload referenced by a task result or event, e.g. the
+    `audio_ref` of a multimodal pipeline result.
+    """
+    try:
+        data = await asyncio.to_thread(get_blob_store().get, ref)
+    except BlobNotFoundError:
+        raise HTTPException(status_code=404, detail="Blob not found or expired.")
+    return Response(content=data, media_type="application/octet-stream")
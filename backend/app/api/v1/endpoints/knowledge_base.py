@@ -1,6 +1,13 @@
 # backend/app/api/v1/endpoints/knowledge_base.py
+import json
+
 from app.services.database_service import DatabaseService
-from app.services.vector_db_service import PineconeService
+from app.services.embedding_migration import EmbeddingMigration, get_embedding_migration
+from app.services.knowledge_base_indexer import (
+    IncrementalIndexer,
+    get_incremental_indexer,
+)
+from app.services.retrieval_service import RetrievalService, get_retrieval_service
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
@@ -12,14 +19,12 @@ def get_db_service() -> DatabaseService:
     return DatabaseService()
 
 
-def get_vector_db_service() -> PineconeService:
-    return PineconeService()
-
-
 # --- Pydantic Models ---
 class KnowledgeBaseQuery(BaseModel):
     query: str
     top_k: int = 5
+    # Metadata conditions, ANDed: {"field": value} or {"field": {"$in": [...]}}
+    filter: dict | None = None
 
 
 class KnowledgeBaseResponse(BaseModel):
@@ -32,30 +37,31 @@ class KnowledgeBaseInput(BaseModel):
     metadata: dict = {}
 
 
+class KnowledgeBaseBulkInput(BaseModel):
+    items: list[KnowledgeBaseInput]
+
+
+class EmbeddingMigrationInput(BaseModel):
+    model_name: str
+
+
 # --- Endpoints ---
 @router.post("/query_knowledge_base", response_model=KnowledgeBaseResponse)
 async def query_knowledge_base(
     query: KnowledgeBaseQuery,
-    vector_db: PineconeService = Depends(get_vector_db_service),
+    retrieval: RetrievalService = Depends(get_retrieval_service),
 ):
     """
-    Queries the vector database for documents relevant to the query.
+    Finds the documents most relevant to the query using hybrid retrieval
+    (BM25 keyword search fused with vector search).
     """
     try:
-        # In a real implementation, you would first convert query.query to a vector
-        # For now, we assume query_vectors can handle a text query (it can't, placeholder)
-        # query_vector = await embedding_service.embed(query.query)
-        # results = await vector_db.query_vectors(query_vector, top_k=query.top_k)
-
-        # Placeholder response
-        results = [
-            {
-                "id": "doc1",
-                "score": 0.98,
-                "metadata": {"text": "This is a placeholder response."},
-            }
-        ]
+        results = await retrieval.search(
+            query.query, top_k=query.top_k, filter=query.filter
+        )
         return KnowledgeBaseResponse(results=results)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error querying knowledge base: {e}"
@@ -66,30 +72,157 @@ async def query_knowledge_base(
 async def add_to_knowledge_base(
     item: KnowledgeBaseInput,
     db: DatabaseService = Depends(get_db_service),
-    vector_db: PineconeService = Depends(get_vector_db_service),
+    retrieval: RetrievalService = Depends(get_retrieval_service),
+    indexer: IncrementalIndexer = Depends(get_incremental_indexer),
 ):
     """
-    Adds a new item to the knowledge base (both SQL and vector DB).
-    This is a simplified endpoint. A real implementation would be a background task.
+    Adds an item to the knowledge base (SQL plus the retrieval indexes), or
+    updates it if the id exists. This is a simplified endpoint. A real
+    implementation would be a background task.
     """
     try:
-        # 1. Insert metadata into PostgreSQL
-        # The 'data' dict should match the table schema
-        insert_result = await db.insert_data(
-            "knowledge_base", {"id": item.id, "content": item.text}
+        # 1. Upsert the item and its metadata into PostgreSQL, so re-sending
+        # an item updates it (and restores it if it was deleted).
+        await indexer.ensure_schema()
+        await db.bulk_insert(
+            "knowledge_base",
+            [
+                {
+                    "id": item.id,
+                    "content": item.text,
+                    "metadata": json.dumps(item.metadata),
+                    "deleted_at": None,
+                }
+            ],
+            conflict_columns=["id"],
         )
-        if not insert_result:
-            raise HTTPException(
-                status_code=500, detail="Failed to save metadata to database."
-            )
 
-        # 2. Create embedding and upsert to Vector DB (Pinecone)
+        # 2. Chunk and index for retrieval (embedding + vector DB, and BM25).
+        # Unchanged chunks of a re-sent item are not embedded again.
         # This part should ideally be a background task.
-        # query_vector = await embedding_service.embed(item.text)
-        # await vector_db.upsert_vector(id=item.id, vector=query_vector, metadata=item.metadata)
+        stats = await retrieval.index_document(item.id, item.text, item.metadata)
 
-        return {"message": f"Item {item.id} added to knowledge base."}
+        return {"message": f"Item {item.id} added to knowledge base.", **stats}
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error adding to knowledge base: {e}"
         )
+
+
+@router.post("/add_to_knowledge_base/bulk")
+async def add_to_knowledge_base_bulk(
+    payload: KnowledgeBaseBulkInput,
+    db: DatabaseService = Depends(get_db_service),
+    retrieval: RetrievalService = Depends(get_retrieval_service),
+    indexer: IncrementalIndexer = Depends(get_incremental_indexer),
+):
+    """
+    Adds many items to the knowledge base in one call. Rows are written with
+    COPY in batches and upserted on `id`, so re-sending an item updates it.
+    If the payload repeats an id, its last item wins.
+    """
+    items = list({item.id: item for item in payload.items}.values())
+    try:
+        await indexer.ensure_schema()
+        result = await db.bulk_insert(
+            "knowledge_base",
+            (
+                {
+                    "id": item.id,
+                    "content": item.text,
+                    "metadata": json.dumps(item.metadata),
+                    # Re-adding an item restores it if it was deleted
+                    "deleted_at": None,
+                }
+                for item in items
+            ),
+            conflict_columns=["id"],
+        )
+        indexed = await retrieval.index_documents(
+            [(item.id, item.text, item.metadata) for item in items]
+        )
+        return {
+            "message": f"{result['rows']} items added to knowledge base.",
+            **result,
+            "indexed": indexed,
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error adding to knowledge base: {e}"
+        )
+
+
+@router.delete("/knowledge_base/{item_id}")
+async def delete_from_knowledge_base(
+    item_id: str,
+    db: DatabaseService = Depends(get_db_service),
+    retrieval: RetrievalService = Depends(get_retrieval_service),
+    indexer: IncrementalIndexer = Depends(get_incremental_indexer),
+):
+    """
+    Tombstones an item: the row is soft-deleted (so incremental re-indexing
+    in other processes sees the deletion) and removed from the indexes.
+    """
+    try:
+        await indexer.ensure_schema()
+        row = await db.execute(
+            "UPDATE knowledge_base SET deleted_at = now() "
+            "WHERE id = $1 AND deleted_at IS NULL RETURNING id",
+            [item_id],
+            fetch="one",
+        )
+        await retrieval.remove_document(item_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Item {item_id} not found.")
+        return {"message": f"Item {item_id} removed from knowledge base."}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error removing from knowledge base: {e}"
+        )
+
+
+@router.post("/knowledge_base/reindex")
+async def reindex_knowledge_base(
+    indexer: IncrementalIndexer = Depends(get_incremental_indexer),
+):
+    """
+    Applies knowledge base rows changed since the last run to this process's
+    retrieval indexes (the same job the process runs periodically).
+    """
+    try:
+        return await indexer.run_once()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error re-indexing knowledge base: {e}"
+        )
+
+
+@router.post("/knowledge_base/embedding_migration", status_code=202)
+async def start_embedding_migration(
+    migration_input: EmbeddingMigrationInput,
+    migration: EmbeddingMigration = Depends(get_embedding_migration),
+):
+    """
+    Starts re-embedding the knowledge base with another model. Queries keep
+    using the current model until the backfill completes.
+    """
+    try:
+        return await migration.start(migration_input.model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/knowledge_base/embedding_migration")
+async def get_embedding_migration_progress(
+    migration: EmbeddingMigration = Depends(get_embedding_migration),
+):
+    return await migration.status()
+
+
+@router.delete("/knowledge_base/embedding_migration")
+async def abort_embedding_migration(
+    migration: EmbeddingMigration = Depends(get_embedding_migration),
+):
+    return await migration.abort()
@@ -0,0 +1,170 @@
+# backend/app/core/async_tasks.py
+# =================================================================
+#
+#                 Async Task Execution for Celery Workers
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Celery calls task functions synchronously and does not await
+#  coroutines. This module runs `async def` tasks on one persistent
+#  event loop per worker process, so async clients (OpenAI, httpx)
+#  and the services that hold them are created once and reused,
+#  instead of being rebuilt (with a fresh loop) for every task.
+#
+#  Key Features:
+#  -------------
+#  - `async_task`: declares a Celery task from a coroutine function.
+#    The task body runs on the worker process's event loop and the
+#    calling pool thread waits for its result.
+#  - The event loop runs in a daemon thread, started on first use in
+#    each process (so also in every prefork child).
+#  - At most ASYNC_TASK_CONCURRENCY task coroutines run at once per
+#    process; each is cancelled after its time limit.
+#  - `shared`: per-process instances of services and adapters, reused
+#    by all tasks of the process.
+#
+#  Notes:
+#  ------
+#  - For many concurrent I/O-bound jobs per process, run the worker
+#    with the thread pool, e.g. `celery -A app.core.celery_app worker
+#    --pool threads --concurrency 50`: every pool thread waits on the
+#    shared loop, which multiplexes the provider calls.
+#
+# =================================================================
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from typing import Awaitable, Callable, TypeVar
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from celery.signals import worker_process_shutdown
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerLoop:
+    """
+    An event loop running in a background thread, shared by all tasks of
+    a worker process.
+    """
+
+    def __init__(self, concurrency: int | None = None):
+        self.concurrency = concurrency or settings.ASYNC_TASK_CONCURRENCY
+        self.loop = asyncio.new_event_loop()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="async-task-loop", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    async def _limited(self, coro: Awaitable[T], timeout: float | None) -> T:
+        async with self._semaphore:
+            return await asyncio.wait_for(coro, timeout)
+
+    def run(self, coro: Awaitable[T], timeout: float | None = None) -> T:
+        """
+        Runs `coro` on the loop and blocks the calling thread until it is
+        done. Raises what the coroutine raises, or TimeoutError.
+        """
+        if not self.loop.is_running():
+            raise RuntimeError("The worker event loop is closed.")
+        future = asyncio.run_coroutine_threadsafe(
+            self._limited(coro, timeout), self.loop
+        )
+        return future.result()
+
+    def close(self) -> None:
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+        if not self.loop.is_running():
+            self.loop.close()
+
+
+_worker_loop: WorkerLoop | None = None
+_worker_loop_pid: int | None = None
+_shared: dict = {}
+_lock = threading.RLock()
+
+
+def get_worker_loop() -> WorkerLoop:
+    """The event loop of this process (a forked child gets its own)."""
+    global _worker_loop, _worker_loop_pid
+    with _lock:
+        if _worker_loop is None or _worker_loop_pid != os.getpid():
+            if _worker_loop_pid != os.getpid():
+                _shared.clear()  # Bound to the parent's loop
+            _worker_loop = WorkerLoop()
+            _worker_loop_pid = os.getpid()
+        return _worker_loop
+
+
+def run_async(coro: Awaitable[T], timeout: float | None = None) -> T:
+    """Runs `coro` on this process's worker loop and returns its result."""
+    return get_worker_loop().run(coro, timeout)
+
+
+def shared(factory: Callable[[], T]) -> T:
+    """
+    The process-wide instance made by `factory` (e.g. a service class),
+    created on first use. Instances must be safe to use from concurrent
+    coroutines, as all tasks of the process share them.
+    """
+    get_worker_loop()  # Drops instances inherited across a fork
+    with _lock:
+        instance = _shared.get(factory)
+        if instance is None:
+            instance = _shared[factory] = factory()
+        return instance
+
+
+def coroutine_timeout(task_kwargs: dict) -> float | None:
+    """
+    The time limit for a task's coroutine: the earliest of the task's
+    `soft_time_limit` and `time_limit`, falling back to the app's defaults.
+    """
+    limits = [
+        task_kwargs.get("soft_time_limit") or celery_app.conf.task_soft_time_limit,
+        task_kwargs.get("time_limit") or celery_app.conf.task_time_limit,
+    ]
+    limits = [limit for limit in limits if limit]
+    return min(limits) if limits else None
+
+
+def async_task(*task_args, **task_kwargs):
+    """
+    Like `celery_app.task`, for coroutine functions: the task runs the
+    coroutine on the worker loop, bounded by the task's time limit.
+    """
+    timeout = coroutine_timeout(task_kwargs)
+
+    def decorator(fn: Callable[..., Awaitable[T]]):
+        @functools.wraps(fn)
+        def run(*args, **kwargs) -> T:
+            return run_async(fn(*args, **kwargs), timeout)
+
+        return celery_app.task(*task_args, **task_kwargs)(run)
+
+    return decorator
+
+
+@worker_process_shutdown.connect
+def _close_worker_loop(**kwargs) -> None:
+    if _worker_loop is not None and _worker_loop_pid == os.getpid():
+        _worker_loop.close()
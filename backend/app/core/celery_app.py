@@ -17,12 +17,31 @@
 #  - Configures the broker and result backend using the Redis URL
 #    from the global settings.
 #  - Autodiscovers tasks from the `app.tasks` module.
+#  - Serializes task messages and results with the binary envelope
+#    (`app.utils.envelope`).
+#  - Schedules periodic jobs (Celery beat), e.g. releasing waiting
+#    batch jobs. The knowledge base re-index runs in the API processes,
+#    which hold the index (see `app.services.knowledge_base_indexer`).
+#  - Routes the staged multimodal pipeline tasks to one queue per
+#    stage, so each stage gets workers sized for its resource profile,
+#    e.g. `celery -A app.core.celery_app worker -Q multimodal.tts -c 16`
+#    for I/O-bound TTS and `-Q multimodal.vision -c 2` for local vision.
+#  - Background jobs are submitted to an `interactive` or a `batch`
+#    queue (see `app.services.task_scheduler`); run dedicated workers
+#    for each, e.g. `worker -Q interactive` and `worker -Q batch`, so
+#    bulk jobs never hold the interactive workers. Beat and embedding
+#    jobs are routed to these queues too, so no worker is needed for
+#    the default `celery` queue.
+#  - Async tasks share one event loop per worker process (see
+#    `app.core.async_tasks`); for I/O-bound queues prefer the thread
+#    pool, e.g. `worker -Q interactive --pool threads -c 50`.
 #
 # =================================================================
 
 import logging.config
 
 from app.core.config import settings
+from app.utils.envelope import SERIALIZER_NAME, register_kombu_serializer
 from celery import Celery
 
 # Define logging configuration
@@ -70,6 +89,8 @@ CELERY_LOGGING_CONFIG = {
     },
 }
 
+register_kombu_serializer()
+
 celery_app = Celery(
     "tasks",
     broker=settings.REDIS_URL,
@@ -79,6 +100,12 @@ celery_app = Celery(
 
 celery_app.conf.update(
     task_track_started=True,
+    # Task messages and results use the binary envelope (msgpack, zstd for
+    # large payloads); JSON is still accepted from older producers.
+    task_serializer=SERIALIZER_NAME,
+    result_serializer=SERIALIZER_NAME,
+    accept_content=[SERIALIZER_NAME, "json"],
+    result_accept_content=[SERIALIZER_NAME, "json"],
     # Global time limits for tasks
     task_soft_time_limit=300,  # 5 minutes
     task_time_limit=360,  # 6 minutes (hard limit)
@@ -88,6 +115,33 @@ celery_app.conf.update(
     # For now, we'll rely on retries and logging.
     task_acks_late=True,  # Acknowledge task after it's done, not before
     task_reject_on_worker_timeout=True,  # Requeue task if worker times out
+    # One queue per stage of the staged multimodal pipeline
+    task_routes={
+        "app.tasks.multimodal_vision_stage_task": {"queue": "multimodal.vision"},
+        "app.tasks.multimodal_llm_stage_task": {"queue": "multimodal.llm"},
+        "app.tasks.multimodal_tts_stage_task": {"queue": "multimodal.tts"},
+        # Bulk and maintenance jobs run on the batch workers; the dispatcher
+        # is short and must not wait behind batch jobs. Nothing is left on
+        # the default `celery` queue.
+        "app.tasks.generate_embeddings_and_upsert_task": {
+            "queue": settings.SCHEDULER_BATCH_QUEUE
+        },
+        "app.tasks.purge_expired_blobs_task": {"queue": settings.SCHEDULER_BATCH_QUEUE},
+        "app.tasks.dispatch_batch_tasks_task": {
+            "queue": settings.SCHEDULER_INTERACTIVE_QUEUE
+        },
+    },
+    # Periodic jobs, run with `celery -A app.core.celery_app beat`
+    beat_schedule={
+        "scheduler-dispatch-batch-tasks": {
+            "task": "app.tasks.dispatch_batch_tasks_task",
+            "schedule": settings.SCHEDULER_DISPATCH_INTERVAL_SECONDS,
+        },
+        "purge-expired-blobs": {
+            "task": "app.tasks.purge_expired_blobs_task",
+            "schedule": 3600,
+        },
+    },
 )
 
 # Apply logging configuration
@@ -27,6 +27,77 @@ class Settings(BaseSettings):
         "DEFAULT_EMBEDDING_MODEL", "all-MiniLM-L6-v2"
     )
 
+    # --- Circuit Breakers ---
+    # Consecutive failures that open a circuit, how long it stays open before
+    # recovery is probed, and how many trial calls are allowed while half-open.
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = int(
+        os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5")
+    )
+    CIRCUIT_BREAKER_RECOVERY_SECONDS: float = float(
+        os.getenv("CIRCUIT_BREAKER_RECOVERY_SECONDS", "30")
+    )
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = int(
+        os.getenv("CIRCUIT_BREAKER_HALF_OPEN_CALLS", "1")
+    )
+
+    # --- Provider Failover & Hedging ---
+    # Secondary providers tried after the default one, in order. Leave empty to
+    # bind services to the default provider only.
+    # e.g., LLM_FALLBACK_PROVIDERS='["huggingface"]'
+    LLM_FALLBACK_PROVIDERS: List[str] = []
+    VISION_FALLBACK_PROVIDERS: List[str] = []
+    STT_FALLBACK_PROVIDERS: List[str] = []
+    TTS_FALLBACK_PROVIDERS: List[str] = []
+    # When enabled, a slow provider gets a duplicate (hedged) request sent to the
+    # next provider once its latency budget is exceeded. The budget tracks the
+    # given percentile of recent latencies, clamped to [min, max].
+    PROVIDER_HEDGING_ENABLED: bool = True
+    HEDGE_LATENCY_PERCENTILE: float = 0.95
+    HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    HEDGE_MAX_DELAY_SECONDS: float = 10.0
+
+    # --- Provider Rate Limiting ---
+    # Token bucket (requests/second + burst) and the ceiling for the adaptive
+    # concurrency limit, applied per provider and model.
+    OPENAI_RATE_LIMIT_RPS: float = float(os.getenv("OPENAI_RATE_LIMIT_RPS", "8"))
+    OPENAI_RATE_LIMIT_BURST: int = int(os.getenv("OPENAI_RATE_LIMIT_BURST", "16"))
+    OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+    HF_RATE_LIMIT_RPS: float = float(os.getenv("HF_RATE_LIMIT_RPS", "50"))
+    HF_RATE_LIMIT_BURST: int = int(os.getenv("HF_RATE_LIMIT_BURST", "50"))
+    HF_MAX_CONCURRENCY: int = int(os.getenv("HF_MAX_CONCURRENCY", "2"))
+    GTTS_RATE_LIMIT_RPS: float = float(os.getenv("GTTS_RATE_LIMIT_RPS", "2"))
+    GTTS_RATE_LIMIT_BURST: int = int(os.getenv("GTTS_RATE_LIMIT_BURST", "4"))
+    GTTS_MAX_CONCURRENCY: int = int(os.getenv("GTTS_MAX_CONCURRENCY", "4"))
+    # Latency above which the concurrency limit backs off, and how long a call
+    # may wait in the limiter queue before it is rejected.
+    RATE_LIMIT_LATENCY_TARGET_SECONDS: float = float(
+        os.getenv("RATE_LIMIT_LATENCY_TARGET_SECONDS", "20")
+    )
+    RATE_LIMIT_QUEUE_TIMEOUT_SECONDS: float = float(
+        os.getenv("RATE_LIMIT_QUEUE_TIMEOUT_SECONDS", "30")
+    )
+
+    # --- OpenAI HTTP Connection Pool ---
+    # One HTTP/2 keep-alive pool per process, shared by all OpenAI adapters
+    # (see app/services/openai_client.py).
+    OPENAI_HTTP2: bool = True
+    OPENAI_HTTP_MAX_CONNECTIONS: int = int(
+        os.getenv("OPENAI_HTTP_MAX_CONNECTIONS", "100")
+    )
+    OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")
+    )
+    OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(
+        os.getenv("OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60")
+    )
+    OPENAI_HTTP_CONNECT_TIMEOUT_SECONDS: float = float(
+        os.getenv("OPENAI_HTTP_CONNECT_TIMEOUT_SECONDS", "5")
+    )
+    # Read/write timeout of one request; long generations must fit in it.
+    OPENAI_HTTP_TIMEOUT_SECONDS: float = float(
+        os.getenv("OPENAI_HTTP_TIMEOUT_SECONDS", "120")
+    )
+
     # --- API Keys ---
     # !!! WARNING: For production, do not load secrets from .env files.
     # Use a secure secret management service like AWS Secrets Manager,
@@ -45,6 +116,223 @@ class Settings(BaseSettings):
     # !!! WARNING: For production, do not load secrets from .env files.
     # Database (Neon)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    # asyncpg pool sizing and timeouts. Set DATABASE_STATEMENT_CACHE_SIZE to 0
+    # when connecting through a transaction-mode pooler (e.g. PgBouncer), which
+    # does not support prepared statements.
+    DATABASE_POOL_MIN_SIZE: int = int(os.getenv("DATABASE_POOL_MIN_SIZE", "2"))
+    DATABASE_POOL_MAX_SIZE: int = int(os.getenv("DATABASE_POOL_MAX_SIZE", "20"))
+    DATABASE_CONNECT_TIMEOUT_SECONDS: float = float(
+        os.getenv("DATABASE_CONNECT_TIMEOUT_SECONDS", "10")
+    )
+    DATABASE_ACQUIRE_TIMEOUT_SECONDS: float = float(
+        os.getenv("DATABASE_ACQUIRE_TIMEOUT_SECONDS", "10")
+    )
+    DATABASE_COMMAND_TIMEOUT_SECONDS: float = float(
+        os.getenv("DATABASE_COMMAND_TIMEOUT_SECONDS", "30")
+    )
+    DATABASE_STATEMENT_CACHE_SIZE: int = int(
+        os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "256")
+    )
+    DATABASE_MAX_INACTIVE_CONNECTION_LIFETIME_SECONDS: float = float(
+        os.getenv("DATABASE_MAX_INACTIVE_CONNECTION_LIFETIME_SECONDS", "300")
+    )
+    # Rows per COPY batch (one transaction each) for bulk ingestion.
+    DATABASE_BULK_BATCH_SIZE: int = int(os.getenv("DATABASE_BULK_BATCH_SIZE", "5000"))
+    # Rows fetched per round trip when streaming through a server-side cursor.
+    DATABASE_STREAM_FETCH_SIZE: int = int(
+        os.getenv("DATABASE_STREAM_FETCH_SIZE", "1000")
+    )
+
+    # --- Knowledge Base Retrieval ---
+    # Documents are split into chunks of at most CHUNK_MAX_TOKENS model tokens
+    # (keep below the embedding model's max sequence length), overlapping by
+    # CHUNK_OVERLAP_TOKENS. Chunks whose SimHash is within
+    # CHUNK_SIMHASH_MAX_DISTANCE bits of an earlier chunk are dropped.
+    CHUNK_MAX_TOKENS: int = int(os.getenv("CHUNK_MAX_TOKENS", "200"))
+    CHUNK_OVERLAP_TOKENS: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", "40"))
+    CHUNK_SIMHASH_MAX_DISTANCE: int = int(os.getenv("CHUNK_SIMHASH_MAX_DISTANCE", "3"))
+    # Total time a hybrid (BM25 + vector) query may take; vector results that
+    # miss it are dropped. Candidates are taken from each retriever before
+    # reciprocal-rank fusion, whose rank constant is RETRIEVAL_RRF_K.
+    RETRIEVAL_LATENCY_BUDGET_MS: float = float(
+        os.getenv("RETRIEVAL_LATENCY_BUDGET_MS", "500")
+    )
+    RETRIEVAL_CANDIDATES: int = int(os.getenv("RETRIEVAL_CANDIDATES", "50"))
+    RETRIEVAL_RRF_K: int = int(os.getenv("RETRIEVAL_RRF_K", "60"))
+    # Retrieval-augmented generation: chunks retrieved per question, the token
+    # budget they are packed into, and the token-set similarity above which a
+    # chunk counts as a near-duplicate of a better-ranked one.
+    RAG_ENABLED: bool = True
+    RAG_TOP_K: int = int(os.getenv("RAG_TOP_K", "8"))
+    RAG_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "1024"))
+    RAG_DEDUP_MAX_SIMILARITY: float = float(
+        os.getenv("RAG_DEDUP_MAX_SIMILARITY", "0.85")
+    )
+    # Incremental re-indexing of the knowledge_base table: rows per watermark
+    # page, how far behind "now" the watermark stays (so late-committing
+    # transactions are not skipped) and how often each API process refreshes
+    # its in-memory index (0 disables the periodic refresh).
+    KNOWLEDGE_BASE_INDEX_BATCH_SIZE: int = int(
+        os.getenv("KNOWLEDGE_BASE_INDEX_BATCH_SIZE", "500")
+    )
+    KNOWLEDGE_BASE_INDEX_LAG_SECONDS: float = float(
+        os.getenv("KNOWLEDGE_BASE_INDEX_LAG_SECONDS", "30")
+    )
+    KNOWLEDGE_BASE_INDEX_INTERVAL_SECONDS: float = float(
+        os.getenv("KNOWLEDGE_BASE_INDEX_INTERVAL_SECONDS", "300")
+    )
+    # How long chunk embeddings stay in the Redis embedding cache that
+    # in-memory index rebuilds read from.
+    EMBEDDING_CACHE_TTL_SECONDS: int = int(
+        os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(30 * 24 * 3600))
+    )
+    # Optional cross-encoder re-ranking of the retrieved chunks. When enabled,
+    # RERANK_CANDIDATES chunks are retrieved and re-scored in batches of
+    # RERANK_BATCH_SIZE (one forward pass each) within RERANK_BUDGET_MS.
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL: str = os.getenv(
+        "RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    )
+    RERANK_CANDIDATES: int = int(os.getenv("RERANK_CANDIDATES", "24"))
+    RERANK_BATCH_SIZE: int = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+    RERANK_BUDGET_MS: float = float(os.getenv("RERANK_BUDGET_MS", "150"))
+    RERANK_CACHE_SIZE: int = int(os.getenv("RERANK_CACHE_SIZE", "10000"))
+    # Metadata filters matching at most this share of the vectors are applied
+    # before scoring (pre-filter); broader ones mask a full scan (post-filter).
+    # Fields with more distinct values than the cardinality limit are matched
+    # row by row instead of through bitmaps.
+    VECTOR_PREFILTER_MAX_SELECTIVITY: float = float(
+        os.getenv("VECTOR_PREFILTER_MAX_SELECTIVITY", "0.25")
+    )
+    VECTOR_FILTER_MAX_CARDINALITY: int = int(
+        os.getenv("VECTOR_FILTER_MAX_CARDINALITY", "4096")
+    )
+
+    # --- Embedding Models ---
+    # Embedding inference backend: "torch" (SentenceTransformer) or "onnx"
+    # (ONNX Runtime, optionally int8-quantized). ONNX exports are cached in
+    # EMBEDDING_ONNX_CACHE_DIR; 0 intra-op threads means one per CPU.
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    EMBEDDING_ONNX_QUANTIZE: bool = True
+    EMBEDDING_ONNX_THREADS: int = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+    EMBEDDING_ONNX_CACHE_DIR: str = os.getenv("EMBEDDING_ONNX_CACHE_DIR", "models/onnx")
+    # Embedding model migrations: the backfill re-embeds existing chunks into
+    # the new model's namespace in batches of EMBEDDING_BACKFILL_BATCH_SIZE,
+    # at most EMBEDDING_BACKFILL_RATE chunks per second.
+    EMBEDDING_BACKFILL_BATCH_SIZE: int = int(
+        os.getenv("EMBEDDING_BACKFILL_BATCH_SIZE", "32")
+    )
+    EMBEDDING_BACKFILL_RATE: float = float(os.getenv("EMBEDDING_BACKFILL_RATE", "50"))
+    # Lease of the cross-process migration lock; it is renewed after every
+    # backfill batch, so it must be longer than one batch takes.
+    EMBEDDING_MIGRATION_LEASE_SECONDS: int = int(
+        os.getenv("EMBEDDING_MIGRATION_LEASE_SECONDS", "120")
+    )
+
+    # --- Local Inference Worker Pool ---
+    # Local model inference in a pool of pinned worker processes (0 runs local
+    # models in the API process). Requests arriving within
+    # INFERENCE_MAX_BATCH_WAIT_MS are batched, up to INFERENCE_MAX_BATCH_SIZE.
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "0"))
+    INFERENCE_MAX_BATCH_SIZE: int = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+    INFERENCE_MAX_BATCH_WAIT_MS: float = float(
+        os.getenv("INFERENCE_MAX_BATCH_WAIT_MS", "5")
+    )
+
+    # --- Request Coalescing (Single-Flight) ---
+    # Single-flight coalescing of identical provider calls across processes:
+    # how long a leader's Redis lease lasts, how long followers wait for its
+    # result (polling every SINGLE_FLIGHT_POLL_INTERVAL_MS), and how long
+    # uncached results (LLM responses) stay readable for followers.
+    SINGLE_FLIGHT_LEASE_SECONDS: float = float(
+        os.getenv("SINGLE_FLIGHT_LEASE_SECONDS", "60")
+    )
+    SINGLE_FLIGHT_WAIT_SECONDS: float = float(
+        os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "60")
+    )
+    SINGLE_FLIGHT_POLL_INTERVAL_MS: float = float(
+        os.getenv("SINGLE_FLIGHT_POLL_INTERVAL_MS", "100")
+    )
+    SINGLE_FLIGHT_RESULT_TTL_SECONDS: int = int(
+        os.getenv("SINGLE_FLIGHT_RESULT_TTL_SECONDS", "30")
+    )
+
+    # --- Background Task Execution ---
+    # Run the multimodal pipeline as a chain of per-stage tasks on the
+    # multimodal.vision / multimodal.llm / multimodal.tts queues (workers
+    # must consume them). Stage outputs are checkpointed for this long.
+    MULTIMODAL_STAGED_PIPELINE: bool = False
+    MULTIMODAL_CHECKPOINT_TTL_SECONDS: int = int(
+        os.getenv("MULTIMODAL_CHECKPOINT_TTL_SECONDS", "3600")
+    )
+    # How long an idempotent submission stays deduplicated while its task is
+    # queued or running (finished results are deduplicated while cached).
+    TASK_IDEMPOTENCY_TTL_SECONDS: int = int(
+        os.getenv("TASK_IDEMPOTENCY_TTL_SECONDS", "1800")
+    )
+    # Most async task coroutines running at once on a worker process's
+    # event loop (see app/core/async_tasks.py).
+    ASYNC_TASK_CONCURRENCY: int = int(os.getenv("ASYNC_TASK_CONCURRENCY", "50"))
+
+    # --- Background Task Scheduling ---
+    # Interactive jobs go straight to their own queue unless it is deeper
+    # than SCHEDULER_INTERACTIVE_MAX_DEPTH (then they are deferred to the
+    # batch class). Batch jobs wait in per-user
+    # queues and are released round-robin (deficit round-robin, quantum per
+    # round) while fewer than SCHEDULER_BATCH_MAX_IN_FLIGHT are running;
+    # submissions beyond the per-user / total pending limits are rejected.
+    SCHEDULER_INTERACTIVE_QUEUE: str = os.getenv(
+        "SCHEDULER_INTERACTIVE_QUEUE", "interactive"
+    )
+    SCHEDULER_BATCH_QUEUE: str = os.getenv("SCHEDULER_BATCH_QUEUE", "batch")
+    SCHEDULER_INTERACTIVE_MAX_DEPTH: int = int(
+        os.getenv("SCHEDULER_INTERACTIVE_MAX_DEPTH", "50")
+    )
+    SCHEDULER_BATCH_MAX_IN_FLIGHT: int = int(
+        os.getenv("SCHEDULER_BATCH_MAX_IN_FLIGHT", "8")
+    )
+    SCHEDULER_MAX_PENDING_PER_USER: int = int(
+        os.getenv("SCHEDULER_MAX_PENDING_PER_USER", "1000")
+    )
+    SCHEDULER_MAX_PENDING_TOTAL: int = int(
+        os.getenv("SCHEDULER_MAX_PENDING_TOTAL", "10000")
+    )
+    SCHEDULER_QUANTUM: float = float(os.getenv("SCHEDULER_QUANTUM", "1"))
+    # Batch jobs running longer than this no longer count as in flight (a
+    # worker may have died without reporting them), and how often Celery
+    # beat releases batch jobs in case no submission or completion did.
+    SCHEDULER_IN_FLIGHT_TIMEOUT_SECONDS: int = int(
+        os.getenv("SCHEDULER_IN_FLIGHT_TIMEOUT_SECONDS", "1800")
+    )
+    SCHEDULER_DISPATCH_INTERVAL_SECONDS: float = float(
+        os.getenv("SCHEDULER_DISPATCH_INTERVAL_SECONDS", "5")
+    )
+
+    # --- Blob Store & Payload Compression ---
+    # Claim-check blob store for large task payloads (images, audio):
+    # "redis", or "filesystem" under BLOB_STORE_DIR (which must be shared by
+    # the API and the workers). Blobs must outlive the task results that
+    # refer to them (Celery keeps results for one day by default).
+    BLOB_STORE_BACKEND: str = os.getenv("BLOB_STORE_BACKEND", "redis")
+    BLOB_STORE_DIR: str = os.getenv("BLOB_STORE_DIR", "data/blobs")
+    BLOB_TTL_SECONDS: int = int(os.getenv("BLOB_TTL_SECONDS", "86400"))
+    # Cached task results and Celery messages (binary envelopes) are zstd
+    # compressed from this many bytes on; 0 disables compression.
+    RESULT_COMPRESSION_MIN_BYTES: int = int(
+        os.getenv("RESULT_COMPRESSION_MIN_BYTES", "1024")
+    )
+
+    # --- Task Status & Progress Events ---
+    # Most task ids accepted by one bulk task status request.
+    TASK_STATUS_BATCH_MAX_IDS: int = int(os.getenv("TASK_STATUS_BATCH_MAX_IDS", "200"))
+    # Server-Sent Events streams of background task progress: comment lines
+    # keep idle connections open, and a stream ends after the timeout.
+    TASK_EVENTS_KEEPALIVE_SECONDS: float = float(
+        os.getenv("TASK_EVENTS_KEEPALIVE_SECONDS", "15")
+    )
+    TASK_EVENTS_STREAM_TIMEOUT_SECONDS: float = float(
+        os.getenv("TASK_EVENTS_STREAM_TIMEOUT_SECONDS", "900")
+    )
 
     # Background Tasks (Celery & Redis)
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -9,3 +9,6 @@ class Message(BaseModel):
 class ChatResponse(BaseModel):
     response_text: str | None = None
     recommendations: list[str] | None = None
+    # Knowledge-base chunk ids used as context, and per-stage timings (ms)
+    sources: list[str] | None = None
+    timings: dict[str, float] | None = None
@@ -16,6 +16,9 @@
 #  - Implements `generate_audio` to convert text to a base64-encoded
 #    audio string.
 #  - Runs the synchronous gTTS operations in a thread for async safety.
+#  - Calls are admitted through the shared provider rate limiter.
+#  - Fails fast through a per-model circuit breaker while the
+#    provider is unhealthy.
 #
 # =================================================================
 
@@ -24,12 +27,19 @@ import base64
 from io import BytesIO
 
 from app.services.base.tts_adapter import BaseTTSAdapter
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.rate_limiter import get_rate_limiter
 from gtts import gTTS
 
 
 class GTTSTransformer(BaseTTSAdapter):
     """Adapter for Google Text-to-Speech (gTTS)."""
 
+    def __init__(self, lang: str = "en"):
+        self.lang = lang
+        self.rate_limiter = get_rate_limiter("gtts", lang)
+        self.circuit_breaker = get_circuit_breaker(f"gtts:{lang}")
+
     async def generate_audio(self, text: str) -> str:
         """
         Generates audio from text using gTTS.
@@ -43,18 +53,19 @@ class GTTSTransformer(BaseTTSAdapter):
         try:
 
             def _generate():
-                tts = gTTS(text=text, lang="en")
+                tts = gTTS(text=text, lang=self.lang)
                 audio_buffer = BytesIO()
                 tts.write_to_fp(audio_buffer)
                 audio_buffer.seek(0)
                 return audio_buffer.read()
 
             # Run the synchronous gTTS code in a separate thread
-            audio_bytes = await asyncio.to_thread(_generate)
+            async with self.circuit_breaker.guard(), self.rate_limiter.slot():
+                audio_bytes = await asyncio.to_thread(_generate)
 
             # Encode audio to base64
             audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
             return audio_base64
         except Exception as e:
             print(f"Error generating audio with gTTS: {e}")
-            return ""
+            return self.fallback_response
@@ -16,7 +16,10 @@
 #  - Initializes a Hugging Face text-generation pipeline.
 #  - Implements the `generate_response` method to produce text.
 #  - Uses `asyncio.to_thread` to run the synchronous pipeline in an
-#    async-safe manner.
+#    async-safe manner, or the inference worker pool when enabled.
+#  - Bounds concurrent inference through the shared rate limiter.
+#  - Fails fast through a per-model circuit breaker while the
+#    provider is unhealthy.
 #
 # =================================================================
 
@@ -24,18 +27,30 @@ import asyncio
 
 from app.core.config import settings
 from app.services.base.llm_adapter import BaseLLMAdapter
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.inference_pool import get_inference_pool
+from app.services.rate_limiter import get_rate_limiter
 from transformers import pipeline
 
 
 class HuggingFaceLLMAdapter(BaseLLMAdapter):
     """Adapter for Hugging Face text-generation models."""
 
+    fallback_response = "Sorry, I encountered an error while generating a response."
+
     def __init__(self, model_name: str = "HuggingFaceH4/zephyr-7b-beta"):
-        self.pipeline = pipeline(
-            "text-generation",
-            model=model_name,
-            token=settings.HF_API_TOKEN,
-        )
+        self.model_name = model_name
+        # With the worker pool the model is loaded in the workers instead.
+        self.inference_pool = get_inference_pool()
+        self.pipeline = None
+        if self.inference_pool is None:
+            self.pipeline = pipeline(
+                "text-generation",
+                model=model_name,
+                token=settings.HF_API_TOKEN,
+            )
+        self.rate_limiter = get_rate_limiter("huggingface", model_name)
+        self.circuit_breaker = get_circuit_breaker(f"huggingface:{model_name}")
 
     async def generate_response(self, prompt: str) -> str:
         """
@@ -50,8 +65,16 @@ class HuggingFaceLLMAdapter(BaseLLMAdapter):
         try:
             # The pipeline is synchronous, so we run it in a separate thread
             # to avoid blocking the asyncio event loop.
-            result = await asyncio.to_thread(self.pipeline, prompt, max_new_tokens=150)
+            async with self.circuit_breaker.guard(), self.rate_limiter.slot():
+                if self.inference_pool is not None:
+                    (result,) = await self.inference_pool.submit(
+                        "text-generation", self.model_name, [prompt], max_new_tokens=150
+                    )
+                else:
+                    result = await asyncio.to_thread(
+                        self.pipeline, prompt, max_new_tokens=150
+                    )
             return result[0]["generated_text"]
         except Exception as e:
             print(f"Error generating response from HuggingFace: {e}")
-            return "Sorry, I encountered an error while generating a response."
+            return self.fallback_response
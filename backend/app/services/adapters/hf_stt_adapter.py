@@ -14,7 +14,11 @@
 #  -------------
 #  - Initializes a Hugging Face automatic-speech-recognition pipeline.
 #  - Implements `transcribe_audio` to convert audio to text.
-#  - Runs the synchronous pipeline in a thread for async safety.
+#  - Runs the synchronous pipeline in a thread for async safety, or in
+#    the inference worker pool when enabled.
+#  - Bounds concurrent inference through the shared rate limiter.
+#  - Fails fast through a per-model circuit breaker while the
+#    provider is unhealthy.
 #
 # =================================================================
 
@@ -24,6 +28,9 @@ from io import BytesIO
 
 from app.core.config import settings
 from app.services.base.stt_adapter import BaseSTTAdapter
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.inference_pool import get_inference_pool
+from app.services.rate_limiter import get_rate_limiter
 from transformers import pipeline
 
 
@@ -31,11 +38,18 @@ class HuggingFaceSTTAdapter(BaseSTTAdapter):
     """Adapter for Hugging Face speech-recognition models."""
 
     def __init__(self, model_name: str = "openai/whisper-tiny"):
-        self.pipeline = pipeline(
-            "automatic-speech-recognition",
-            model=model_name,
-            token=settings.HF_API_TOKEN,
-        )
+        self.model_name = model_name
+        # With the worker pool the model is loaded in the workers instead.
+        self.inference_pool = get_inference_pool()
+        self.pipeline = None
+        if self.inference_pool is None:
+            self.pipeline = pipeline(
+                "automatic-speech-recognition",
+                model=model_name,
+                token=settings.HF_API_TOKEN,
+            )
+        self.rate_limiter = get_rate_limiter("huggingface", model_name)
+        self.circuit_breaker = get_circuit_breaker(f"huggingface:{model_name}")
 
     async def transcribe_audio(self, audio_base64: str) -> str:
         """
@@ -51,9 +65,15 @@ class HuggingFaceSTTAdapter(BaseSTTAdapter):
             audio_bytes = base64.b64decode(audio_base64)
             audio_file = BytesIO(audio_bytes)
 
-            # Run the synchronous pipeline in a separate thread
-            result = await asyncio.to_thread(self.pipeline, audio_file)
+            # Run the synchronous pipeline in a worker process or a thread
+            async with self.circuit_breaker.guard(), self.rate_limiter.slot():
+                if self.inference_pool is not None:
+                    (result,) = await self.inference_pool.submit(
+                        "automatic-speech-recognition", self.model_name, [audio_bytes]
+                    )
+                else:
+                    result = await asyncio.to_thread(self.pipeline, audio_file)
             return result["text"]
         except Exception as e:
             print(f"Error transcribing audio with HuggingFace: {e}")
-            return ""
+            return self.fallback_response
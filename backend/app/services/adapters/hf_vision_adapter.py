@@ -15,7 +15,11 @@
 #  -------------
 #  - Initializes a Hugging Face image-to-text pipeline.
 #  - Implements `get_image_description` to generate captions.
-#  - Runs the synchronous pipeline in a thread for async safety.
+#  - Runs the synchronous pipeline in a thread for async safety, or in
+#    the inference worker pool when enabled.
+#  - Bounds concurrent inference through the shared rate limiter.
+#  - Fails fast through a per-model circuit breaker while the
+#    provider is unhealthy.
 #
 # =================================================================
 
@@ -25,18 +29,30 @@ from io import BytesIO
 
 from app.core.config import settings
 from app.services.base.vision_adapter import BaseVisionAdapter
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.inference_pool import get_inference_pool
+from app.services.rate_limiter import get_rate_limiter
 from transformers import pipeline
 
 
 class HuggingFaceVisionAdapter(BaseVisionAdapter):
     """Adapter for Hugging Face image-to-text models."""
 
+    fallback_response = "Could not generate a description for the image."
+
     def __init__(self, model_name: str = "Salesforce/blip-image-captioning-base"):
-        self.pipeline = pipeline(
-            "image-to-text",
-            model=model_name,
-            token=settings.HF_API_TOKEN,
-        )
+        self.model_name = model_name
+        # With the worker pool the model is loaded in the workers instead.
+        self.inference_pool = get_inference_pool()
+        self.pipeline = None
+        if self.inference_pool is None:
+            self.pipeline = pipeline(
+                "image-to-text",
+                model=model_name,
+                token=settings.HF_API_TOKEN,
+            )
+        self.rate_limiter = get_rate_limiter("huggingface", model_name)
+        self.circuit_breaker = get_circuit_breaker(f"huggingface:{model_name}")
 
     async def get_image_description(self, image_base64: str) -> str:
         """
@@ -52,9 +68,15 @@ class HuggingFaceVisionAdapter(BaseVisionAdapter):
             image_bytes = base64.b64decode(image_base64)
             image_file = BytesIO(image_bytes)
 
-            # Run the synchronous pipeline in a separate thread
-            result = await asyncio.to_thread(self.pipeline, image_file)
+            # Run the synchronous pipeline in a worker process or a thread
+            async with self.circuit_breaker.guard(), self.rate_limiter.slot():
+                if self.inference_pool is not None:
+                    (result,) = await self.inference_pool.submit(
+                        "image-to-text", self.model_name, [image_bytes]
+                    )
+                else:
+                    result = await asyncio.to_thread(self.pipeline, image_file)
             return result[0]["generated_text"]
         except Exception as e:
             print(f"Error getting image description from HuggingFace: {e}")
-            return "Could not generate a description for the image."
+            return self.fallback_response
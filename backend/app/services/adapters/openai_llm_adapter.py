@@ -13,23 +13,35 @@
 #
 #  Key Features:
 #  -------------
-#  - Uses `openai.AsyncOpenAI` for non-blocking API requests.
+#  - Uses the shared `openai.AsyncOpenAI` client (see
+#    `app.services.openai_client`) for non-blocking API requests.
 #  - Implements the `generate_response` method.
 #  - Configured via environment variables for the API key.
+#  - Calls are admitted through the shared provider rate limiter.
+#  - Fails fast through a per-model circuit breaker while the
+#    provider is unhealthy.
 #
 # =================================================================
 
-from app.core.config import settings
 from app.services.base.llm_adapter import BaseLLMAdapter
-from openai import AsyncOpenAI
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.openai_client import get_openai_client
+from app.services.rate_limiter import get_rate_limiter
 
 
 class OpenAILLMAdapter(BaseLLMAdapter):
     """Adapter for OpenAI's GPT models."""
 
+    fallback_response = "Sorry, I encountered an error with the AI model."
+
     def __init__(self, model_name: str = "gpt-3.5-turbo"):
         self.model_name = model_name
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
+        self.rate_limiter = get_rate_limiter("openai", model_name)
+        self.circuit_breaker = get_circuit_breaker(
+            f"openai:{model_name}",
+            probe=lambda: self.client.models.retrieve(self.model_name),
+        )
 
     async def generate_response(self, prompt: str) -> str:
         """
@@ -42,12 +54,13 @@ class OpenAILLMAdapter(BaseLLMAdapter):
             The text response generated by the model.
         """
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=150,
-            )
+            async with self.circuit_breaker.guard(), self.rate_limiter.slot():
+                response = await self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=150,
+                )
             return response.choices[0].message.content.strip()
         except Exception as e:
             print(f"Error generating response from OpenAI: {e}")
-            return "Sorry, I encountered an error with the AI model."
+            return self.fallback_response
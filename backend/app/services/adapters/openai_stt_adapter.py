@@ -12,18 +12,23 @@
 #
 #  Key Features:
 #  -------------
-#  - Uses `openai.AsyncOpenAI` for non-blocking API requests.
+#  - Uses the shared `openai.AsyncOpenAI` client (see
+#    `app.services.openai_client`) for non-blocking API requests.
 #  - Implements `transcribe_audio` by sending audio data to the
 #    transcriptions endpoint.
+#  - Calls are admitted through the shared provider rate limiter.
+#  - Fails fast through a per-model circuit breaker while the
+#    provider is unhealthy.
 #
 # =================================================================
 
 import base64
 from io import BytesIO
 
-from app.core.config import settings
 from app.services.base.stt_adapter import BaseSTTAdapter
-from openai import AsyncOpenAI
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.openai_client import get_openai_client
+from app.services.rate_limiter import get_rate_limiter
 
 
 class OpenAISTTAdapter(BaseSTTAdapter):  # Renamed class
@@ -31,7 +36,12 @@ class OpenAISTTAdapter(BaseSTTAdapter):  # Renamed class
 
     def __init__(self, model_name: str = "whisper-1"):
         self.model_name = model_name
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
+        self.rate_limiter = get_rate_limiter("openai", model_name)
+        self.circuit_breaker = get_circuit_breaker(
+            f"openai:{model_name}",
+            probe=lambda: self.client.models.retrieve(self.model_name),
+        )
 
     async def transcribe_audio(self, audio_base64: str) -> str:
         """
@@ -48,11 +58,12 @@ class OpenAISTTAdapter(BaseSTTAdapter):  # Renamed class
             audio_file = BytesIO(audio_bytes)
             audio_file.name = "input.wav"  # API requires a file name
 
-            response = await self.client.audio.transcriptions.create(
-                model=self.model_name,
-                file=audio_file,
-            )
+            async with self.circuit_breaker.guard(), self.rate_limiter.slot():
+                response = await self.client.audio.transcriptions.create(
+                    model=self.model_name,
+                    file=audio_file,
+                )
             return response.text
         except Exception as e:
             print(f"Error transcribing audio with OpenAI: {e}")
-            return ""
+            return self.fallback_response
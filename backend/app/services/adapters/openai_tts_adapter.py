@@ -12,17 +12,22 @@
 #
 #  Key Features:
 #  -------------
-#  - Uses `openai.AsyncOpenAI` for non-blocking API requests.
+#  - Uses the shared `openai.AsyncOpenAI` client (see
+#    `app.services.openai_client`) for non-blocking API requests.
 #  - Implements `generate_audio` to convert text to speech.
 #  - Returns a base64-encoded audio string.
+#  - Calls are admitted through the shared provider rate limiter.
+#  - Fails fast through a per-model circuit breaker while the
+#    provider is unhealthy.
 #
 # =================================================================
 
 import base64
 
-from app.core.config import settings
 from app.services.base.tts_adapter import BaseTTSAdapter
-from openai import AsyncOpenAI
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.openai_client import get_openai_client
+from app.services.rate_limiter import get_rate_limiter
 
 
 class OpenAITTSAdapter(BaseTTSAdapter):
@@ -31,7 +36,12 @@ class OpenAITTSAdapter(BaseTTSAdapter):
     def __init__(self, model_name: str = "tts-1", voice: str = "alloy"):
         self.model_name = model_name
         self.voice = voice
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
+        self.rate_limiter = get_rate_limiter("openai", model_name)
+        self.circuit_breaker = get_circuit_breaker(
+            f"openai:{model_name}",
+            probe=lambda: self.client.models.retrieve(self.model_name),
+        )
 
     async def generate_audio(self, text: str) -> str:
         """
@@ -44,16 +54,17 @@ class OpenAITTSAdapter(BaseTTSAdapter):
             A base64-encoded string of the generated audio.
         """
         try:
-            response = await self.client.audio.speech.create(
-                model=self.model_name,
-                voice=self.voice,
-                input=text,
-            )
-
-            # The response body is a stream. We read it and encode to base64.
-            audio_bytes = await response.aread()
+            async with self.circuit_breaker.guard(), self.rate_limiter.slot():
+                response = await self.client.audio.speech.create(
+                    model=self.model_name,
+                    voice=self.voice,
+                    input=text,
+                )
+
+                # The response body is a stream. We read it and encode to base64.
+                audio_bytes = await response.aread()
             audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
             return audio_base64
         except Exception as e:
             print(f"Error generating audio with OpenAI: {e}")
-            return ""
+            return self.fallback_response
@@ -12,23 +12,35 @@
 #
 #  Key Features:
 #  -------------
-#  - Uses `openai.AsyncOpenAI` for non-blocking API requests.
+#  - Uses the shared `openai.AsyncOpenAI` client (see
+#    `app.services.openai_client`) for non-blocking API requests.
 #  - Implements `get_image_description` by sending a base64-encoded
 #    image to the chat completions endpoint.
+#  - Calls are admitted through the shared provider rate limiter.
+#  - Fails fast through a per-model circuit breaker while the
+#    provider is unhealthy.
 #
 # =================================================================
 
-from app.core.config import settings
 from app.services.base.vision_adapter import BaseVisionAdapter
-from openai import AsyncOpenAI
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.openai_client import get_openai_client
+from app.services.rate_limiter import get_rate_limiter
 
 
 class OpenAIVisionAdapter(BaseVisionAdapter):
     """Adapter for OpenAI's multimodal models (e.g., GPT-4o)."""
 
+    fallback_response = "Could not generate a description for the image."
+
     def __init__(self, model_name: str = "gpt-4o"):
         self.model_name = model_name
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
+        self.rate_limiter = get_rate_limiter("openai", model_name)
+        self.circuit_breaker = get_circuit_breaker(
+            f"openai:{model_name}",
+            probe=lambda: self.client.models.retrieve(self.model_name),
+        )
 
     async def get_image_description(self, image_base64: str) -> str:
         """
@@ -42,25 +54,26 @@ class OpenAIVisionAdapter(BaseVisionAdapter):
             A textual description of the image.
         """
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": "What’s in this image?"},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_base64}"
+            async with self.circuit_breaker.guard(), self.rate_limiter.slot():
+                response = await self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": "What’s in this image?"},
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": f"data:image/jpeg;base64,{image_base64}"
+                                    },
                                 },
-                            },
-                        ],
-                    }
-                ],
-                max_tokens=100,
-            )
+                            ],
+                        }
+                    ],
+                    max_tokens=100,
+                )
             return response.choices[0].message.content.strip()
         except Exception as e:
             print(f"Error getting image description from OpenAI: {e}")
-            return "Could not generate a description for the image."
+            return self.fallback_response
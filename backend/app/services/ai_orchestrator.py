@@ -15,17 +15,50 @@
 #  - Submits jobs to the Celery task queue.
 #  - Provides methods to check the status and retrieve results of
 #    background tasks.
-#  - Interacts with the Redis cache for result storage.
+#  - Interacts with the Redis cache for result storage (binary
+#    envelopes, see `app.services.result_cache`).
+#  - Idempotent submission: task ids are derived from the payload,
+#    provider configuration and user (or a client idempotency key), and
+#    work that is already queued, running or cached is not enqueued
+#    again.
+#  - Passes images to tasks as claim-check references to the blob store,
+#    and resolves the audio reference of multimodal results on read.
+#  - Schedules jobs as interactive or batch work with per-user fair
+#    queuing and admission control (see `app.services.task_scheduler`).
+#  - Resolves the status of many tasks at once with one MGET on the
+#    cache, one MGET on the Celery result backend and one pipelined
+#    cache write-back.
 #
 # =================================================================
 
+import base64
+import hashlib
 import json
+import logging
+from contextlib import contextmanager
 
 import redis
+from app.core.celery_app import celery_app
 from app.core.config import settings
-from app.tasks import long_llm_generation_task, multimodal_pipeline_task
+from app.services.blob_store import (
+    BlobNotFoundError,
+    get_blob_store,
+    is_blob_ref,
+    put_base64,
+)
+from app.services.result_cache import ResultCache
+from app.services.task_scheduler import INTERACTIVE, TaskScheduler
+from app.tasks import (
+    long_llm_generation_task,
+    multimodal_pipeline_task,
+    staged_multimodal_pipeline,
+    submission_key,
+)
+from celery import states
 from celery.result import AsyncResult
 
+logger = logging.getLogger(__name__)
+
 
 class AIOrchestratorService:
     """
@@ -35,40 +68,166 @@ class AIOrchestratorService:
 
     def __init__(self):
         self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.scheduler = TaskScheduler(self.redis_client)
+        self.result_cache = ResultCache()
+
+    @staticmethod
+    def task_id_for(
+        kind: str,
+        payload: str,
+        provider_config: dict,
+        user_id: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> str:
+        """
+        Content-addressed task id: the same job (or the same client
+        idempotency key) from the same user always maps to the same id.
+        """
+        if idempotency_key:
+            material = {"kind": kind, "user": user_id, "key": idempotency_key}
+        else:
+            material = {
+                "kind": kind,
+                "user": user_id,
+                "config": provider_config,
+                "payload": hashlib.sha256(payload.encode()).hexdigest(),
+            }
+        digest = hashlib.sha256(
+            json.dumps(material, sort_keys=True).encode()
+        ).hexdigest()
+        return f"{kind}-{digest[:32]}"
 
-    def submit_long_llm_generation(self, prompt: str) -> str:
+    def _claim(self, task_id: str) -> bool:
         """
-        Submits a long LLM generation task to the background worker.
+        Returns True if `task_id` should be enqueued now, False if the same
+        work is already queued, running or cached.
         """
-        task = long_llm_generation_task.delay(prompt)
-        return task.id
+        try:
+            if self.redis_client.exists(task_id):
+                return False  # Finished and cached
+            return bool(
+                self.redis_client.set(
+                    submission_key(task_id),
+                    "1",
+                    nx=True,
+                    ex=settings.TASK_IDEMPOTENCY_TTL_SECONDS,
+                )
+            )
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Idempotency check failed: {e}. Submitting anyway.")
+            return True
 
-    def submit_multimodal_pipeline(self, image_base64: str) -> str:
+    def _release(self, task_id: str) -> None:
+        """Gives up the claim of a job that was not enqueued."""
+        try:
+            self.redis_client.delete(submission_key(task_id))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Could not release the claim of task {task_id}: {e}")
+
+    @contextmanager
+    def _enqueuing(self, task_id: str):
+        """
+        Wraps the enqueue path of a claimed job. If anything fails before
+        the job is handed over (admission control, the blob store, the
+        broker), the claim is released, so a retry submits the job again
+        instead of getting the id of a job that never ran.
+        """
+        try:
+            yield
+        except Exception:
+            self._release(task_id)
+            raise
+
+    def _schedule(self, sig, user_id: str | None, priority: str):
+        """Hands a claimed job to the scheduler, or to Celery if Redis is down."""
+        try:
+            self.scheduler.submit(sig, user_id=user_id, priority=priority)
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Task scheduler unavailable: {e}. Submitting directly.")
+            sig.apply_async()
+
+    def submit_long_llm_generation(
+        self,
+        prompt: str,
+        user_id: str | None = None,
+        idempotency_key: str | None = None,
+        priority: str = INTERACTIVE,
+    ) -> str:
         """
-        Submits a multimodal pipeline task to the background worker.
+        Submits a long LLM generation task to the background worker, unless
+        the same job was already submitted.
+
+        Raises:
+            AdmissionError: If the job is rejected by admission control.
         """
-        task = multimodal_pipeline_task.delay(image_base64)
-        return task.id
+        task_id = self.task_id_for(
+            "llm",
+            prompt,
+            {"provider": settings.DEFAULT_LLM_PROVIDER},
+            user_id,
+            idempotency_key,
+        )
+        if not self._claim(task_id):
+            return task_id
+        with self._enqueuing(task_id):
+            sig = long_llm_generation_task.signature(
+                args=(prompt, user_id), task_id=task_id
+            )
+            self._schedule(sig, user_id, priority)
+        return task_id
+
+    def submit_multimodal_pipeline(
+        self,
+        image_base64: str,
+        user_id: str | None = None,
+        idempotency_key: str | None = None,
+        priority: str = INTERACTIVE,
+    ) -> str:
+        """
+        Submits a multimodal pipeline task to the background worker, or the
+        staged per-queue chain when MULTIMODAL_STAGED_PIPELINE is enabled,
+        unless the same job was already submitted.
+
+        Raises:
+            AdmissionError: If the job is rejected by admission control.
+        """
+        task_id = self.task_id_for(
+            "multimodal",
+            image_base64,
+            {
+                "vision": settings.DEFAULT_VISION_PROVIDER,
+                "llm": settings.DEFAULT_LLM_PROVIDER,
+                "tts": settings.DEFAULT_TTS_PROVIDER,
+            },
+            user_id,
+            idempotency_key,
+        )
+        if not self._claim(task_id):
+            return task_id
+        with self._enqueuing(task_id):
+            image_ref = put_base64(image_base64)
+            if settings.MULTIMODAL_STAGED_PIPELINE:
+                sig = staged_multimodal_pipeline(image_ref, task_id)
+            else:
+                sig = multimodal_pipeline_task.signature(
+                    args=(image_ref, user_id), task_id=task_id
+                )
+            self._schedule(sig, user_id, priority)
+        return task_id
 
     def get_task_status_and_result(self, task_id: str) -> dict:
         """
         Checks the status of a Celery task and retrieves its result if available.
-        It handles both plain text and JSON string results from Redis.
+        The audio of a multimodal result is returned inline as `audio_base64`.
         """
         # Check for cached result in Redis first
-        cached_result = self.redis_client.get(task_id)
-        if cached_result:
-            try:
-                # Try to parse as JSON for multimodal task results
-                result_data = json.loads(cached_result)
-                return {"task_id": task_id, "status": "SUCCESS", "result": result_data}
-            except json.JSONDecodeError:
-                # Fallback for plain text results
-                return {
-                    "task_id": task_id,
-                    "status": "SUCCESS",
-                    "result": cached_result,
-                }
+        cached_result = self.result_cache.get(task_id)
+        if cached_result is not None:
+            return {
+                "task_id": task_id,
+                "status": "SUCCESS",
+                "result": self._with_audio(cached_result),
+            }
 
         # If not in cache, check Celery backend
         task_result = AsyncResult(task_id)
@@ -78,18 +237,105 @@ class AIOrchestratorService:
 
         if task_result.successful():
             result = task_result.get().get("result")
-            # The result from the task is already a dict or string,
-            # so we serialize it for Redis if it's a dict.
-            if isinstance(result, dict):
-                redis_val = json.dumps(result)
-            else:
-                redis_val = result
-
-            self.redis_client.set(task_id, redis_val, ex=1200)
-            return {"task_id": task_id, "status": "SUCCESS", "result": result}
+            self.result_cache.set(task_id, result, ex=1200)
+            return {
+                "task_id": task_id,
+                "status": "SUCCESS",
+                "result": self._with_audio(result),
+            }
         else:
             return {
                 "task_id": task_id,
                 "status": "FAILURE",
                 "result": str(task_result.info),
             }
+
+    @staticmethod
+    def _with_audio(result):
+        """Replaces a result's `audio_ref` with the audio as `audio_base64`."""
+        if not isinstance(result, dict) or "audio_ref" not in result:
+            return result
+        result = dict(result)
+        ref = result.pop("audio_ref")
+        result["audio_base64"] = None
+        if is_blob_ref(ref):
+            try:
+                result["audio_base64"] = base64.b64encode(
+                    get_blob_store().get(ref)
+                ).decode()
+            except BlobNotFoundError:
+                logger.warning(f"Audio {ref} of a task result has expired.")
+        return result
+
+    @staticmethod
+    def _backend_states(task_ids: list[str]) -> dict[str, tuple[str, object]]:
+        """
+        Returns {task_id: (status, result)} from the Celery result backend,
+        in one MGET for key-value backends such as Redis.
+        """
+        backend = celery_app.backend
+        if not hasattr(backend, "mget"):
+            found = {}
+            for task_id in task_ids:
+                task_result = AsyncResult(task_id)
+                found[task_id] = (task_result.state, task_result.result)
+            return found
+        values = backend.mget([backend.get_key_for_task(id) for id in task_ids])
+        found = {}
+        for task_id, value in zip(task_ids, values):
+            if value is None:
+                found[task_id] = ("PENDING", None)
+            else:
+                meta = backend.decode_result(value)
+                found[task_id] = (meta["status"], meta["result"])
+        return found
+
+    def get_task_statuses(self, task_ids: list[str]) -> list[dict]:
+        """
+        Returns the status and result of each task, like
+        `get_task_status_and_result`, in at most three Redis round trips.
+        Audio stays a blob store reference (`audio_ref`), so that polling many
+        tasks does not download every result's audio.
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        if not task_ids:
+            return []
+        statuses = {}
+        missing = []
+        for task_id, cached_result in zip(task_ids, self.result_cache.mget(task_ids)):
+            if cached_result is not None:
+                statuses[task_id] = {
+                    "task_id": task_id,
+                    "status": "SUCCESS",
+                    "result": cached_result,
+                }
+            else:
+                missing.append(task_id)
+
+        if missing:
+            to_cache = {}
+            for task_id, (state, result) in self._backend_states(missing).items():
+                if state == "SUCCESS":
+                    if isinstance(result, dict):
+                        result = result.get("result")
+                    to_cache[task_id] = result
+                    statuses[task_id] = {
+                        "task_id": task_id,
+                        "status": "SUCCESS",
+                        "result": result,
+                    }
+                elif state in states.READY_STATES:
+                    statuses[task_id] = {
+                        "task_id": task_id,
+                        "status": "FAILURE",
+                        "result": str(result),
+                    }
+                else:
+                    statuses[task_id] = {
+                        "task_id": task_id,
+                        "status": "PENDING",
+                        "result": None,
+                    }
+            self.result_cache.set_many(to_cache, ex=1200)
+
+        return [statuses[task_id] for task_id in task_ids]
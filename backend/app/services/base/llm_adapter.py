@@ -25,6 +25,9 @@ from abc import ABC, abstractmethod
 class BaseLLMAdapter(ABC):
     """Abstract base class for LLM adapters."""
 
+    # Returned by `generate_response` when the provider call fails.
+    fallback_response: str = ""
+
     @abstractmethod
     async def generate_response(self, prompt: str) -> str:
         """
@@ -24,6 +24,9 @@ from abc import ABC, abstractmethod
 class BaseSTTAdapter(ABC):
     """Abstract base class for Speech-to-Text (STT) adapters."""
 
+    # Returned by `transcribe_audio` when the provider call fails.
+    fallback_response: str = ""
+
     @abstractmethod
     async def transcribe_audio(self, audio_base64: str) -> str:
         """
@@ -24,6 +24,9 @@ from abc import ABC, abstractmethod
 class BaseTTSAdapter(ABC):
     """Abstract base class for Text-to-Speech (TTS) adapters."""
 
+    # Returned by `generate_audio` when the provider call fails.
+    fallback_response: str = ""
+
     @abstractmethod
     async def generate_audio(self, text: str) -> str:
         """
@@ -24,6 +24,9 @@ from abc import ABC, abstractmethod
 class BaseVisionAdapter(ABC):
     """Abstract base class for Vision adapters."""
 
+    # Returned by `get_image_description` when the provider call fails.
+    fallback_response: str = ""
+
     @abstractmethod
     async def get_image_description(self, image_base64: str) -> str:
         """
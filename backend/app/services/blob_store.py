@@ -0,0 +1,156 @@
+# backend/app/services/blob_store.py
+# =================================================================
+#
+#                     Claim-Check Blob Store
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Keeps large task payloads (images, synthesized audio) out of broker
+#  messages, result records and caches. The payload is stored once and
+#  only a short reference travels with the task ("claim check").
+#
+#  Key Features:
+#  -------------
+#  - Content addressed: a blob is referenced as "blob:<sha256>", so
+#    identical payloads are stored once, and storing again only extends
+#    the expiry.
+#  - Every blob expires after BLOB_TTL_SECONDS, which must outlive the
+#    records that refer to it (the Celery result backend keeps results
+#    for one day by default).
+#  - Two backends (BLOB_STORE_BACKEND): Redis, or a directory shared by
+#    the API and the workers (BLOB_STORE_DIR).
+#  - Payloads are stored as raw bytes, a quarter smaller than base64.
+#
+# =================================================================
+
+import base64
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from functools import lru_cache
+
+import redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REF_PREFIX = "blob:"
+
+
+class BlobNotFoundError(KeyError):
+    """Raised when a referenced blob does not exist (or has expired)."""
+
+
+def is_blob_ref(value) -> bool:
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+def _digest(ref: str) -> str:
+    digest = ref[len(REF_PREFIX) :]
+    if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+        raise BlobNotFoundError(ref)
+    return digest
+
+
+class RedisBlobStore:
+    """Blobs as Redis strings with a TTL."""
+
+    def __init__(self, redis_client=None, ttl_seconds: int | None = None):
+        # Binary-safe client: blobs are raw bytes.
+        self.redis_client = redis_client or redis.from_url(settings.REDIS_URL)
+        self.ttl = ttl_seconds or settings.BLOB_TTL_SECONDS
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{REF_PREFIX}{digest}"
+        if not self.redis_client.set(key, data, ex=self.ttl, nx=True):
+            self.redis_client.expire(key, self.ttl)
+        return key
+
+    def get(self, ref: str) -> bytes:
+        data = self.redis_client.get(f"{REF_PREFIX}{_digest(ref)}")
+        if data is None:
+            raise BlobNotFoundError(ref)
+        return data
+
+    def purge_expired(self) -> int:
+        return 0  # Redis expires the keys itself.
+
+
+class FileBlobStore:
+    """Blobs as files under a directory; expiry follows the modification time."""
+
+    def __init__(self, root: str | None = None, ttl_seconds: int | None = None):
+        self.root = root or settings.BLOB_STORE_DIR
+        self.ttl = ttl_seconds or settings.BLOB_TTL_SECONDS
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            os.utime(path)  # Extends the expiry
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written under a temporary name, so readers never see half a blob.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return f"{REF_PREFIX}{digest}"
+
+    def get(self, ref: str) -> bytes:
+        path = self._path(_digest(ref))
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                raise BlobNotFoundError(ref)
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFoundError(ref)
+
+    def purge_expired(self) -> int:
+        """Deletes expired blobs and returns how many were deleted."""
+        cutoff = time.time() - self.ttl
+        purged = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        purged += 1
+                except FileNotFoundError:
+                    pass
+        return purged
+
+
+@lru_cache
+def get_blob_store() -> RedisBlobStore | FileBlobStore:
+    if settings.BLOB_STORE_BACKEND == "filesystem":
+        return FileBlobStore()
+    return RedisBlobStore()
+
+
+def put_base64(value: str) -> str:
+    """
+    Stores a base64 payload as raw bytes and returns its reference.
+
+    Raises:
+        binascii.Error: If `value` is not valid base64 (line breaks are
+            allowed).
+    """
+    return get_blob_store().put(base64.b64decode("".join(value.split()), validate=True))
+
+
+def load_base64(value: str) -> str:
+    """The base64 payload of a reference; inline base64 is returned as is."""
+    if not is_blob_ref(value):
+        return value
+    return base64.b64encode(get_blob_store().get(value)).decode()
@@ -0,0 +1,188 @@
+# backend/app/services/bm25_index.py
+# =================================================================
+#
+#                      BM25 Inverted Index
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Keyword retrieval for the knowledge base. Complements the vector
+#  index on queries that need exact matches (SKUs, error codes,
+#  identifiers) which embeddings tend to blur.
+#
+#  Key Features:
+#  -------------
+#  - Incremental: documents can be added, replaced and removed
+#    without rebuilding the index.
+#  - Compact postings: each term keeps two parallel unsigned int
+#    arrays (document ordinals and term frequencies).
+#  - Tokenizer keeps compound identifiers like "ERR-1042" or
+#    "SKU_77.B" intact, alongside their parts.
+#  - Removed documents are tombstoned and purged from the postings
+#    once they make up a large share of the index.
+#
+# =================================================================
+
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Callable, Iterable
+
+# Alphanumeric runs, optionally joined by - _ . / (e.g. "err-1042", "v2.1")
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+_SPLIT_RE = re.compile(r"[-_./]")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercases `text` and splits it into terms. Compound identifiers are
+    emitted whole and as their parts, so "ERR-1042" matches both an exact
+    "err-1042" query and a looser "error 1042" style one.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        if _SPLIT_RE.search(token):
+            tokens.extend(part for part in _SPLIT_RE.split(token) if part)
+    return tokens
+
+
+class BM25Index:
+    """
+    In-memory inverted index scored with Okapi BM25.
+
+    Documents are identified externally by string ids and internally by
+    dense ordinals, which is what the postings arrays store.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, compact_ratio: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._doc_ids: list[str | None] = []
+        self._doc_lengths = array("I")
+        self._ordinals: dict[str, int] = {}
+        self._total_length = 0
+        self._tombstones = 0
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._ordinals
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Indexes `text` under `doc_id`, replacing any previous version."""
+        if doc_id in self._ordinals:
+            self.remove(doc_id)
+
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        ordinal = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._doc_lengths.append(length)
+        self._ordinals[doc_id] = ordinal
+        self._total_length += length
+
+        # Ordinals only grow, so every postings list stays sorted.
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = (array("I"), array("I"))
+                self._postings[term] = postings
+            postings[0].append(ordinal)
+            postings[1].append(frequency)
+
+    def add_many(self, documents: Iterable[tuple[str, str]]) -> None:
+        for doc_id, text in documents:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: str) -> bool:
+        """Tombstones `doc_id`. Returns False if it was not indexed."""
+        ordinal = self._ordinals.pop(doc_id, None)
+        if ordinal is None:
+            return False
+        self._doc_ids[ordinal] = None
+        self._total_length -= self._doc_lengths[ordinal]
+        self._tombstones += 1
+        if self._tombstones > self.compact_ratio * len(self._doc_ids):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Drops tombstoned documents and renumbers the live ones densely."""
+        remap = array("I", [0]) * len(self._doc_ids)
+        doc_ids: list[str | None] = []
+        lengths = array("I")
+        for old, doc_id in enumerate(self._doc_ids):
+            if doc_id is None:
+                continue
+            remap[old] = len(doc_ids)
+            doc_ids.append(doc_id)
+            lengths.append(self._doc_lengths[old])
+
+        postings: dict[str, tuple[array, array]] = {}
+        for term, (ordinals, frequencies) in self._postings.items():
+            kept_ordinals, kept_frequencies = array("I"), array("I")
+            for ordinal, frequency in zip(ordinals, frequencies):
+                if self._doc_ids[ordinal] is not None:
+                    kept_ordinals.append(remap[ordinal])
+                    kept_frequencies.append(frequency)
+            if kept_ordinals:
+                postings[term] = (kept_ordinals, kept_frequencies)
+
+        self._postings = postings
+        self._doc_ids = doc_ids
+        self._doc_lengths = lengths
+        self._ordinals = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        self._tombstones = 0
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        allowed: Callable[[str], bool] | None = None,
+    ) -> list[tuple[str, float]]:
+        """
+        Returns up to `top_k` (doc_id, score) pairs, best first. `allowed`
+        optionally restricts the results to doc ids it returns True for.
+        """
+        live = len(self._ordinals)
+        if not live:
+            return []
+        average_length = self._total_length / live or 1.0
+
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            ordinals, frequencies = postings
+            # Postings still hold tombstones until the next compaction, so
+            # the document frequency is approximate (and capped) in between.
+            df = min(len(ordinals), live)
+            idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+            if idf <= 0:
+                continue
+            for ordinal, frequency in zip(ordinals, frequencies):
+                length_norm = (
+                    1 - self.b + self.b * (self._doc_lengths[ordinal] / average_length)
+                )
+                scores[ordinal] = scores.get(ordinal, 0.0) + idf * (
+                    frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                )
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for ordinal, score in ranked:
+            doc_id = self._doc_ids[ordinal]
+            if doc_id is None or (allowed is not None and not allowed(doc_id)):
+                continue
+            results.append((doc_id, score))
+            if len(results) >= top_k:
+                break
+        return results
@@ -0,0 +1,247 @@
+# backend/app/services/circuit_breaker.py
+# =================================================================
+#
+#                       Circuit Breaker
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Stops calls to an unhealthy dependency (a model provider or the
+#  database pool) from waiting for their full timeout. Once a
+#  dependency keeps failing, callers fail fast until it recovers.
+#
+#  Key Features:
+#  -------------
+#  - Closed / open / half-open state machine per dependency.
+#  - Opens after N consecutive failures; provider throttling (429) and
+#    local rate-limit rejections do not count as failures.
+#  - Optional background probe that checks recovery while open, so
+#    real traffic is only let through once the dependency answers.
+#  - Process-wide registry exposing state and metrics for monitoring.
+#
+# =================================================================
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict
+
+from app.core.config import settings
+from app.services.rate_limiter import RateLimitExceeded, is_rate_limit_error
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single dependency.
+
+    Args:
+        name: Identifier used in logs and metrics.
+        failure_threshold: Consecutive failures that open the circuit.
+        recovery_timeout: Seconds to stay open before trying again.
+        half_open_max_calls: Trial calls allowed while half-open.
+        probe: Optional coroutine function used to check recovery in the
+               background while the circuit is open. It should raise (or
+               return False) if the dependency is still unhealthy.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        probe: Callable[[], Awaitable[Any]] | None = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.probe = probe
+
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._probe_task: asyncio.Task | None = None
+
+        self._successes_total = 0
+        self._failures_total = 0
+        self._rejections_total = 0
+        self._state_changes_total = 0
+        self._last_failure: str | None = None
+
+    @property
+    def state(self) -> CircuitState:
+        # Without a live background probe, the circuit moves to half-open
+        # lazily once the recovery timeout has passed.
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+            and (self._probe_task is None or self._probe_task.done())
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def allows_request(self) -> bool:
+        """Returns True if a call would currently be let through."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN:
+            return self._half_open_in_flight < self.half_open_max_calls
+        return False
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self._state:
+            return
+        logger.warning(
+            f"Circuit '{self.name}' changed from {self._state.value} to {state.value}."
+        )
+        self._state = state
+        self._state_changes_total += 1
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+            self._start_probe()
+        elif state == CircuitState.CLOSED:
+            self._consecutive_failures = 0
+
+    def _start_probe(self) -> None:
+        if self.probe is None:
+            return
+        if self._probe_task is not None and not self._probe_task.done():
+            return
+        try:
+            self._probe_task = asyncio.get_running_loop().create_task(
+                self._probe_until_healthy()
+            )
+        except RuntimeError:
+            # No running loop; fall back to the lazy half-open transition.
+            self._probe_task = None
+
+    async def _probe_until_healthy(self) -> None:
+        delay = self.recovery_timeout
+        while self._state == CircuitState.OPEN:
+            await asyncio.sleep(delay)
+            try:
+                healthy = await self.probe()
+            except Exception as e:
+                logger.info(f"Circuit '{self.name}' probe failed: {e}")
+                healthy = False
+            if healthy is not False:
+                logger.info(f"Circuit '{self.name}' probe succeeded.")
+                self._transition(CircuitState.HALF_OPEN)
+                return
+            delay = min(delay * 2, self.recovery_timeout * 8)
+
+    def record_success(self) -> None:
+        self._successes_total += 1
+        self._consecutive_failures = 0
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self, error: BaseException) -> None:
+        self._failures_total += 1
+        self._consecutive_failures += 1
+        self._last_failure = f"{type(error).__name__}: {error}"
+        if self._state == CircuitState.HALF_OPEN or (
+            self._consecutive_failures >= self.failure_threshold
+        ):
+            self._transition(CircuitState.OPEN)
+
+    @staticmethod
+    def _counts_as_failure(error: BaseException) -> bool:
+        # Throttling means the dependency is up but busy (the rate limiter
+        # handles it), and other 4xx responses are caused by the request
+        # itself, so neither should trip the breaker.
+        if isinstance(error, (RateLimitExceeded, CircuitOpenError)):
+            return False
+        if is_rate_limit_error(error):
+            return False
+        status_code = getattr(error, "status_code", None)
+        return not (isinstance(status_code, int) and 400 <= status_code < 500)
+
+    @asynccontextmanager
+    async def guard(self):
+        """
+        Async context manager wrapping one call to the dependency.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or half-open with all
+            trial slots taken).
+        """
+        if not self.allows_request():
+            self._rejections_total += 1
+            raise CircuitOpenError(f"Circuit '{self.name}' is {self.state.value}.")
+
+        half_open = self._state == CircuitState.HALF_OPEN
+        if half_open:
+            self._half_open_in_flight += 1
+        try:
+            yield
+        except Exception as e:
+            if self._counts_as_failure(e):
+                self.record_failure(e)
+            raise
+        else:
+            self.record_success()
+        finally:
+            if half_open:
+                self._half_open_in_flight -= 1
+
+    def metrics(self) -> dict:
+        """Returns a snapshot of the breaker state and counters."""
+        return {
+            "name": self.name,
+            "state": self.state.value,
+            "consecutive_failures": self._consecutive_failures,
+            "successes_total": self._successes_total,
+            "failures_total": self._failures_total,
+            "rejections_total": self._rejections_total,
+            "state_changes_total": self._state_changes_total,
+            "last_failure": self._last_failure,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(
+    name: str, probe: Callable[[], Awaitable[Any]] | None = None
+) -> CircuitBreaker:
+    """
+    Returns the process-wide breaker for `name`, creating it on first use.
+    A probe passed later is attached if the breaker does not have one yet.
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name=name,
+            failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_SECONDS,
+            half_open_max_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+            probe=probe,
+        )
+        _breakers[name] = breaker
+    elif breaker.probe is None and probe is not None:
+        breaker.probe = probe
+    return breaker
+
+
+def get_circuit_breaker_metrics() -> list[dict]:
+    """Returns metrics for every breaker created in this process."""
+    return [breaker.metrics() for breaker in _breakers.values()]
@@ -13,20 +13,59 @@
 #
 #  Key Features:
 #  -------------
-#  - Uses `psycopg2` for connecting to the PostgreSQL database.
-#  - Manages a connection pool for efficient database access.
-#  - Provides async-safe methods for data insertion and retrieval
-#    using `asyncio.to_thread`.
+#  - Uses `asyncpg` for native async access to PostgreSQL, so queries
+#    run on the event loop instead of the default thread pool.
+#  - Manages a lazily created, configurable connection pool with
+#    prepared-statement caching and command/acquire timeouts.
+#  - Guards the pool with a circuit breaker so queries fail fast while
+#    the database is down; recovery is probed in the background.
+#  - Bulk ingestion through `COPY`, batched with one transaction per
+#    batch and optional upsert semantics.
+#  - Constant-memory reads: streaming over a server-side cursor and
+#    keyset-paginated pages, both with column projection.
 #
 # =================================================================
 
 import asyncio
-from contextlib import contextmanager
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterable, AsyncIterator, Iterable
 
-import psycopg2
+import asyncpg
 from app.core.config import settings
-from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
+from app.services.circuit_breaker import get_circuit_breaker
+
+
+def _quote_ident(name: str) -> str:
+    """Quotes a SQL identifier (table or column name)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+async def _batched(rows: Iterable[dict] | AsyncIterable[dict], size: int):
+    """Groups a sync or async stream of rows into lists of `size` rows."""
+    batch = []
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    else:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _dedupe(records: list[tuple], key_positions: list[int]) -> list[tuple]:
+    """Keeps the last record of each key (the values at `key_positions`)."""
+    latest = {}
+    for record in records:
+        latest[tuple(record[i] for i in key_positions)] = record
+    return list(latest.values())
 
 
 class DatabaseService:
@@ -34,46 +73,104 @@ class DatabaseService:
     Service for interacting with the PostgreSQL database.
     """
 
-    _pool = None
+    _pool: asyncpg.Pool | None = None
+    _pool_task: asyncio.Task | None = None
+    _pool_loop: asyncio.AbstractEventLoop | None = None
 
     def __init__(self):
+        self.circuit_breaker = get_circuit_breaker("postgres", probe=self._probe)
+
+    @staticmethod
+    async def _create_pool() -> asyncpg.Pool:
+        pool = await asyncpg.create_pool(
+            dsn=settings.DATABASE_URL,
+            min_size=settings.DATABASE_POOL_MIN_SIZE,
+            max_size=settings.DATABASE_POOL_MAX_SIZE,
+            timeout=settings.DATABASE_CONNECT_TIMEOUT_SECONDS,
+            command_timeout=settings.DATABASE_COMMAND_TIMEOUT_SECONDS,
+            statement_cache_size=settings.DATABASE_STATEMENT_CACHE_SIZE,
+            max_inactive_connection_lifetime=(
+                settings.DATABASE_MAX_INACTIVE_CONNECTION_LIFETIME_SECONDS
+            ),
+        )
+        print("Database connection pool created successfully.")
+        return pool
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        """
+        Returns the shared pool, creating it on first use. asyncpg pools are
+        bound to the event loop that created them, so a new pool is created
+        if the running loop changed (e.g. a worker that starts a fresh loop).
+        """
+        loop = asyncio.get_running_loop()
+        if DatabaseService._pool_loop is not loop:
+            if DatabaseService._pool is not None:
+                DatabaseService._pool.terminate()
+            DatabaseService._pool = None
+            DatabaseService._pool_task = None
+            DatabaseService._pool_loop = loop
+
         if DatabaseService._pool is None:
+            if DatabaseService._pool_task is None:
+                # Concurrent callers share one creation attempt.
+                DatabaseService._pool_task = loop.create_task(self._create_pool())
             try:
-                DatabaseService._pool = SimpleConnectionPool(
-                    minconn=1, maxconn=10, dsn=settings.DATABASE_URL
-                )
-                print("Database connection pool created successfully.")
-            except psycopg2.OperationalError as e:
+                DatabaseService._pool = await asyncio.shield(DatabaseService._pool_task)
+            except Exception as e:
                 print(f"Error creating database connection pool: {e}")
-                DatabaseService._pool = None  # Ensure pool is None if creation fails
+                DatabaseService._pool_task = None
+                raise
+        return DatabaseService._pool
 
-    @contextmanager
-    def _get_connection(self):
-        """Context manager to get a connection from the pool."""
-        if self._pool is None:
-            raise ConnectionError("Database pool is not initialized.")
+    @classmethod
+    async def close(cls):
+        """Closes the pool gracefully; used on application shutdown."""
+        if cls._pool is not None:
+            await cls._pool.close()
+        cls._pool = None
+        cls._pool_task = None
+        cls._pool_loop = None
 
-        conn = self._pool.getconn()
-        try:
+    @asynccontextmanager
+    async def _get_connection(self):
+        """Context manager to get a connection from the pool."""
+        pool = await self._get_pool()
+        async with pool.acquire(
+            timeout=settings.DATABASE_ACQUIRE_TIMEOUT_SECONDS
+        ) as conn:
             yield conn
-        finally:
-            self._pool.putconn(conn)
+
+    async def _probe(self):
+        """Health check used by the circuit breaker while it is open."""
+        async with self._get_connection() as conn:
+            await conn.fetchval("SELECT 1")
 
     async def _execute_query(self, query, params=None, fetch=None):
-        """Helper to run synchronous DB operations in a thread."""
+        """Runs a query on a pooled connection and returns dict rows."""
+        params = params or ()
+        async with self.circuit_breaker.guard():
+            async with self._get_connection() as conn:
+                if fetch == "one":
+                    row = await conn.fetchrow(query, *params)
+                    return dict(row) if row is not None else None
+                if fetch == "all":
+                    rows = await conn.fetch(query, *params)
+                    return [dict(row) for row in rows]
+                await conn.execute(query, *params)
+                return None
 
-        def db_op():
-            with self._get_connection() as conn:
-                with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                    cur.execute(query, params)
-                    if fetch == "one":
-                        return cur.fetchone()
-                    if fetch == "all":
-                        return cur.fetchall()
-                    conn.commit()
-                    return None
+    async def execute(self, query: str, params=None, fetch: str | None = None):
+        """
+        Runs a parameterised query (`$1`, `$2`, ... placeholders).
 
-        return await asyncio.to_thread(db_op)
+        Args:
+            query: The SQL to run. Without params it may hold several
+                   statements (e.g. a schema migration).
+            params: Positional query parameters.
+            fetch: "one" for a single dict row, "all" for a list of dict rows,
+                   None to return nothing.
+        """
+        return await self._execute_query(query, params, fetch=fetch)
 
     async def insert_data(self, table_name: str, data: dict):
         """
@@ -84,7 +181,7 @@ class DatabaseService:
         to prevent SQL injection.
         """
         columns = ", ".join(data.keys())
-        placeholders = ", ".join(["%s"] * len(data))
+        placeholders = ", ".join(f"${i}" for i in range(1, len(data) + 1))
         query = (
             f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders}) RETURNING id"
         )
@@ -103,7 +200,9 @@ class DatabaseService:
         query = f"SELECT * FROM {table_name}"
         params = None
         if query_params:
-            conditions = " AND ".join([f"{key} = %s" for key in query_params.keys()])
+            conditions = " AND ".join(
+                f"{key} = ${i}" for i, key in enumerate(query_params.keys(), start=1)
+            )
             query += f" WHERE {conditions}"
             params = tuple(query_params.values())
 
@@ -113,6 +212,200 @@ class DatabaseService:
             print(f"Error fetching data: {e}")
             return []
 
+    @staticmethod
+    def _build_select(
+        table_name: str,
+        query_params: dict | None,
+        columns: list[str] | None,
+        key_column: str,
+        after: Any,
+    ) -> tuple[str, list]:
+        """Builds a projected, keyset-ordered SELECT and its parameters."""
+        projection = (
+            ", ".join(_quote_ident(column) for column in columns) if columns else "*"
+        )
+        conditions = []
+        params = []
+        for key, value in (query_params or {}).items():
+            params.append(value)
+            conditions.append(f"{_quote_ident(key)} = ${len(params)}")
+        if after is not None:
+            params.append(after)
+            conditions.append(f"{_quote_ident(key_column)} > ${len(params)}")
+
+        query = f"SELECT {projection} FROM {_quote_ident(table_name)}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {_quote_ident(key_column)}"
+        return query, params
+
+    async def stream_data(
+        self,
+        table_name: str,
+        query_params: dict = None,
+        columns: list[str] | None = None,
+        key_column: str = "id",
+        after: Any = None,
+        fetch_size: int | None = None,
+        as_dict: bool = False,
+    ) -> AsyncIterator:
+        """
+        Streams records through a server-side cursor in constant memory.
+
+        Rows are fetched `fetch_size` at a time inside a read-only
+        transaction, ordered by `key_column`. Pass the last key seen as
+        `after` to resume an interrupted export or re-index.
+
+        Args:
+            table_name: The table to read.
+            query_params: Optional equality filters.
+            columns: Columns to project. Defaults to all columns.
+            key_column: Unique, indexed column used for ordering and resuming.
+            after: Only rows with `key_column` greater than this are returned.
+            fetch_size: Rows per round trip. Defaults to the setting.
+            as_dict: Yield plain dicts instead of asyncpg `Record` objects
+                     (which already support `row["column"]` access).
+
+        Yields:
+            One record (or dict) per row.
+        """
+        query, params = self._build_select(
+            table_name, query_params, columns, key_column, after
+        )
+        fetch_size = fetch_size or settings.DATABASE_STREAM_FETCH_SIZE
+        async with self.circuit_breaker.guard():
+            async with self._get_connection() as conn:
+                async with conn.transaction(readonly=True):
+                    async for record in conn.cursor(
+                        query, *params, prefetch=fetch_size
+                    ):
+                        yield dict(record) if as_dict else record
+
+    async def fetch_page(
+        self,
+        table_name: str,
+        query_params: dict = None,
+        columns: list[str] | None = None,
+        key_column: str = "id",
+        after: Any = None,
+        limit: int = 100,
+    ) -> tuple[list[dict], Any]:
+        """
+        Fetches one keyset-paginated page. Unlike OFFSET pagination, every
+        page costs the same index seek regardless of how deep it is.
+
+        Returns:
+            The page rows as dicts and the key to pass as `after` for the
+            next page (None when there are no more rows).
+        """
+        if columns and key_column not in columns:
+            columns = [key_column, *columns]
+        query, params = self._build_select(
+            table_name, query_params, columns, key_column, after
+        )
+        query += f" LIMIT {int(limit)}"
+        rows = await self._execute_query(query, params, fetch="all")
+        next_after = rows[-1][key_column] if len(rows) == limit else None
+        return rows, next_after
+
+    async def bulk_insert(
+        self,
+        table_name: str,
+        rows: Iterable[dict] | AsyncIterable[dict],
+        conflict_columns: list[str] | None = None,
+        batch_size: int | None = None,
+    ) -> dict:
+        """
+        Writes a stream of rows with `COPY FROM STDIN`, one transaction per batch.
+
+        Without `conflict_columns` rows are copied straight into the table.
+        With them, each batch is copied into a temporary staging table and
+        merged with `INSERT ... ON CONFLICT DO UPDATE`, so re-ingesting the
+        same ids updates the existing rows instead of failing. Rows of a
+        batch with the same key are merged first (the last one wins), as one
+        statement cannot update a row twice.
+
+        Args:
+            table_name: The target table.
+            rows: Dicts sharing the same keys (taken from the first row).
+                  May be a plain or an async iterable, so callers can stream.
+            conflict_columns: Unique key columns that enable upsert semantics.
+            batch_size: Rows per batch/transaction. Defaults to the setting.
+
+        Returns:
+            A dict with the number of rows and batches written (after merging
+            rows with the same key), the elapsed
+            seconds and the resulting rows per second.
+
+        Raises:
+            Exception: Errors from a failed batch propagate; batches that were
+            already committed stay committed.
+        """
+        batch_size = batch_size or settings.DATABASE_BULK_BATCH_SIZE
+        total_rows = 0
+        batches = 0
+        columns: list[str] | None = None
+        start = time.monotonic()
+
+        async for batch in _batched(rows, batch_size):
+            if columns is None:
+                columns = list(batch[0].keys())
+            records = [tuple(row.get(column) for column in columns) for row in batch]
+            if conflict_columns:
+                records = _dedupe(records, [columns.index(c) for c in conflict_columns])
+            async with self.circuit_breaker.guard():
+                async with self._get_connection() as conn:
+                    async with conn.transaction():
+                        if conflict_columns:
+                            await self._upsert_batch(
+                                conn, table_name, columns, conflict_columns, records
+                            )
+                        else:
+                            await conn.copy_records_to_table(
+                                table_name, records=records, columns=columns
+                            )
+            total_rows += len(records)
+            batches += 1
+
+        seconds = time.monotonic() - start
+        rows_per_second = total_rows / seconds if seconds > 0 else 0.0
+        print(
+            f"Bulk insert into {table_name}: {total_rows} rows in {batches} "
+            f"batches, {seconds:.2f}s ({rows_per_second:.0f} rows/s)."
+        )
+        return {
+            "rows": total_rows,
+            "batches": batches,
+            "seconds": seconds,
+            "rows_per_second": rows_per_second,
+        }
+
+    @staticmethod
+    async def _upsert_batch(conn, table_name, columns, conflict_columns, records):
+        """COPYs a batch into a staging table and merges it into the target."""
+        stage = f"_stage_{table_name}"
+        column_list = ", ".join(_quote_ident(column) for column in columns)
+        updates = [column for column in columns if column not in conflict_columns]
+        if updates:
+            on_conflict = "DO UPDATE SET " + ", ".join(
+                f"{_quote_ident(column)} = EXCLUDED.{_quote_ident(column)}"
+                for column in updates
+            )
+        else:
+            on_conflict = "DO NOTHING"
+
+        await conn.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {_quote_ident(stage)} "
+            f"(LIKE {_quote_ident(table_name)} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        await conn.copy_records_to_table(stage, records=records, columns=columns)
+        await conn.execute(
+            f"INSERT INTO {_quote_ident(table_name)} ({column_list}) "
+            f"SELECT {column_list} FROM {_quote_ident(stage)} "
+            f"ON CONFLICT ({', '.join(_quote_ident(c) for c in conflict_columns)}) "
+            f"{on_conflict}"
+        )
+
 
 # Initialize a singleton instance
 database_service = DatabaseService()
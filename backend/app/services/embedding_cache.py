@@ -0,0 +1,81 @@
+# backend/app/services/embedding_cache.py
+# =================================================================
+#
+#                   Persistent Chunk Embedding Cache
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Keeps chunk embeddings in Redis, outside the process that computed
+#  them. The vector index is held in memory, so a restarted API
+#  process rebuilds it from the `knowledge_base` table; with this cache
+#  the rebuild reads the vectors back instead of re-embedding every
+#  row.
+#
+#  Key Features:
+#  -------------
+#  - Keyed by embedding model and chunk id (chunk ids are derived from
+#    the chunk text), so a changed chunk or model is a miss.
+#  - Vectors are stored as float32 bytes; batched reads (one MGET) and
+#    pipelined writes.
+#  - Best effort: if Redis is unavailable, every lookup is a miss and
+#    chunks are embedded as before.
+#
+# =================================================================
+
+import logging
+
+import numpy as np
+import redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(model_name: str, chunk_id: str) -> str:
+    return f"embedding:{model_name}:{chunk_id}"
+
+
+class EmbeddingCache:
+    """
+    Chunk vectors in Redis, keyed by embedding model and chunk id.
+    """
+
+    def __init__(self, redis_client=None, ttl_seconds: int | None = None):
+        # Binary client: vectors are bytes.
+        self.redis_client = redis_client or redis.from_url(settings.REDIS_URL)
+        self.ttl = ttl_seconds or settings.EMBEDDING_CACHE_TTL_SECONDS
+
+    def get_many(self, model_name: str, chunk_ids: list[str]) -> dict:
+        """The cached vectors of `chunk_ids` that exist, by chunk id."""
+        if not chunk_ids:
+            return {}
+        try:
+            values = self.redis_client.mget(
+                [embedding_key(model_name, chunk_id) for chunk_id in chunk_ids]
+            )
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Embedding cache unavailable: {e}")
+            return {}
+        return {
+            chunk_id: np.frombuffer(value, dtype=np.float32).tolist()
+            for chunk_id, value in zip(chunk_ids, values)
+            if value is not None
+        }
+
+    def set_many(self, model_name: str, vectors: dict) -> None:
+        """Caches (chunk id -> vector) in one pipelined round trip."""
+        if not vectors:
+            return
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for chunk_id, vector in vectors.items():
+                pipeline.set(
+                    embedding_key(model_name, chunk_id),
+                    np.asarray(vector, dtype=np.float32).tobytes(),
+                    ex=self.ttl,
+                )
+            pipeline.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Could not cache embeddings: {e}")
@@ -0,0 +1,248 @@
+# backend/app/services/embedding_migration.py
+# =================================================================
+#
+#                 Embedding Model Migration Service
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Moves the knowledge base to a new embedding model without taking
+#  retrieval offline. Vectors of the new model are built next to the
+#  old ones and queries switch over only once they are complete.
+#
+#  Key Features:
+#  -------------
+#  - The new model gets its own vector namespace; the retrieval
+#    service dual-writes new and changed chunks to both namespaces
+#    while the migration runs.
+#  - A background backfill re-embeds the existing chunks in batches,
+#    throttled by a token bucket so it does not starve live traffic.
+#  - Progress (total, done, state, error) can be polled.
+#  - Cut-over is a single attribute swap: every query uses either the
+#    old or the new namespace, never a mix. The old namespace is
+#    dropped afterwards.
+#  - A running migration can be aborted; the old model stays active.
+#  - The active model and the migration's progress are shared through
+#    Redis (see `app.services.embedding_model_registry`): one migration
+#    runs at a time across processes, any process can report or abort
+#    it, and the other processes switch to the new model afterwards.
+#
+# =================================================================
+
+import asyncio
+import logging
+import math
+import time
+from functools import lru_cache
+
+import redis
+from app.core.config import settings
+from app.services.rate_limiter import TokenBucket
+from app.services.retrieval_service import (
+    EmbeddingNamespace,
+    RetrievalService,
+    get_retrieval_service,
+)
+from app.services.vector_db_service import drop_namespace
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationAborted(Exception):
+    """Another process released the migration lock to stop the migration."""
+
+
+class EmbeddingMigration:
+    """
+    Runs one embedding model migration at a time for a RetrievalService.
+    With a model registry on the retrieval service, one migration runs at a
+    time across processes, and its progress and result are shared.
+    """
+
+    def __init__(
+        self,
+        retrieval_service: RetrievalService | None = None,
+        batch_size: int | None = None,
+        rate: float | None = None,
+    ):
+        self.retrieval_service = retrieval_service or get_retrieval_service()
+        self.registry = self.retrieval_service.model_registry
+        self.batch_size = batch_size or settings.EMBEDDING_BACKFILL_BATCH_SIZE
+        self.rate = rate or settings.EMBEDDING_BACKFILL_RATE
+        self._task: asyncio.Task | None = None
+        self.progress: dict = dict(state="idle")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _shared(self, method: str, *args):
+        """Calls a registry method off the event loop (no-op without one)."""
+        if self.registry is None:
+            return None
+        return await asyncio.to_thread(getattr(self.registry, method), *args)
+
+    async def _save_progress(self) -> None:
+        try:
+            await self._shared("save_migration", dict(self.progress))
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Could not save embedding migration progress: {e}")
+
+    async def start(
+        self, model_name: str, namespace: EmbeddingNamespace | None = None
+    ) -> dict:
+        """
+        Starts migrating to `model_name` in the background and returns the
+        initial progress.
+
+        Raises:
+            ValueError: If a migration is already running (in this or
+                another process) or the model is already active.
+        """
+        if self.running:
+            raise ValueError(
+                f"A migration to '{self.progress['target']}' is already running."
+            )
+        source = self.retrieval_service.active
+        if model_name == source.name:
+            raise ValueError(f"'{model_name}' is already the active embedding model.")
+        if self.registry is not None and not await self._shared(
+            "acquire_migration_lock"
+        ):
+            raise ValueError("An embedding migration is already running.")
+
+        try:
+            target = namespace or await self.retrieval_service.new_namespace(model_name)
+        except BaseException:
+            await self._shared("release_migration_lock")
+            raise
+        # New writes go to both namespaces from here on, so the backfill
+        # only has to cover chunks that already exist.
+        self.retrieval_service.begin_migration(target)
+        self.progress = dict(
+            state="running",
+            source=source.name,
+            target=target.name,
+            total=len(source.vector_db.index),
+            done=0,
+            started_at=time.time(),
+            finished_at=None,
+            error=None,
+        )
+        await self._save_progress()
+        self._task = asyncio.create_task(self._run(source, target))
+        return self.progress
+
+    async def status(self) -> dict:
+        """The progress of the latest migration, in any process."""
+        try:
+            shared = await self._shared("migration")
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Could not read embedding migration progress: {e}")
+            shared = None
+        return self.progress if self.running or shared is None else shared
+
+    async def abort(self) -> dict:
+        """
+        Stops a running migration and discards the target namespace. A
+        migration running in another process is asked to stop, and stops
+        after its current batch.
+        """
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            return self.progress
+        progress = await self.status()
+        if progress.get("state") == "running":
+            await self._shared("release_migration_lock")
+            progress = {**progress, "state": "aborting"}
+            await self._shared("save_migration", progress)
+        return progress
+
+    async def _renew_lock(self) -> None:
+        if self.registry is not None and not await self._shared("renew_migration_lock"):
+            raise MigrationAborted()
+
+    async def _backfill(
+        self, source: EmbeddingNamespace, target: EmbeddingNamespace
+    ) -> None:
+        bucket = TokenBucket(rate=self.rate, capacity=self.batch_size)
+        source_index, target_index = source.vector_db.index, target.vector_db.index
+        while True:
+            missing = [id for id in source_index.ids() if id not in target_index]
+            if not missing:
+                return
+            self.progress["total"] = self.progress["done"] + len(missing)
+            for offset in range(0, len(missing), self.batch_size):
+                batch = []
+                for id in missing[offset : offset + self.batch_size]:
+                    metadata = source_index.get_metadata(id)
+                    if metadata is not None and id not in target_index:
+                        batch.append((id, metadata))
+                if not batch:
+                    continue
+                for _ in batch:
+                    await bucket.acquire(deadline=math.inf)
+                # Through the embedding cache, so the processes that follow
+                # the migration index the new model without embedding.
+                vectors, _ = await target.vectors(
+                    [(id, metadata["text"]) for id, metadata in batch]
+                )
+                for id, metadata in batch:
+                    # Skip chunks removed from the knowledge base meanwhile.
+                    if id in source_index:
+                        await target.vector_db.upsert_vector(
+                            id=id, vector=vectors[id], metadata=metadata
+                        )
+                self.progress["done"] += len(batch)
+                await self._renew_lock()
+                await self._save_progress()
+
+    async def _run(self, source: EmbeddingNamespace, target: EmbeddingNamespace):
+        try:
+            await self._backfill(source, target)
+            # Other processes switch to the new model on their next index
+            # refresh.
+            await self._shared("set_active_model", target.name)
+            # No await from here on: the switch happens atomically with
+            # respect to queries and writes on the event loop.
+            source_ids = set(source.vector_db.index.ids())
+            for id in target.vector_db.index.ids():
+                if id not in source_ids:
+                    target.vector_db.index.delete(id)
+            self.retrieval_service.switch_to(target)
+            drop_namespace(source.vector_db.namespace)
+            self.progress.update(state="completed", finished_at=time.time())
+            logger.info(
+                f"Embedding migration from '{source.name}' to '{target.name}' "
+                f"completed ({self.progress['done']} chunks re-embedded)."
+            )
+        except (asyncio.CancelledError, MigrationAborted) as e:
+            self.retrieval_service.abort_migration()
+            drop_namespace(target.vector_db.namespace)
+            self.progress.update(state="aborted", finished_at=time.time())
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        except Exception as e:
+            logger.error(f"Embedding migration to '{target.name}' failed: {e}")
+            self.retrieval_service.abort_migration()
+            drop_namespace(target.vector_db.namespace)
+            self.progress.update(state="failed", finished_at=time.time(), error=str(e))
+        finally:
+            await self._finish()
+
+    async def _finish(self) -> None:
+        await self._save_progress()
+        try:
+            await self._shared("release_migration_lock")
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Could not release the embedding migration lock: {e}")
+
+
+@lru_cache
+def get_embedding_migration() -> EmbeddingMigration:
+    return EmbeddingMigration()
@@ -0,0 +1,93 @@
+# backend/app/services/embedding_model_registry.py
+# =================================================================
+#
+#                  Shared Embedding Model State
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Holds the embedding model that queries and indexing use, and the
+#  state of any embedding model migration, in Redis. Every API process
+#  (and the Celery workers) read it from here, so they all embed with
+#  the same model, including after a restart or a migration run by
+#  another process.
+#
+#  Key Features:
+#  -------------
+#  - The active model; unset means DEFAULT_EMBEDDING_MODEL.
+#  - The progress of the latest migration, readable by any process.
+#  - A migration lock with a lease: one migration runs at a time
+#    across processes. The running migration renews the lease after
+#    each batch; deleting the lock asks it to stop, and a crashed
+#    migration's lock expires.
+#
+# =================================================================
+
+import json
+
+import redis
+from app.core.config import settings
+
+ACTIVE_MODEL_KEY = "embedding_model:active"
+MIGRATION_KEY = "embedding_model:migration"
+MIGRATION_LOCK_KEY = "embedding_model:migration_lock"
+
+
+class EmbeddingModelRegistry:
+    """
+    The active embedding model and migration state, shared through Redis.
+    Redis errors are raised to the caller.
+    """
+
+    def __init__(self, redis_client=None):
+        self.redis_client = redis_client or redis.from_url(
+            settings.REDIS_URL, decode_responses=True
+        )
+
+    def active_model(self) -> str | None:
+        """The model set by the last completed migration, if any."""
+        return self.redis_client.get(ACTIVE_MODEL_KEY)
+
+    def set_active_model(self, model_name: str) -> None:
+        self.redis_client.set(ACTIVE_MODEL_KEY, model_name)
+
+    def migration(self) -> dict | None:
+        """
+        The progress of the latest migration. A migration still marked as
+        running whose lock expired was interrupted (e.g. its process died).
+        """
+        value = self.redis_client.get(MIGRATION_KEY)
+        if value is None:
+            return None
+        progress = json.loads(value)
+        if progress.get("state") == "running" and not self.redis_client.exists(
+            MIGRATION_LOCK_KEY
+        ):
+            progress.update(state="failed", error="Migration was interrupted.")
+        return progress
+
+    def save_migration(self, progress: dict) -> None:
+        self.redis_client.set(MIGRATION_KEY, json.dumps(progress))
+
+    def acquire_migration_lock(self) -> bool:
+        """Takes the migration lock; False if another migration holds it."""
+        return bool(
+            self.redis_client.set(
+                MIGRATION_LOCK_KEY,
+                "1",
+                nx=True,
+                ex=settings.EMBEDDING_MIGRATION_LEASE_SECONDS,
+            )
+        )
+
+    def renew_migration_lock(self) -> bool:
+        """Extends the lease; False if the lock was released (an abort)."""
+        return bool(
+            self.redis_client.expire(
+                MIGRATION_LOCK_KEY, settings.EMBEDDING_MIGRATION_LEASE_SECONDS
+            )
+        )
+
+    def release_migration_lock(self) -> None:
+        self.redis_client.delete(MIGRATION_LOCK_KEY)
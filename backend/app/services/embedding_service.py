@@ -15,13 +15,22 @@
 #  -------------
 #  - Loads a specified sentence transformer model.
 #  - Provides an asynchronous method to generate embeddings for text.
-#  - Caches the loaded model for efficient reuse.
+#  - Caches loaded models for efficient reuse; several models can be
+#    loaded side by side (e.g. during an embedding model migration).
+#  - Counts tokens with the model's own tokenizer (for chunking).
+#  - Runs on PyTorch or, for CPU-only nodes, on ONNX Runtime with an
+#    optionally int8-quantized export (EMBEDDING_BACKEND setting).
+#  - Can run the model in the inference worker pool instead of the
+#    API process (INFERENCE_WORKERS setting).
 #
 # =================================================================
 
 import asyncio
 
 from app.core.config import settings
+from app.services.inference_pool import get_inference_pool
+from app.services.onnx_embedding import OnnxSentenceEncoder
+from app.utils.chunking import estimate_tokens
 from sentence_transformers import SentenceTransformer
 
 
@@ -30,18 +39,62 @@ class EmbeddingService:
     Service for generating vector embeddings from text.
     """
 
+    # The primary model (loaded by the first instance) and any additional
+    # models, e.g. the target of an embedding model migration.
     _model = None
+    _model_name: str | None = None
+    _other_models: dict = {}
 
     def __init__(self, model_name: str | None = None):
         self.model_name = model_name or settings.DEFAULT_EMBEDDING_MODEL
+        # With the worker pool the model is loaded in the workers, and token
+        # counts fall back to the estimate.
+        self.inference_pool = get_inference_pool()
+        if self.inference_pool is not None:
+            return
         if EmbeddingService._model is None:
-            try:
-                # Load model only once
-                EmbeddingService._model = SentenceTransformer(self.model_name)
-                print(f"Embedding model '{self.model_name}' loaded successfully.")
-            except Exception as e:
-                print(f"Error loading embedding model '{self.model_name}': {e}")
-                EmbeddingService._model = None
+            EmbeddingService._model_name = self.model_name
+            EmbeddingService._model = self._load(self.model_name)
+        elif (
+            self.model_name != EmbeddingService._model_name
+            and self.model_name not in EmbeddingService._other_models
+        ):
+            EmbeddingService._other_models[self.model_name] = self._load(
+                self.model_name
+            )
+
+    @staticmethod
+    def _load(model_name: str):
+        try:
+            # Load model only once
+            if settings.EMBEDDING_BACKEND == "onnx":
+                model = OnnxSentenceEncoder.from_pretrained(model_name)
+            else:
+                model = SentenceTransformer(model_name)
+            print(
+                f"Embedding model '{model_name}' loaded successfully "
+                f"({settings.EMBEDDING_BACKEND} backend)."
+            )
+            return model
+        except Exception as e:
+            print(f"Error loading embedding model '{model_name}': {e}")
+            return None
+
+    @property
+    def model(self):
+        if self.model_name == EmbeddingService._model_name:
+            return EmbeddingService._model
+        return EmbeddingService._other_models.get(self.model_name)
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Number of tokens the model sees for `text`, falling back to an
+        estimate when the model (or its tokenizer) is unavailable.
+        """
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return estimate_tokens(text)
+        return len(tokenizer.tokenize(text))
 
     async def embed_text(self, texts: str | list[str]) -> list[list[float]]:
         """
@@ -53,11 +106,23 @@ class EmbeddingService:
         Returns:
             A list of lists of floats, where each inner list is an embedding.
         """
-        if EmbeddingService._model is None:
+        if self.inference_pool is not None:
+            if isinstance(texts, str):
+                (embedding,) = await self.inference_pool.submit(
+                    "embedding", self.model_name, [texts]
+                )
+                return embedding.tolist()
+            embeddings = await self.inference_pool.submit(
+                "embedding", self.model_name, texts
+            )
+            return [embedding.tolist() for embedding in embeddings]
+
+        model = self.model
+        if model is None:
             raise RuntimeError("Embedding model is not loaded.")
 
         # SentenceTransformer's encode method is synchronous, so run in a thread pool
-        embeddings = await asyncio.to_thread(EmbeddingService._model.encode, texts)
+        embeddings = await asyncio.to_thread(model.encode, texts)
 
         # Convert numpy arrays to lists of floats for JSON serialization
         if isinstance(embeddings, list):
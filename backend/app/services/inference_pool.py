@@ -0,0 +1,359 @@
+# backend/app/services/inference_pool.py
+# =================================================================
+#
+#                   Local Inference Worker Pool
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Runs CPU-bound local models (Hugging Face pipelines, embedding
+#  models) in a pool of long-lived worker processes instead of the
+#  API process's default thread pool, where concurrent requests
+#  oversubscribe the cores and stall the event loop.
+#
+#  Key Features:
+#  -------------
+#  - One process per core group, pinned to its cores, with torch /
+#    OpenMP thread counts set to the size of the group.
+#  - Each worker loads a model on first use and keeps it loaded.
+#  - Requests for the same (task, model, arguments) that arrive within
+#    a few milliseconds are sent to a worker as one batch.
+#  - Batches go to the least busy worker, preferring workers that
+#    already have the model loaded.
+#  - Queues are fed by background threads, so the event loop never
+#    blocks on IPC; a reader thread resolves results on the caller's
+#    event loop.
+#  - Crashed workers are detected, their batches fail with
+#    `InferenceError`, and they are replaced.
+#
+#  Notes:
+#  ------
+#  - Disabled when INFERENCE_WORKERS is 0; callers then run their
+#    models in-process as before.
+#  - The API starts the pool on application startup. Elsewhere (e.g.
+#    Celery workers) it starts on first use, in a worker thread.
+#  - Model loaders run in the workers and are referenced by
+#    "module:function" path, so they can be imported after spawn.
+#
+# =================================================================
+
+import asyncio
+import importlib
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from functools import lru_cache
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Task name -> "module:function" returning a callable(inputs, **kwargs) -> outputs
+DEFAULT_LOADERS = {
+    "text-generation": "app.services.inference_pool:load_hf_pipeline",
+    "automatic-speech-recognition": "app.services.inference_pool:load_hf_pipeline",
+    "image-to-text": "app.services.inference_pool:load_hf_pipeline",
+    "embedding": "app.services.inference_pool:load_embedding_model",
+}
+
+
+class InferenceError(Exception):
+    """Raised when a worker fails to run a batch."""
+
+
+# --- Worker side ---
+
+
+def load_hf_pipeline(task: str, model_name: str):
+    from transformers import pipeline
+
+    model = pipeline(task, model=model_name, token=settings.HF_API_TOKEN)
+    if task != "image-to-text":
+        return model
+
+    def describe(images, **kwargs):
+        from io import BytesIO
+
+        from PIL import Image
+
+        return model([Image.open(BytesIO(image)) for image in images], **kwargs)
+
+    return describe
+
+
+def load_embedding_model(task: str, model_name: str):
+    if settings.EMBEDDING_BACKEND == "onnx":
+        from app.services.onnx_embedding import OnnxSentenceEncoder
+
+        model = OnnxSentenceEncoder.from_pretrained(model_name)
+    else:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name)
+    return lambda texts, **kwargs: list(model.encode(texts, **kwargs))
+
+
+def _resolve_loader(path: str):
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _limit_threads(cores: list[int]) -> None:
+    """Pins this process to `cores` and sizes the math libraries' thread pools."""
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    threads = str(max(1, len(cores)))
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = threads
+    try:
+        import torch
+
+        torch.set_num_threads(int(threads))
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+
+def _worker_main(requests, results, cores: list[int], loaders: dict) -> None:
+    """Worker process loop: runs batches until it receives None."""
+    _limit_threads(cores)
+    models = {}
+    while True:
+        message = requests.get()
+        if message is None:
+            return
+        batch_id, task, model_name, inputs, kwargs = message
+        try:
+            model = models.get((task, model_name))
+            if model is None:
+                loader = _resolve_loader(loaders[task])
+                model = models[(task, model_name)] = loader(task, model_name)
+            outputs = list(model(inputs, **kwargs))
+            if len(outputs) != len(inputs):
+                raise ValueError(
+                    f"Model returned {len(outputs)} outputs for {len(inputs)} inputs."
+                )
+            results.put((batch_id, True, outputs))
+        except Exception as e:
+            results.put((batch_id, False, f"{type(e).__name__}: {e}"))
+
+
+# --- API process side ---
+
+
+class _Worker:
+    def __init__(self, context, cores: list[int], results, loaders: dict):
+        self.cores = cores
+        self.requests = context.Queue()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(self.requests, results, cores, loaders),
+            daemon=True,
+        )
+        self.process.start()
+        self.models: set[tuple[str, str]] = set()
+        self.in_flight: set[int] = set()
+
+
+class _Batch:
+    def __init__(self, loop, jobs: list[tuple[list, asyncio.Future]]):
+        self.loop = loop
+        self.jobs = jobs
+        self.worker: _Worker | None = None
+
+
+def _core_groups(workers: int) -> list[list[int]]:
+    """Splits the CPUs available to this process into `workers` groups."""
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    if workers > len(cores):
+        return [[cores[i % len(cores)]] for i in range(workers)]
+    size, extra = divmod(len(cores), workers)
+    groups, start = [], 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+
+class InferencePool:
+    """
+    Pool of pinned worker processes that run batched model inference.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_batch_size: int | None = None,
+        max_wait_ms: float | None = None,
+        loaders: dict[str, str] | None = None,
+    ):
+        self.size = workers or settings.INFERENCE_WORKERS
+        self.max_batch_size = max_batch_size or settings.INFERENCE_MAX_BATCH_SIZE
+        self.max_wait = (
+            settings.INFERENCE_MAX_BATCH_WAIT_MS if max_wait_ms is None else max_wait_ms
+        ) / 1000
+        self.loaders = {**DEFAULT_LOADERS, **(loaders or {})}
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: list[_Worker] = []
+        self._batches: dict[int, _Batch] = {}
+        self._batch_ids = itertools.count()
+        self._pending: dict[tuple, list[tuple[list, asyncio.Future]]] = {}
+        self._lock = threading.Lock()
+        self._results = None
+        self._reader: threading.Thread | None = None
+        self._closed = False
+
+    def start(self) -> None:
+        """Starts the worker processes and the result reader (idempotent)."""
+        with self._lock:
+            if self._workers:
+                return
+            self._closed = False
+            self._results = self._context.Queue()
+            self._workers = [
+                _Worker(self._context, cores, self._results, self.loaders)
+                for cores in _core_groups(self.size)
+            ]
+            self._reader = threading.Thread(
+                target=self._read_results, name="inference-pool-reader", daemon=True
+            )
+            self._reader.start()
+        logger.info(f"Started {self.size} inference worker processes.")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._closed = True
+        for worker in workers:
+            worker.requests.put(None)
+        for worker in workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        if self._reader is not None:
+            self._results.put(None)
+            self._reader.join(timeout=5)
+            self._reader = None
+        for batch_id in list(self._batches):
+            self._finish(batch_id, False, "Inference pool was shut down.")
+
+    async def submit(self, task: str, model_name: str, inputs: list, **kwargs) -> list:
+        """
+        Runs `inputs` through `model_name` for `task` in a worker and returns
+        one output per input. Concurrent calls with the same task, model and
+        keyword arguments are batched together.
+
+        Raises:
+            InferenceError: If the worker fails or dies while running the batch.
+        """
+        if not inputs:
+            return []
+        if not self._workers:
+            # Normally started on application startup; spawning processes
+            # blocks, so it never runs on the event loop.
+            await asyncio.to_thread(self.start)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (loop, task, model_name, tuple(sorted(kwargs.items())))
+        jobs = self._pending.setdefault(key, [])
+        jobs.append((list(inputs), future))
+        if sum(len(job_inputs) for job_inputs, _ in jobs) >= self.max_batch_size:
+            self._flush(key)
+        elif len(jobs) == 1:
+            loop.call_later(self.max_wait, self._flush, key)
+        return await future
+
+    def _flush(self, key: tuple) -> None:
+        jobs = [job for job in self._pending.pop(key, []) if not job[1].done()]
+        if not jobs:
+            return
+        loop, task, model_name, kwargs = key
+        batch = _Batch(loop, jobs)
+        batch_id = next(self._batch_ids)
+        with self._lock:
+            if not self._workers:
+                # Shut down since the jobs were queued.
+                for _, future in jobs:
+                    future.set_exception(
+                        InferenceError("Inference pool is not running.")
+                    )
+                return
+            # Least busy worker first; among equals, one that has the model.
+            worker = min(
+                self._workers,
+                key=lambda w: (len(w.in_flight), (task, model_name) not in w.models),
+            )
+            worker.in_flight.add(batch_id)
+            worker.models.add((task, model_name))
+            batch.worker = worker
+            self._batches[batch_id] = batch
+        inputs = [item for job_inputs, _ in jobs for item in job_inputs]
+        # Queue.put hands the message to a feeder thread and returns at once.
+        worker.requests.put((batch_id, task, model_name, inputs, dict(kwargs)))
+
+    def _read_results(self) -> None:
+        while True:
+            try:
+                message = self._results.get(timeout=1)
+            except queue.Empty:
+                self._replace_dead_workers()
+                continue
+            if message is None:
+                return
+            self._finish(*message)
+
+    def _replace_dead_workers(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            dead = [w for w in self._workers if not w.process.is_alive()]
+            for worker in dead:
+                logger.error(
+                    f"Inference worker {worker.process.pid} exited with code "
+                    f"{worker.process.exitcode}; replacing it."
+                )
+                index = self._workers.index(worker)
+                self._workers[index] = _Worker(
+                    self._context, worker.cores, self._results, self.loaders
+                )
+        for worker in dead:
+            for batch_id in list(worker.in_flight):
+                self._finish(batch_id, False, "Inference worker process died.")
+
+    def _finish(self, batch_id: int, ok: bool, payload) -> None:
+        with self._lock:
+            batch = self._batches.pop(batch_id, None)
+            if batch is None:
+                return
+            batch.worker.in_flight.discard(batch_id)
+        try:
+            batch.loop.call_soon_threadsafe(self._resolve, batch, ok, payload)
+        except RuntimeError:
+            pass  # The caller's event loop has already been closed.
+
+    @staticmethod
+    def _resolve(batch: _Batch, ok: bool, payload) -> None:
+        offset = 0
+        for inputs, future in batch.jobs:
+            if not future.done():
+                if ok:
+                    future.set_result(payload[offset : offset + len(inputs)])
+                else:
+                    future.set_exception(InferenceError(payload))
+            offset += len(inputs)
+
+
+@lru_cache
+def get_inference_pool() -> InferencePool | None:
+    """Returns the process-wide pool, or None when INFERENCE_WORKERS is 0."""
+    if settings.INFERENCE_WORKERS <= 0:
+        return None
+    return InferencePool()
@@ -0,0 +1,237 @@
+# backend/app/services/knowledge_base_indexer.py
+# =================================================================
+#
+#               Knowledge Base Incremental Indexer
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Keeps the retrieval indexes in sync with the `knowledge_base`
+#  table in PostgreSQL without re-reading or re-embedding the whole
+#  table on every refresh.
+#
+#  Key Features:
+#  -------------
+#  - Tracks a content hash (text + metadata) and the embedding model
+#    per row, plus `updated_at` (bumped by a trigger on content
+#    changes) and a `deleted_at` tombstone column.
+#  - Finds new and changed rows with a keyset watermark query on
+#    (updated_at, id), page by page.
+#  - Re-embeds only rows whose content hash changed or that are
+#    missing from the active model's namespace (and, inside them, only
+#    changed chunks); removes tombstoned rows from the indexes.
+#  - Follows the embedding model shared by all processes: when another
+#    process migrated to a new model, the next run switches to it and
+#    applies every row again, from the embedding cache.
+#  - Runs periodically inside each API process (started on application
+#    startup), so it refreshes the index that process serves queries
+#    from.
+#
+#  Notes:
+#  ------
+#  - The watermark lives with the index it describes. With the
+#    in-process vector store both are per process, so a fresh process
+#    starts from an empty watermark and rebuilds its index once. The
+#    rebuild reads chunk vectors from the Redis embedding cache (see
+#    `app.services.embedding_cache`) and only embeds chunks missing
+#    there, so a restart does not re-embed the table.
+#  - Deletions must be soft (set `deleted_at`); hard-deleted rows
+#    cannot be seen by a watermark query.
+#
+# =================================================================
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from app.core.config import settings
+from app.services.database_service import DatabaseService
+from app.services.retrieval_service import RetrievalService, get_retrieval_service
+from app.utils.chunking import content_hash
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = "knowledge_base"
+
+SCHEMA_SQL = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+    id TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+ALTER TABLE {TABLE_NAME}
+    ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{{}}',
+    ADD COLUMN IF NOT EXISTS content_hash TEXT,
+    ADD COLUMN IF NOT EXISTS embedding_model TEXT,
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMPTZ;
+CREATE INDEX IF NOT EXISTS {TABLE_NAME}_updated_at_id_idx
+    ON {TABLE_NAME} (updated_at, id);
+
+CREATE OR REPLACE FUNCTION {TABLE_NAME}_touch() RETURNS trigger AS $$
+BEGIN
+    -- Only content changes move a row past the watermark; bookkeeping
+    -- updates (content_hash, embedding_model) do not.
+    IF NEW.content IS DISTINCT FROM OLD.content
+       OR NEW.metadata IS DISTINCT FROM OLD.metadata
+       OR NEW.deleted_at IS DISTINCT FROM OLD.deleted_at THEN
+        NEW.updated_at := now();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS {TABLE_NAME}_touch ON {TABLE_NAME};
+CREATE TRIGGER {TABLE_NAME}_touch BEFORE UPDATE ON {TABLE_NAME}
+    FOR EACH ROW EXECUTE FUNCTION {TABLE_NAME}_touch();
+"""
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def row_hash(content: str, metadata: dict) -> str:
+    """Hash of everything that is indexed for a row: its text and metadata."""
+    return content_hash(content + "\x00" + json.dumps(metadata, sort_keys=True))
+
+
+class IncrementalIndexer:
+    """
+    Applies `knowledge_base` changes since the last watermark to the
+    retrieval indexes.
+    """
+
+    _schema_ready = False
+
+    def __init__(
+        self,
+        db: DatabaseService | None = None,
+        retrieval_service: RetrievalService | None = None,
+        batch_size: int | None = None,
+        lag_seconds: float | None = None,
+    ):
+        self.db = db or DatabaseService()
+        self.retrieval_service = retrieval_service or get_retrieval_service()
+        self.batch_size = batch_size or settings.KNOWLEDGE_BASE_INDEX_BATCH_SIZE
+        self.lag = timedelta(
+            seconds=(
+                settings.KNOWLEDGE_BASE_INDEX_LAG_SECONDS
+                if lag_seconds is None
+                else lag_seconds
+            )
+        )
+        # Last (updated_at, id) applied to the indexes, and the embedding
+        # model they were applied with
+        self.watermark: tuple[datetime, str] = (_EPOCH, "")
+        self.watermark_model: str | None = None
+
+    async def ensure_schema(self):
+        """Creates the table and change-tracking columns if they are missing."""
+        if IncrementalIndexer._schema_ready:
+            return
+        await self.db.execute(SCHEMA_SQL)
+        IncrementalIndexer._schema_ready = True
+
+    async def _fetch_changes(self, until: datetime) -> list[dict]:
+        after_ts, after_id = self.watermark
+        return await self.db.execute(
+            f"""
+            SELECT id, content, metadata, content_hash, embedding_model,
+                   updated_at, deleted_at
+            FROM {TABLE_NAME}
+            WHERE (updated_at, id) > ($1, $2) AND updated_at <= $3
+            ORDER BY updated_at, id
+            LIMIT {int(self.batch_size)}
+            """,
+            [after_ts, after_id, until],
+            fetch="all",
+        )
+
+    async def _record_hashes(self, rows: list[tuple[str, str]], model: str):
+        await self.db.execute(
+            f"""
+            UPDATE {TABLE_NAME} AS kb
+            SET content_hash = u.content_hash, embedding_model = $3
+            FROM unnest($1::text[], $2::text[]) AS u(id, content_hash)
+            WHERE kb.id = u.id
+            """,
+            [[id for id, _ in rows], [digest for _, digest in rows], model],
+        )
+
+    async def run_once(self) -> dict:
+        """
+        Applies all changes up to now minus the configured lag (which leaves
+        room for transactions that committed late with an older timestamp)
+        and returns counts of what was done.
+        """
+        await self.ensure_schema()
+        model = await self.retrieval_service.sync_active_model()
+        if model != self.watermark_model:
+            # Rows are applied (and labelled) again with the new model.
+            self.watermark = (_EPOCH, "")
+            self.watermark_model = model
+        until = datetime.now(timezone.utc) - self.lag
+        stats = dict(scanned=0, indexed=0, unchanged=0, tombstoned=0, embedded_chunks=0)
+
+        while True:
+            rows = await self._fetch_changes(until)
+            if not rows:
+                break
+            documents, hashes = [], []
+            for row in rows:
+                if row["deleted_at"] is not None:
+                    if await self.retrieval_service.remove_document(row["id"]):
+                        stats["tombstoned"] += 1
+                    continue
+                metadata = row["metadata"] or {}
+                if isinstance(metadata, str):
+                    metadata = json.loads(metadata)
+                digest = row_hash(row["content"], metadata)
+                if (
+                    self.retrieval_service.is_indexed(row["id"])
+                    and row["content_hash"] == digest
+                ):
+                    stats["unchanged"] += 1
+                    if row["embedding_model"] != model:
+                        # Already in the model's namespace (e.g. backfilled by
+                        # a migration); only the label is out of date.
+                        hashes.append((row["id"], digest))
+                    continue
+                documents.append((row["id"], row["content"], metadata))
+                hashes.append((row["id"], digest))
+
+            if documents:
+                result = await self.retrieval_service.index_documents(documents)
+                stats["indexed"] += len(documents)
+                stats["embedded_chunks"] += result["embedded"]
+            if hashes:
+                await self._record_hashes(hashes, model)
+
+            stats["scanned"] += len(rows)
+            # Advance after each page so an interrupted run resumes here.
+            self.watermark = (rows[-1]["updated_at"], rows[-1]["id"])
+            if len(rows) < self.batch_size:
+                break
+
+        logger.info(f"Incremental knowledge base index run: {stats}")
+        return stats
+
+    async def run_periodically(self, interval_seconds: float | None = None) -> None:
+        """
+        Runs `run_once` now and then every `interval_seconds`, until
+        cancelled. A failed run is logged and retried at the next interval.
+        """
+        interval = interval_seconds or settings.KNOWLEDGE_BASE_INDEX_INTERVAL_SECONDS
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Incremental knowledge base index run failed: {e}")
+            await asyncio.sleep(interval)
+
+
+@lru_cache
+def get_incremental_indexer() -> IncrementalIndexer:
+    """Returns the process-wide indexer (its watermark tracks this process)."""
+    return IncrementalIndexer()
@@ -14,17 +14,40 @@
 #  Current Role:
 #  -------------
 #  - Acts as a high-level coordinator for processing text input.
-#  - Uses the LLMService to generate a primary response.
+#  - For calls that opt in (user questions), retrieves knowledge-base
+#    context (RAG) concurrently with the recommendations, packed into
+#    a token budget. Other prompts (e.g. poems) are sent unchanged.
+#  - Uses the LLMService to generate a primary response grounded in
+#    that context.
+#  - Reports per-stage timings with every response.
 #  - (Future) Can be expanded to re-introduce more complex agentic
 #    workflows using the new adapter-based services.
 #
 # =================================================================
 
+import asyncio
+import time
+
+from app.core.config import settings
 from app.models.schemas import ChatResponse
 from app.services.llm_service import LLMService
+from app.services.rag_service import RAGService
 from app.services.recommendation_service import RecommendationService
 
 
+async def _timed(timings: dict, stage: str, coro):
+    """Awaits `coro`, recording its duration in milliseconds under `stage`."""
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 2)
+
+
+async def _no_context() -> list[dict]:
+    return []
+
+
 class LangChainOrchestrator:
     """
     Orchestrates NLP tasks, using various services.
@@ -35,31 +58,57 @@ class LangChainOrchestrator:
     def __init__(self):
         self.llm_service = LLMService(provider="huggingface")
         self.recommendation_service = RecommendationService()
+        self.rag_service = RAGService()
         # The agent is temporarily disabled in favor of a direct service call.
         # self.agent_executor = self._initialize_agent()
 
-    async def run_text_pipeline(self, text: str) -> ChatResponse:
+    async def run_text_pipeline(self, text: str, use_rag: bool = False) -> ChatResponse:
         """
-        Processes text by generating a response from the LLM and
-        fetching recommendations.
+        Processes text by fetching recommendations and, with `use_rag`,
+        retrieving knowledge-base context concurrently, then generating the
+        LLM response. Without context the text is sent to the LLM as is.
 
         Args:
             text: The user's input text.
+            use_rag: Whether to answer from knowledge-base context (for user
+                questions; not for generation prompts such as poems).
 
         Returns:
             A ChatResponse object containing the response and recommendations.
         """
+        timings: dict[str, float] = {}
+        start = time.perf_counter()
         try:
-            # Generate the main text response using the LLM service
-            response_text = await self.llm_service.generate_response(text)
+            # Retrieval and recommendations are independent, so run them together
+            context, recommendations = await asyncio.gather(
+                _timed(
+                    timings,
+                    "retrieval",
+                    (
+                        self.rag_service.get_context(text)
+                        if use_rag and settings.RAG_ENABLED
+                        else _no_context()
+                    ),
+                ),
+                _timed(
+                    timings,
+                    "recommendations",
+                    self.recommendation_service.get_recommendations(text),
+                ),
+            )
 
-            # Get recommendations based on the input text
-            recommendations = await self.recommendation_service.get_recommendations(
-                text
+            # Generate the main text response using the LLM service
+            prompt = self.rag_service.build_prompt(text, context)
+            response_text = await _timed(
+                timings, "llm", self.llm_service.generate_response(prompt)
             )
+            timings["total"] = round((time.perf_counter() - start) * 1000, 2)
 
             return ChatResponse(
-                response_text=response_text, recommendations=recommendations
+                response_text=response_text,
+                recommendations=recommendations,
+                sources=[chunk["id"] for chunk in context],
+                timings=timings,
             )
         except Exception as e:
             print(f"Error running text pipeline: {e}")
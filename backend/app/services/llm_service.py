@@ -15,11 +15,17 @@
 #  -------------
 #  - Dynamically selects the LLM adapter based on configuration.
 #  - Provides a single entry point (`generate_response`) for the app.
+#  - Coalesces concurrent identical prompts into one provider call
+#    (single-flight); the shared response is kept only briefly.
 #
 # =================================================================
 
+import hashlib
+
+from app.core.config import settings
 from app.services.base.llm_adapter import BaseLLMAdapter
 from app.services.model_registry import get_model_registry
+from app.services.single_flight import get_single_flight
 
 
 class LLMService:
@@ -49,4 +55,15 @@ class LLMService:
         Returns:
             The text response from the LLM.
         """
-        return await self.adapter.generate_response(prompt)
+        model = getattr(self.adapter, "model_name", "")
+        digest = hashlib.sha256(
+            f"{type(self.adapter).__name__}:{model}:{prompt}".encode()
+        ).hexdigest()
+        fallback = getattr(self.adapter, "fallback_response", None)
+        return await get_single_flight().do(
+            f"cache:llm:{digest}",
+            lambda: self.adapter.generate_response(prompt),
+            ttl=settings.SINGLE_FLIGHT_RESULT_TTL_SECONDS,
+            # Error fallbacks are shared with waiting callers but not stored.
+            should_store=lambda response: response != fallback,
+        )
@@ -16,18 +16,20 @@
 #  - Registers available adapters for each AI service type.
 #  - Provides a method to retrieve an adapter instance based on type and provider.
 #  - Supports setting a default provider for each service type.
+#  - Routes calls across the default and fallback providers (failover
+#    and hedged requests) when fallbacks are configured.
 #  - Implemented as a singleton using lru_cache for efficiency.
 #
 # =================================================================
 
 from functools import lru_cache
-from typing import Dict, Type
+from typing import Dict, List, Type
 
 from app.core.config import settings
-from app.services.adapters.gtts_tts_adapter import GTTSTTSAdapter
-from app.services.adapters.hf_llm_adapter import HFLLMAdapter
-from app.services.adapters.hf_stt_adapter import HFSTTAdapter
-from app.services.adapters.hf_vision_adapter import HFVisionAdapter
+from app.services.adapters.gtts_tts_adapter import GTTSTransformer
+from app.services.adapters.hf_llm_adapter import HuggingFaceLLMAdapter
+from app.services.adapters.hf_stt_adapter import HuggingFaceSTTAdapter
+from app.services.adapters.hf_vision_adapter import HuggingFaceVisionAdapter
 from app.services.adapters.openai_llm_adapter import OpenAILLMAdapter
 from app.services.adapters.openai_stt_adapter import OpenAISTTAdapter
 from app.services.adapters.openai_tts_adapter import OpenAITTSAdapter
@@ -36,6 +38,14 @@ from app.services.base.llm_adapter import BaseLLMAdapter
 from app.services.base.stt_adapter import BaseSTTAdapter
 from app.services.base.tts_adapter import BaseTTSAdapter
 from app.services.base.vision_adapter import BaseVisionAdapter
+from app.services.provider_router import (
+    ProviderRouter,
+    RoutedLLMAdapter,
+    RoutedSTTAdapter,
+    RoutedTTSAdapter,
+    RoutedVisionAdapter,
+    build_router,
+)
 
 
 class ModelRegistry:
@@ -48,22 +58,23 @@ class ModelRegistry:
         self._vision_adapters: Dict[str, Type[BaseVisionAdapter]] = {}
         self._stt_adapters: Dict[str, Type[BaseSTTAdapter]] = {}
         self._tts_adapters: Dict[str, Type[BaseTTSAdapter]] = {}
+        self._routers: Dict[str, ProviderRouter] = {}
 
         self._register_default_adapters()
 
     def _register_default_adapters(self):
         """Registers the default set of adapters."""
         self.register_llm_adapter("openai", OpenAILLMAdapter)
-        self.register_llm_adapter("huggingface", HFLLMAdapter)
+        self.register_llm_adapter("huggingface", HuggingFaceLLMAdapter)
 
         self.register_vision_adapter("openai", OpenAIVisionAdapter)
-        self.register_vision_adapter("huggingface", HFVisionAdapter)
+        self.register_vision_adapter("huggingface", HuggingFaceVisionAdapter)
 
         self.register_stt_adapter("openai", OpenAISTTAdapter)
-        self.register_stt_adapter("huggingface", HFSTTAdapter)
+        self.register_stt_adapter("huggingface", HuggingFaceSTTAdapter)
 
         self.register_tts_adapter("openai", OpenAITTSAdapter)
-        self.register_tts_adapter("gtts", GTTSTTSAdapter)
+        self.register_tts_adapter("gtts", GTTSTransformer)
 
     def register_llm_adapter(self, name: str, adapter: Type[BaseLLMAdapter]):
         self._llm_adapters[name] = adapter
@@ -77,7 +88,51 @@ class ModelRegistry:
     def register_tts_adapter(self, name: str, adapter: Type[BaseTTSAdapter]):
         self._tts_adapters[name] = adapter
 
+    def get_router(self, modality: str) -> ProviderRouter:
+        """
+        Returns the shared router for a modality ("llm", "vision", "stt" or
+        "tts"), ordered as the default provider followed by its fallbacks.
+        """
+        router = self._routers.get(modality)
+        if router is None:
+            adapters, default, fallbacks = self._routing_config(modality)
+            providers: List[str] = [default] + [
+                name for name in fallbacks if name != default
+            ]
+            router = build_router(modality, adapters, providers)
+            self._routers[modality] = router
+        return router
+
+    def _routing_config(self, modality: str):
+        if modality == "llm":
+            return (
+                self._llm_adapters,
+                settings.DEFAULT_LLM_PROVIDER,
+                settings.LLM_FALLBACK_PROVIDERS,
+            )
+        if modality == "vision":
+            return (
+                self._vision_adapters,
+                settings.DEFAULT_VISION_PROVIDER,
+                settings.VISION_FALLBACK_PROVIDERS,
+            )
+        if modality == "stt":
+            return (
+                self._stt_adapters,
+                settings.DEFAULT_STT_PROVIDER,
+                settings.STT_FALLBACK_PROVIDERS,
+            )
+        if modality == "tts":
+            return (
+                self._tts_adapters,
+                settings.DEFAULT_TTS_PROVIDER,
+                settings.TTS_FALLBACK_PROVIDERS,
+            )
+        raise ValueError(f"Unknown modality '{modality}'.")
+
     def get_llm_adapter(self, provider: str = None) -> BaseLLMAdapter:
+        if provider is None and settings.LLM_FALLBACK_PROVIDERS:
+            return RoutedLLMAdapter(self.get_router("llm"))
         provider = provider or settings.DEFAULT_LLM_PROVIDER
         adapter_class = self._llm_adapters.get(provider)
         if not adapter_class:
@@ -85,6 +140,8 @@ class ModelRegistry:
         return adapter_class()
 
     def get_vision_adapter(self, provider: str = None) -> BaseVisionAdapter:
+        if provider is None and settings.VISION_FALLBACK_PROVIDERS:
+            return RoutedVisionAdapter(self.get_router("vision"))
         provider = provider or settings.DEFAULT_VISION_PROVIDER
         adapter_class = self._vision_adapters.get(provider)
         if not adapter_class:
@@ -92,6 +149,8 @@ class ModelRegistry:
         return adapter_class()
 
     def get_stt_adapter(self, provider: str = None) -> BaseSTTAdapter:
+        if provider is None and settings.STT_FALLBACK_PROVIDERS:
+            return RoutedSTTAdapter(self.get_router("stt"))
         provider = provider or settings.DEFAULT_STT_PROVIDER
         adapter_class = self._stt_adapters.get(provider)
         if not adapter_class:
@@ -99,6 +158,8 @@ class ModelRegistry:
         return adapter_class()
 
     def get_tts_adapter(self, provider: str = None) -> BaseTTSAdapter:
+        if provider is None and settings.TTS_FALLBACK_PROVIDERS:
+            return RoutedTTSAdapter(self.get_router("tts"))
         provider = provider or settings.DEFAULT_TTS_PROVIDER
         adapter_class = self._tts_adapters.get(provider)
         if not adapter_class:
@@ -16,13 +16,14 @@
 #  - Decouples the business logic of the pipeline from the API endpoint.
 #  - Injects required AI services for better testability and modularity.
 #  - Provides a single, clean method to execute the entire workflow.
+#  - Exposes each stage on its own, so the workflow can also run as a
+#    chain of separately queued Celery tasks.
 #
 # =================================================================
 
 import logging
 from typing import Any, Dict
 
-from app.models.schemas import AIResponse  # Assuming a shared schema
 from app.services.langchain_orchestrator import LangChainOrchestrator
 from app.services.tts_service import TTSService
 from app.services.vision_service import VisionService
@@ -37,29 +38,17 @@ class MultimodalPipeline:
 
     def __init__(
         self,
-        vision_service: VisionService,
-        langchain_orchestrator: LangChainOrchestrator,
-        tts_service: TTSService,
+        vision_service: VisionService | None = None,
+        langchain_orchestrator: LangChainOrchestrator | None = None,
+        tts_service: TTSService | None = None,
     ):
+        # A staged pipeline only needs the service of the stage it runs.
         self.vision_service = vision_service
         self.langchain_orchestrator = langchain_orchestrator
         self.tts_service = tts_service
 
-    async def process_image(self, image_base64: str) -> Dict[str, Any]:
-        """
-        Executes the full image-to-speech pipeline.
-
-        Args:
-            image_base64: The base64-encoded image string.
-
-        Returns:
-            A dictionary containing the results of the pipeline, including
-            the image description, the generated text (poem), and the
-            base64-encoded audio.
-        """
-        logger.info("Starting multimodal pipeline for image processing.")
-
-        # 1. Get image description from Vision Service
+    async def describe_image(self, image_base64: str) -> str:
+        """Stage 1: gets a description of the image from the Vision Service."""
         try:
             image_description = await self.vision_service.get_image_description(
                 image_base64
@@ -70,11 +59,16 @@ class MultimodalPipeline:
             logger.info(
                 f"Vision service succeeded. Description: '{image_description[:50]}...'"
             )
+            return image_description
         except Exception as e:
             logger.error(f"Error in vision service step: {e}", exc_info=True)
             raise
 
-        # 2. Generate a poem from the description using LangChain Orchestrator
+    async def write_poem(self, image_description: str) -> Dict[str, Any]:
+        """
+        Stage 2: generates a poem from the description using the LangChain
+        Orchestrator. Returns the text and the recommendations.
+        """
         try:
             # We create a more creative prompt for the poem generation
             prompt_intro = "Based on the following description of an image, "
@@ -90,27 +84,48 @@ class MultimodalPipeline:
             logger.info(
                 f"LLM service succeeded. Generated text: '{generated_text[:50]}...'"
             )
+            return {
+                "response_text": generated_text,
+                "recommendations": llm_response.recommendations,
+            }
         except Exception as e:
             logger.error(f"Error in LLM service step: {e}", exc_info=True)
             raise
 
-        # 3. Convert the generated poem to speech using TTS Service
+    async def synthesize_speech(self, text: str) -> str | None:
+        """
+        Stage 3: converts the poem to speech using the TTS Service. Failures
+        are not critical for the pipeline and yield None.
+        """
         try:
-            audio_base64 = await self.tts_service.generate_audio(generated_text)
+            audio_base64 = await self.tts_service.generate_audio(text)
             if not audio_base64:
                 logger.warning("TTS service returned no audio.")
-                # This might not be a critical failure, so we don't raise an exception
-                # but will return None for the audio.
-                pass
             logger.info("TTS service succeeded.")
+            return audio_base64
         except Exception as e:
             logger.error(f"Error in TTS service step: {e}", exc_info=True)
-            # Also not a critical failure for the whole pipeline
-            audio_base64 = None
+            return None
+
+    async def process_image(self, image_base64: str) -> Dict[str, Any]:
+        """
+        Executes the full image-to-speech pipeline.
 
+        Args:
+            image_base64: The base64-encoded image string.
+
+        Returns:
+            A dictionary containing the results of the pipeline, including
+            the image description, the generated text (poem), and the
+            base64-encoded audio.
+        """
+        logger.info("Starting multimodal pipeline for image processing.")
+        image_description = await self.describe_image(image_base64)
+        poem = await self.write_poem(image_description)
+        audio_base64 = await self.synthesize_speech(poem["response_text"])
         return {
             "image_description": image_description,
-            "response_text": generated_text,
+            "response_text": poem["response_text"],
             "audio_base64": audio_base64,
-            "recommendations": llm_response.recommendations,
+            "recommendations": poem["recommendations"],
         }
@@ -0,0 +1,212 @@
+# backend/app/services/onnx_embedding.py
+# =================================================================
+#
+#                 ONNX Runtime Embedding Backend
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Runs sentence-transformer embedding models with ONNX Runtime
+#  instead of PyTorch, which is faster and lighter on CPU-only nodes.
+#
+#  Key Features:
+#  -------------
+#  - Exports the model's transformer to ONNX once and caches the
+#    export (plus tokenizer and pooling config) on disk.
+#  - Optional dynamic int8 quantization of the exported weights.
+#  - Tuned ONNX Runtime sessions: full graph optimizations and a
+#    configurable number of intra-op threads.
+#  - Reproduces the sentence-transformer pooling (mean / CLS / max)
+#    and normalization in NumPy, so vectors match the PyTorch backend.
+#  - Exposes `encode` and `tokenizer` like SentenceTransformer, so it
+#    is a drop-in model for EmbeddingService.
+#
+# =================================================================
+
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+from app.core.config import settings
+from transformers import AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+_MODEL_FILE = "model.onnx"
+_QUANTIZED_MODEL_FILE = "model.int8.onnx"
+_CONFIG_FILE = "embedding_config.json"
+
+
+def _pooling_config(model) -> dict:
+    """Reads pooling mode, normalization and max length from a SentenceTransformer."""
+    from sentence_transformers.models import Normalize, Pooling
+
+    pooling = next((module for module in model if isinstance(module, Pooling)), None)
+    mode = "mean"
+    if pooling is not None:
+        if pooling.pooling_mode_cls_token:
+            mode = "cls"
+        elif pooling.pooling_mode_max_tokens:
+            mode = "max"
+    return {
+        "pooling": mode,
+        "normalize": any(isinstance(module, Normalize) for module in model),
+        "max_seq_length": model.max_seq_length,
+    }
+
+
+def export_onnx(model_name: str, output_dir: str | Path, quantize: bool) -> Path:
+    """
+    Exports `model_name` (a SentenceTransformer name or path) to
+    `output_dir` and returns the path of the ONNX file to load.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    model_path = output_dir / _MODEL_FILE
+    # Newer torch releases default to the dynamo exporter (which needs
+    # onnxscript); the TorchScript exporter handles these models fine.
+    exporter_options = (
+        {"dynamo": False}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters
+        else {}
+    )
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            str(model_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **exporter_options,
+        )
+
+    tokenizer.save_pretrained(str(output_dir))
+    (output_dir / _CONFIG_FILE).write_text(json.dumps(_pooling_config(model)))
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = output_dir / _QUANTIZED_MODEL_FILE
+        quantize_dynamic(
+            str(model_path), str(quantized_path), weight_type=QuantType.QInt8
+        )
+        return quantized_path
+    return model_path
+
+
+class OnnxSentenceEncoder:
+    """
+    Embeds text with an exported sentence-transformer model on ONNX Runtime.
+    """
+
+    def __init__(self, model_dir: str | Path, quantized: bool, threads: int = 0):
+        import onnxruntime as ort
+
+        model_dir = Path(model_dir)
+        config = json.loads((model_dir / _CONFIG_FILE).read_text())
+        self.pooling = config["pooling"]
+        self.normalize = config["normalize"]
+        self.max_seq_length = config["max_seq_length"]
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # One request runs one batch at a time, so spend the threads inside ops.
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+        model_file = _QUANTIZED_MODEL_FILE if quantized else _MODEL_FILE
+        self.session = ort.InferenceSession(
+            str(model_dir / model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {node.name for node in self.session.get_inputs()}
+
+    @classmethod
+    def from_pretrained(
+        cls,
+        model_name: str,
+        cache_dir: str | None = None,
+        quantize: bool | None = None,
+        threads: int | None = None,
+    ) -> "OnnxSentenceEncoder":
+        """Loads the cached export of `model_name`, exporting it first if needed."""
+        quantize = settings.EMBEDDING_ONNX_QUANTIZE if quantize is None else quantize
+        model_dir = Path(cache_dir or settings.EMBEDDING_ONNX_CACHE_DIR) / (
+            model_name.replace("/", "__")
+        )
+        model_file = _QUANTIZED_MODEL_FILE if quantize else _MODEL_FILE
+        if not (model_dir / model_file).exists():
+            logger.info(f"Exporting embedding model '{model_name}' to ONNX.")
+            export_onnx(model_name, model_dir, quantize)
+        return cls(
+            model_dir,
+            quantized=quantize,
+            threads=settings.EMBEDDING_ONNX_THREADS if threads is None else threads,
+        )
+
+    def _pool(self, hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "cls":
+            return hidden[:, 0]
+        mask = mask[..., None].astype(hidden.dtype)
+        if self.pooling == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feed = {
+            name: value.astype(np.int64)
+            for name, value in encoded.items()
+            if name in self._input_names
+        }
+        (hidden,) = self.session.run(["last_hidden_state"], feed)
+        embeddings = self._pool(hidden, encoded["attention_mask"])
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings.astype(np.float32)
+
+    def encode(self, texts: str | list[str], batch_size: int = 32) -> np.ndarray:
+        """Same contract as SentenceTransformer.encode with numpy output."""
+        if isinstance(texts, str):
+            return self._encode_batch([texts])[0]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Batch texts of similar length together to minimise padding.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings = [None] * len(texts)
+        for offset in range(0, len(order), batch_size):
+            indices = order[offset : offset + batch_size]
+            batch = self._encode_batch([texts[i] for i in indices])
+            for i, embedding in zip(indices, batch):
+                embeddings[i] = embedding
+        return np.stack(embeddings)
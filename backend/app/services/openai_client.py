@@ -0,0 +1,110 @@
+# backend/app/services/openai_client.py
+# =================================================================
+#
+#                    Shared OpenAI HTTP Client
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  One `AsyncOpenAI` client per process, used by every OpenAI adapter
+#  (LLM, vision, STT, TTS). Adapters are created per call by the model
+#  registry; with a client each, every call paid for a new connection
+#  pool, TCP and TLS handshakes and the file descriptors behind them.
+#
+#  Key Features:
+#  -------------
+#  - A single `httpx.AsyncClient` with HTTP/2 and keep-alive, so calls
+#    of all modalities are multiplexed over a few warm connections.
+#  - Pool limits and timeouts come from the OPENAI_HTTP_* settings.
+#  - Recreated when the event loop changes (connections are bound to
+#    the loop that opened them) and after a fork. A client replaced
+#    because of a new loop is closed on its own loop.
+#
+# =================================================================
+
+import asyncio
+import logging
+import os
+
+import httpx
+from app.core.config import settings
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+_client: AsyncOpenAI | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+_client_pid: int | None = None
+
+
+def _create_client() -> AsyncOpenAI:
+    timeout = httpx.Timeout(
+        settings.OPENAI_HTTP_TIMEOUT_SECONDS,
+        connect=settings.OPENAI_HTTP_CONNECT_TIMEOUT_SECONDS,
+    )
+    http_client = httpx.AsyncClient(
+        http2=settings.OPENAI_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=timeout,
+    )
+    # The OpenAI client sends its own per-request timeout, so it gets the
+    # same one as the transport.
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY, http_client=http_client, timeout=timeout
+    )
+
+
+def _close_stale_client(
+    client: AsyncOpenAI, loop: asyncio.AbstractEventLoop | None
+) -> None:
+    """
+    Closes a client replaced because the event loop changed. Its connections
+    belong to `loop`, so it is closed there. If that loop is already closed,
+    nothing can run on it any more; the connections' sockets are closed when
+    the client is garbage collected.
+    """
+    if loop is None or loop.is_closed():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(client.close(), loop)
+    except RuntimeError:
+        pass  # The loop was closed meanwhile.
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Returns the process-wide OpenAI client, creating it on first use. A
+    new client is created if the running event loop changed (e.g. a
+    worker that starts a fresh loop) or the process was forked.
+    """
+    global _client, _client_loop, _client_pid
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    stale_loop = loop is not None and _client_loop not in (None, loop)
+    if _client is None or _client_pid != os.getpid() or stale_loop:
+        if stale_loop and _client_pid == os.getpid():
+            logger.info("Event loop changed; creating a new OpenAI client.")
+            _close_stale_client(_client, _client_loop)
+        _client = _create_client()
+        _client_pid = os.getpid()
+        _client_loop = None
+    if loop is not None:
+        _client_loop = loop
+    return _client
+
+
+async def close_openai_client() -> None:
+    """Closes the shared client's connections; used on application shutdown."""
+    global _client, _client_loop
+    if _client is not None and _client_pid == os.getpid():
+        await _client.close()
+    _client = None
+    _client_loop = None
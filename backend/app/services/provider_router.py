@@ -0,0 +1,281 @@
+# backend/app/services/provider_router.py
+# =================================================================
+#
+#                   Provider Router (Failover & Hedging)
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Routes a single modality call (LLM, Vision, STT, TTS) across the
+#  adapters registered in the ModelRegistry instead of binding to one
+#  provider. This caps tail latency when a provider degrades.
+#
+#  Key Features:
+#  -------------
+#  - Fails over to the next provider when a call errors out or its
+#    circuit breaker is open.
+#  - Sends a hedged request to the next provider once the current one
+#    exceeds its latency budget; the first good answer wins and the
+#    slower call is cancelled.
+#  - Tracks per-provider latency so the hedge budget follows the
+#    observed percentile instead of a fixed timeout.
+#  - Exposes routed adapters that implement the base adapter
+#    interfaces, so services use them transparently.
+#
+# =================================================================
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Any, Dict, List, Type
+
+from app.core.config import settings
+from app.services.base.llm_adapter import BaseLLMAdapter
+from app.services.base.stt_adapter import BaseSTTAdapter
+from app.services.base.tts_adapter import BaseTTSAdapter
+from app.services.base.vision_adapter import BaseVisionAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Keeps a sliding window of successful call latencies per provider."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, collections.deque] = {}
+
+    def record(self, provider: str, seconds: float) -> None:
+        samples = self._samples.setdefault(
+            provider, collections.deque(maxlen=self.window)
+        )
+        samples.append(seconds)
+
+    def percentile(self, provider: str, q: float) -> float | None:
+        """Returns the `q` quantile (0..1) of recent latencies, if any."""
+        samples = self._samples.get(provider)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class ProviderRouter:
+    """
+    Calls a method on an ordered list of providers with failover and hedging.
+    Adapters are instantiated lazily, so secondary providers (e.g. local
+    Hugging Face pipelines) are only loaded when they are first needed, and
+    in a worker thread, so loading one does not stall the event loop.
+    """
+
+    def __init__(
+        self,
+        modality: str,
+        adapter_classes: Dict[str, Type],
+        providers: List[str],
+        hedging_enabled: bool = True,
+        percentile: float = 0.95,
+        min_delay: float = 0.5,
+        max_delay: float = 10.0,
+        latency_tracker: LatencyTracker | None = None,
+    ):
+        self.modality = modality
+        self.providers = providers
+        self.hedging_enabled = hedging_enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.latency = latency_tracker or LatencyTracker()
+        self._adapter_classes = adapter_classes
+        self._adapters: Dict[str, Any] = {}
+        # Adapters being created, shared by concurrent callers
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    async def get_adapter(self, provider: str):
+        """
+        Returns the adapter of `provider`, creating it on first use. Adapters
+        may load a local model when created, so that runs in a worker thread.
+        """
+        adapter = self._adapters.get(provider)
+        if adapter is not None:
+            return adapter
+        adapter_class = self._adapter_classes.get(provider)
+        if not adapter_class:
+            raise ValueError(
+                f"{self.modality} adapter for provider '{provider}' not found."
+            )
+        loading = self._loading.get(provider)
+        if loading is None:
+            loading = asyncio.ensure_future(asyncio.to_thread(adapter_class))
+            self._loading[provider] = loading
+        try:
+            # A cancelled (e.g. out-hedged) caller leaves the creation running.
+            adapter = await asyncio.shield(loading)
+        finally:
+            if loading.done():
+                self._loading.pop(provider, None)
+        self._adapters[provider] = adapter
+        return adapter
+
+    @property
+    def fallback_response(self) -> str:
+        """What the primary provider's adapter returns when it fails."""
+        adapter_class = self._adapter_classes.get(self.providers[0])
+        return getattr(adapter_class, "fallback_response", "")
+
+    def hedge_delay(self, provider: str) -> float:
+        """Latency budget for `provider` before a hedged request is sent."""
+        observed = self.latency.percentile(provider, self.percentile)
+        if observed is None:
+            return self.max_delay
+        return min(self.max_delay, max(self.min_delay, observed))
+
+    async def _attempt(self, provider: str, method: str, args: tuple):
+        """Runs one provider call. Returns (result, succeeded)."""
+        start = time.monotonic()
+        try:
+            adapter = await self.get_adapter(provider)
+            breaker = getattr(adapter, "circuit_breaker", None)
+            if breaker is not None and not breaker.allows_request():
+                logger.info(f"{self.modality} provider '{provider}' circuit is open.")
+                return adapter.fallback_response, False
+            result = await getattr(adapter, method)(*args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"{self.modality} provider '{provider}' failed: {e}")
+            return None, False
+
+        # Adapters report failures by returning their fallback response.
+        if not result or result == adapter.fallback_response:
+            logger.warning(f"{self.modality} provider '{provider}' returned no result.")
+            return result, False
+
+        self.latency.record(provider, time.monotonic() - start)
+        return result, True
+
+    async def call(self, method: str, *args):
+        """
+        Calls `method` on the providers in order and returns the first
+        successful result. If every provider fails, the last failure result
+        (usually the adapter's fallback response) is returned.
+        """
+        remaining = list(self.providers)
+        pending: Dict[asyncio.Task, str] = {}
+        fallback = None
+
+        def launch_next() -> None:
+            provider = remaining.pop(0)
+            task = asyncio.create_task(self._attempt(provider, method, args))
+            pending[task] = provider
+
+        launch_next()
+        try:
+            while pending:
+                timeout = None
+                if remaining and self.hedging_enabled:
+                    newest = list(pending.values())[-1]
+                    timeout = self.hedge_delay(newest)
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info(
+                        f"{self.modality} provider '{newest}' exceeded its "
+                        f"{timeout:.2f}s budget; hedging to '{remaining[0]}'."
+                    )
+                    launch_next()
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    result, succeeded = task.result()
+                    if succeeded:
+                        return result
+                    if fallback is None or result is not None:
+                        fallback = result
+                    if remaining:
+                        logger.info(
+                            f"Failing over {self.modality} from '{provider}' "
+                            f"to '{remaining[0]}'."
+                        )
+                        launch_next()
+            return fallback
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class RoutedLLMAdapter(BaseLLMAdapter):
+    """LLM adapter that delegates to a ProviderRouter."""
+
+    def __init__(self, router: ProviderRouter):
+        self.router = router
+
+    @property
+    def fallback_response(self) -> str:
+        return self.router.fallback_response
+
+    async def generate_response(self, prompt: str) -> str:
+        return await self.router.call("generate_response", prompt)
+
+
+class RoutedVisionAdapter(BaseVisionAdapter):
+    """Vision adapter that delegates to a ProviderRouter."""
+
+    def __init__(self, router: ProviderRouter):
+        self.router = router
+
+    @property
+    def fallback_response(self) -> str:
+        return self.router.fallback_response
+
+    async def get_image_description(self, image_base64: str) -> str:
+        return await self.router.call("get_image_description", image_base64)
+
+
+class RoutedSTTAdapter(BaseSTTAdapter):
+    """STT adapter that delegates to a ProviderRouter."""
+
+    def __init__(self, router: ProviderRouter):
+        self.router = router
+
+    @property
+    def fallback_response(self) -> str:
+        return self.router.fallback_response
+
+    async def transcribe_audio(self, audio_base64: str) -> str:
+        return await self.router.call("transcribe_audio", audio_base64)
+
+
+class RoutedTTSAdapter(BaseTTSAdapter):
+    """TTS adapter that delegates to a ProviderRouter."""
+
+    def __init__(self, router: ProviderRouter):
+        self.router = router
+
+    @property
+    def fallback_response(self) -> str:
+        return self.router.fallback_response
+
+    async def generate_audio(self, text: str) -> str:
+        return await self.router.call("generate_audio", text)
+
+
+def build_router(
+    modality: str, adapter_classes: Dict[str, Type], providers: List[str]
+) -> ProviderRouter:
+    """Creates a ProviderRouter configured from the global settings."""
+    return ProviderRouter(
+        modality=modality,
+        adapter_classes=adapter_classes,
+        providers=providers,
+        hedging_enabled=settings.PROVIDER_HEDGING_ENABLED,
+        percentile=settings.HEDGE_LATENCY_PERCENTILE,
+        min_delay=settings.HEDGE_MIN_DELAY_SECONDS,
+        max_delay=settings.HEDGE_MAX_DELAY_SECONDS,
+    )
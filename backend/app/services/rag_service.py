@@ -0,0 +1,150 @@
+# backend/app/services/rag_service.py
+# =================================================================
+#
+#               Retrieval-Augmented Generation Service
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Builds the knowledge-base context that is sent to the LLM along
+#  with the user's question, so answers are grounded and prompt size
+#  stays bounded.
+#
+#  Key Features:
+#  -------------
+#  - Retrieves top-k chunks through the hybrid RetrievalService
+#    (query embedding + BM25 + vector search).
+#  - Drops exact and near-duplicate chunks (token-set Jaccard).
+#  - Optionally re-ranks the candidates with a cross-encoder.
+#  - Greedily packs the best chunks into a fixed token budget, counting
+#    tokens like the chunker does (`app.utils.chunking.estimate_tokens`).
+#  - Formats a compact, numbered context prompt.
+#
+# =================================================================
+
+import hashlib
+import logging
+
+from app.core.config import settings
+from app.services.bm25_index import tokenize
+from app.services.rerank_service import RerankService
+from app.services.retrieval_service import RetrievalService, get_retrieval_service
+from app.utils.chunking import estimate_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` to at most `max_tokens`, preferring a sentence boundary."""
+    cut = truncate_to_tokens(text, max_tokens)
+    boundary = cut.rfind(". ")
+    if boundary > len(cut) // 2:
+        return cut[: boundary + 1]
+    return cut
+
+
+class RAGService:
+    """
+    Retrieves, de-duplicates and packs knowledge-base context for a query.
+    """
+
+    def __init__(
+        self,
+        retrieval_service: RetrievalService | None = None,
+        rerank_service: RerankService | None = None,
+    ):
+        self.retrieval_service = retrieval_service or get_retrieval_service()
+        self.rerank_service = rerank_service
+        if self.rerank_service is None and settings.RERANK_ENABLED:
+            self.rerank_service = RerankService()
+
+    @staticmethod
+    def deduplicate(chunks: list[dict], max_similarity: float) -> list[dict]:
+        """
+        Keeps chunks in rank order, dropping any whose text is identical or
+        whose token-set Jaccard similarity with a kept chunk exceeds
+        `max_similarity`.
+        """
+        kept, seen_hashes, kept_terms = [], set(), []
+        for chunk in chunks:
+            text = chunk.get("metadata", {}).get("text", "")
+            if not text:
+                continue
+            digest = hashlib.sha256(" ".join(text.split()).lower().encode()).digest()
+            if digest in seen_hashes:
+                continue
+            terms = set(tokenize(text))
+            if any(
+                len(terms & other) / (len(terms | other) or 1) > max_similarity
+                for other in kept_terms
+            ):
+                continue
+            seen_hashes.add(digest)
+            kept_terms.append(terms)
+            kept.append(chunk)
+        return kept
+
+    @staticmethod
+    def pack(chunks: list[dict], token_budget: int) -> list[dict]:
+        """
+        Greedily selects chunks in rank order that fit in `token_budget`.
+        Chunks that do not fit are skipped so smaller, lower-ranked ones can
+        still use the remaining budget. If not even the best chunk fits, it
+        is truncated so the context is never empty.
+        """
+        packed, used = [], 0
+        for chunk in chunks:
+            text = chunk["metadata"]["text"]
+            tokens = estimate_tokens(text)
+            if used + tokens <= token_budget:
+                packed.append({**chunk, "text": text, "tokens": tokens})
+                used += tokens
+        if not packed and chunks and token_budget > 0:
+            text = _truncate_to_tokens(chunks[0]["metadata"]["text"], token_budget)
+            packed.append({**chunks[0], "text": text, "tokens": estimate_tokens(text)})
+        return packed
+
+    @staticmethod
+    def build_prompt(question: str, context: list[dict]) -> str:
+        """Prepends the numbered context chunks to the user's question."""
+        if not context:
+            return question
+        sources = "\n\n".join(
+            f"[{i}] {chunk['text']}" for i, chunk in enumerate(context, start=1)
+        )
+        return (
+            "Answer the question concisely using the context below. "
+            "If the context is not relevant, answer from general knowledge.\n\n"
+            f"Context:\n{sources}\n\n"
+            f"Question: {question}"
+        )
+
+    async def get_context(
+        self,
+        query: str,
+        top_k: int | None = None,
+        token_budget: int | None = None,
+        filter: dict | None = None,
+    ) -> list[dict]:
+        """
+        Returns the packed context chunks (id, score, text, tokens, metadata)
+        for `query`. Retrieval errors yield an empty context.
+        """
+        top_k = top_k or settings.RAG_TOP_K
+        # Re-ranking needs a deeper candidate list to choose from
+        depth = max(top_k, settings.RERANK_CANDIDATES) if self.rerank_service else top_k
+        try:
+            chunks = await self.retrieval_service.search(
+                query, top_k=depth, filter=filter
+            )
+        except Exception as e:
+            logger.error(f"Knowledge base retrieval failed: {e}")
+            return []
+        unique = self.deduplicate(chunks, settings.RAG_DEDUP_MAX_SIMILARITY)
+        if self.rerank_service:
+            unique = await self.rerank_service.rerank(query, unique, top_n=top_k)
+        budget = (
+            settings.RAG_CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+        )
+        return self.pack(unique, budget)
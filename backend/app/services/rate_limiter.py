@@ -0,0 +1,393 @@
+# backend/app/services/rate_limiter.py
+# =================================================================
+#
+#                   Provider Rate Limiter
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Shared admission control placed in front of every model adapter
+#  call. It keeps request rate and concurrency under what the provider
+#  accepts so bursts queue up locally instead of turning into 429
+#  error storms.
+#
+#  Key Features:
+#  -------------
+#  - Token bucket per (provider, model) for the request rate.
+#  - AIMD adaptive concurrency limit: grows additively on successful
+#    calls, halves on 429s, 5xx responses, timeouts and connection
+#    errors or when latency exceeds the target; other failures leave it
+#    unchanged.
+#  - FIFO queueing with deadlines; callers that cannot be admitted in
+#    time get a `RateLimitExceeded` instead of waiting forever.
+#  - Limiters are process-wide singletons keyed by provider and model.
+#
+# =================================================================
+
+import asyncio
+import collections
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Tuple
+
+import httpx
+import openai
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call cannot be admitted before its deadline."""
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Returns True if the exception represents a provider-side throttle (HTTP 429).
+    Works for `openai.RateLimitError` and any error exposing a `status_code`
+    or an HTTP `response`.
+    """
+    if getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """
+    Returns True if the exception suggests the provider is overloaded: a
+    5xx response, a timeout or a connection failure.
+    """
+    if isinstance(
+        error,
+        (
+            TimeoutError,
+            ConnectionError,
+            httpx.TimeoutException,
+            httpx.NetworkError,
+            openai.APIConnectionError,  # Includes openai.APITimeoutError
+        ),
+    ):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status_code, int) and status_code >= 500
+
+
+def get_retry_after(error: BaseException) -> float | None:
+    """Extracts the `Retry-After` hint (in seconds) from a throttling error."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Classic token bucket. Tokens refill continuously at `rate` per second up
+    to `capacity`; each admitted call consumes one token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def penalize(self, seconds: float) -> None:
+        """
+        Drains the bucket so that no call is admitted for roughly `seconds`.
+        Used when the provider tells us to back off (Retry-After).
+        """
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+    async def acquire(self, deadline: float) -> None:
+        """
+        Reserves a token and waits until it has refilled, failing fast if
+        that would take longer than the monotonic `deadline`. Reservations
+        let the balance go negative, which keeps waiters in FIFO order
+        without a lock.
+
+        Raises:
+            RateLimitExceeded: If no token becomes available before the deadline.
+        """
+        self._refill()
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        if time.monotonic() + wait > deadline:
+            raise RateLimitExceeded(
+                f"Token bucket would not refill within the deadline "
+                f"(needs {wait:.2f}s)."
+            )
+        self._tokens -= 1
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._tokens += 1
+                raise
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit tuned with AIMD (additive increase, multiplicative
+    decrease). Each successful call grows the limit by roughly one slot per
+    "window" of `limit` calls; a throttle, an overload error or a slow call
+    multiplies it by `backoff_factor`. Other failures leave it unchanged.
+    Waiters are served in FIFO order.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        initial_limit: int | None = None,
+        min_limit: int = 1,
+        latency_target: float | None = None,
+        backoff_factor: float = 0.5,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_factor = backoff_factor
+        self._limit = float(initial_limit or max(min_limit, max_limit // 2))
+        self._in_flight = 0
+        self._waiters: collections.deque[asyncio.Future] = collections.deque()
+        self._last_backoff = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self, deadline: float) -> None:
+        """
+        Takes a concurrency slot, queueing until the monotonic `deadline`.
+
+        Raises:
+            RateLimitExceeded: If no slot frees up before the deadline.
+        """
+        if self._in_flight < self.limit and not self.queued:
+            self._in_flight += 1
+            return
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timer = loop.call_later(
+            max(0.0, deadline - time.monotonic()), self._expire, waiter
+        )
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation.
+            if waiter.done() and not waiter.cancelled() and not waiter.exception():
+                self.release_slot()
+            raise
+        finally:
+            timer.cancel()
+
+    @staticmethod
+    def _expire(waiter: asyncio.Future) -> None:
+        if not waiter.done():
+            waiter.set_exception(
+                RateLimitExceeded("Timed out waiting for a concurrency slot.")
+            )
+
+    def release(
+        self, latency: float, congested: bool = False, failed: bool = False
+    ) -> None:
+        """
+        Returns a slot and adapts the limit to the observed outcome. Only
+        successful calls grow the limit.
+
+        Args:
+            latency: Wall-clock duration of the call, in seconds.
+            congested: True if the call failed with a sign of provider
+                overload (a 429, a 5xx, a timeout or a connection error).
+            failed: True if the call failed for any reason.
+        """
+        too_slow = self.latency_target is not None and latency > self.latency_target
+        if congested or too_slow:
+            self._backoff(latency)
+        elif not failed:
+            self._limit = min(self.max_limit, self._limit + 1 / max(self._limit, 1))
+        self.release_slot()
+
+    def _backoff(self, latency: float) -> None:
+        # Collapse at most once per latency window, so a burst of 429s that
+        # were all in flight together only halves the limit once.
+        now = time.monotonic()
+        if now - self._last_backoff < max(latency, 1.0):
+            return
+        self._last_backoff = now
+        self._limit = max(self.min_limit, self._limit * self.backoff_factor)
+
+    def release_slot(self) -> None:
+        """Returns a slot without feeding the outcome into the AIMD loop."""
+        self._in_flight -= 1
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+
+class ProviderRateLimiter:
+    """
+    Combines a token bucket and an adaptive concurrency limiter for a
+    single (provider, model) pair.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        queue_timeout: float,
+        latency_target: float | None = None,
+    ):
+        self.name = name
+        self.queue_timeout = queue_timeout
+        self.bucket = TokenBucket(rate=rate, capacity=burst)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            max_limit=max_concurrency, latency_target=latency_target
+        )
+        self._throttled_total = 0
+        self._rejected_total = 0
+
+    @asynccontextmanager
+    async def slot(self, timeout: float | None = None):
+        """
+        Async context manager admitting one provider call.
+
+        The wrapped block must let provider exceptions propagate so that
+        429s can be observed; adapters keep their own error handling
+        outside of this context.
+
+        Raises:
+            RateLimitExceeded: If the call cannot be admitted within `timeout`
+            (defaults to the limiter's queue timeout).
+        """
+        deadline = time.monotonic() + (timeout or self.queue_timeout)
+        try:
+            await self.concurrency.acquire(deadline)
+        except RateLimitExceeded:
+            self._rejected_total += 1
+            raise
+        try:
+            await self.bucket.acquire(deadline)
+        except BaseException as e:
+            if isinstance(e, RateLimitExceeded):
+                self._rejected_total += 1
+            self.concurrency.release_slot()
+            raise
+
+        start = time.monotonic()
+        congested = failed = False
+        try:
+            yield
+        except BaseException as e:
+            failed = True
+            throttled = is_rate_limit_error(e)
+            congested = throttled or is_overload_error(e)
+            if throttled:
+                self._throttled_total += 1
+                retry_after = get_retry_after(e)
+                if retry_after:
+                    self.bucket.penalize(retry_after)
+                logger.warning(
+                    f"Provider '{self.name}' throttled the call; "
+                    f"concurrency limit now {self.concurrency.limit}."
+                )
+            raise
+        finally:
+            self.concurrency.release(
+                time.monotonic() - start, congested=congested, failed=failed
+            )
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the limiter state for monitoring."""
+        return {
+            "name": self.name,
+            "tokens": round(self.bucket.tokens, 2),
+            "concurrency_limit": self.concurrency.limit,
+            "in_flight": self.concurrency.in_flight,
+            "queued": self.concurrency.queued,
+            "throttled_total": self._throttled_total,
+            "rejected_total": self._rejected_total,
+        }
+
+
+_PROVIDER_LIMITS: Dict[str, Tuple[float, int, int]] = {
+    "openai": (
+        settings.OPENAI_RATE_LIMIT_RPS,
+        settings.OPENAI_RATE_LIMIT_BURST,
+        settings.OPENAI_MAX_CONCURRENCY,
+    ),
+    "huggingface": (
+        settings.HF_RATE_LIMIT_RPS,
+        settings.HF_RATE_LIMIT_BURST,
+        settings.HF_MAX_CONCURRENCY,
+    ),
+    "gtts": (
+        settings.GTTS_RATE_LIMIT_RPS,
+        settings.GTTS_RATE_LIMIT_BURST,
+        settings.GTTS_MAX_CONCURRENCY,
+    ),
+}
+
+_limiters: Dict[Tuple[str, str], ProviderRateLimiter] = {}
+
+
+def get_rate_limiter(provider: str, model: str) -> ProviderRateLimiter:
+    """
+    Returns the process-wide limiter for a provider and model, creating it
+    on first use. Unknown providers get the OpenAI limits.
+    """
+    key = (provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        rate, burst, max_concurrency = _PROVIDER_LIMITS.get(
+            provider, _PROVIDER_LIMITS["openai"]
+        )
+        limiter = ProviderRateLimiter(
+            name=f"{provider}:{model}",
+            rate=rate,
+            burst=burst,
+            max_concurrency=max_concurrency,
+            queue_timeout=settings.RATE_LIMIT_QUEUE_TIMEOUT_SECONDS,
+            latency_target=settings.RATE_LIMIT_LATENCY_TARGET_SECONDS,
+        )
+        _limiters[key] = limiter
+    return limiter
+
+
+def get_rate_limiter_stats() -> list[dict]:
+    """Returns stats for every limiter created in this process."""
+    return [limiter.stats() for limiter in _limiters.values()]
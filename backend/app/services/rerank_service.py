@@ -0,0 +1,134 @@
+# backend/app/services/rerank_service.py
+# =================================================================
+#
+#                   Cross-Encoder Re-Rank Service
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Re-orders retrieved knowledge-base chunks with a local
+#  cross-encoder, which reads the query and chunk together and is
+#  more accurate than the bi-encoder/BM25 scores used for retrieval.
+#
+#  Key Features:
+#  -------------
+#  - Scores all query-chunk pairs of a batch in one forward pass.
+#  - Walks candidates in retrieval order and stops early once a batch
+#    no longer changes the top-n, or when the next batch would not
+#    fit in the per-request millisecond budget.
+#  - Caches scores per (query hash, chunk id) in an LRU cache, so
+#    repeated questions skip the model entirely.
+#  - Falls back to the retrieval order if the model is unavailable.
+#
+# =================================================================
+
+import asyncio
+import hashlib
+import logging
+import time
+
+from app.core.config import settings
+from cachetools import LRUCache
+from sentence_transformers import CrossEncoder
+
+logger = logging.getLogger(__name__)
+
+
+def _query_hash(query: str) -> str:
+    return hashlib.sha256(" ".join(query.lower().split()).encode()).hexdigest()[:16]
+
+
+class RerankService:
+    """
+    Service for re-ranking retrieved chunks with a cross-encoder.
+    """
+
+    _model = None
+    _scores: LRUCache = LRUCache(maxsize=settings.RERANK_CACHE_SIZE)
+
+    def __init__(self, model_name: str | None = None):
+        self.model_name = model_name or settings.RERANK_MODEL
+        if RerankService._model is None:
+            try:
+                # Load model only once
+                RerankService._model = CrossEncoder(self.model_name)
+                print(f"Re-rank model '{self.model_name}' loaded successfully.")
+            except Exception as e:
+                print(f"Error loading re-rank model '{self.model_name}': {e}")
+                RerankService._model = None
+
+    async def _score_batch(self, query: str, chunks: list[dict]) -> list[float]:
+        pairs = [(query, chunk["metadata"]["text"]) for chunk in chunks]
+        # CrossEncoder.predict is synchronous, so run it in a thread pool
+        scores = await asyncio.to_thread(
+            RerankService._model.predict, pairs, batch_size=len(pairs)
+        )
+        return [float(score) for score in scores]
+
+    async def rerank(
+        self,
+        query: str,
+        chunks: list[dict],
+        top_n: int,
+        budget_ms: float | None = None,
+    ) -> list[dict]:
+        """
+        Returns `chunks` re-ordered by cross-encoder score (stored as
+        "rerank_score"), best first and cut to `top_n`. Chunks that were
+        not scored within the budget keep their retrieval order after the
+        scored ones.
+        """
+        if RerankService._model is None or not chunks:
+            return chunks[:top_n]
+
+        deadline = time.monotonic() + (budget_ms or settings.RERANK_BUDGET_MS) / 1000
+        query_hash = _query_hash(query)
+        batch_size = settings.RERANK_BATCH_SIZE
+        scores: dict[str, float] = {}
+        pending: list[dict] = []
+        for chunk in chunks:
+            cached = self._scores.get((query_hash, chunk["id"]))
+            if cached is None:
+                pending.append(chunk)
+            else:
+                scores[chunk["id"]] = cached
+
+        def top_ids() -> set[str]:
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            return set(ranked[:top_n])
+
+        batch_seconds = 0.0
+        for offset in range(0, len(pending), batch_size):
+            if time.monotonic() + batch_seconds > deadline:
+                logger.info(
+                    f"Re-rank budget reached after scoring {len(scores)} "
+                    f"of {len(chunks)} chunks."
+                )
+                break
+            batch = pending[offset : offset + batch_size]
+            start = time.monotonic()
+            try:
+                batch_scores = await self._score_batch(query, batch)
+            except Exception as e:
+                logger.error(f"Re-ranking failed: {e}")
+                break
+            batch_seconds = time.monotonic() - start
+
+            before = top_ids()
+            for chunk, score in zip(batch, batch_scores):
+                scores[chunk["id"]] = score
+                self._scores[(query_hash, chunk["id"])] = score
+            # Retrieval already ranks the likeliest chunks first, so once a
+            # full batch fails to enter the top-n the ranking is settled.
+            if len(before) >= top_n and top_ids() == before:
+                break
+
+        scored = sorted(
+            (chunk for chunk in chunks if chunk["id"] in scores),
+            key=lambda chunk: scores[chunk["id"]],
+            reverse=True,
+        )[:top_n]
+        unscored = [chunk for chunk in chunks if chunk["id"] not in scores]
+        reranked = [{**chunk, "rerank_score": scores[chunk["id"]]} for chunk in scored]
+        return reranked + unscored[: top_n - len(reranked)]
@@ -0,0 +1,65 @@
+# backend/app/services/result_cache.py
+# =================================================================
+#
+#                      Task Result Cache
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Stores finished task results in Redis under the task id, so status
+#  lookups do not have to go to the Celery result backend.
+#
+#  Key Features:
+#  -------------
+#  - Values are binary envelopes (`app.utils.envelope`): the stored
+#    type is known without trying to parse it.
+#  - Batched reads (one MGET) and pipelined writes for bulk lookups.
+#  - Values in any other format (e.g. JSON written before the envelope
+#    was introduced) count as missing and are refilled from the result
+#    backend.
+#
+# =================================================================
+
+import redis
+from app.core.config import settings
+from app.utils import envelope
+
+
+class ResultCache:
+    """
+    Task results in Redis, keyed by task id.
+    """
+
+    def __init__(self, redis_client=None):
+        # Binary client: envelopes are bytes.
+        self.redis_client = redis_client or redis.from_url(settings.REDIS_URL)
+
+    @staticmethod
+    def _decode(value):
+        if not envelope.is_envelope(value):
+            return None
+        try:
+            return envelope.decode(value)
+        except envelope.EnvelopeError:
+            return None
+
+    def get(self, task_id: str):
+        """The cached result of `task_id`, or None."""
+        return self._decode(self.redis_client.get(task_id))
+
+    def mget(self, task_ids: list[str]) -> list:
+        """The cached results of `task_ids` (None where missing), in one MGET."""
+        return [self._decode(value) for value in self.redis_client.mget(task_ids)]
+
+    def set(self, task_id: str, result, ex: int) -> None:
+        self.redis_client.set(task_id, envelope.encode(result), ex=ex)
+
+    def set_many(self, results: dict, ex: int) -> None:
+        """Caches several results in one pipelined round trip."""
+        if not results:
+            return
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for task_id, result in results.items():
+            pipeline.set(task_id, envelope.encode(result), ex=ex)
+        pipeline.execute()
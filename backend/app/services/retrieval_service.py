@@ -0,0 +1,403 @@
+# backend/app/services/retrieval_service.py
+# =================================================================
+#
+#                  Hybrid Retrieval Service
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Retrieves knowledge base documents by combining keyword (BM25)
+#  and semantic (vector) search, so both exact-term queries like
+#  SKUs or error codes and paraphrased questions find the right
+#  documents.
+#
+#  Key Features:
+#  -------------
+#  - Splits documents into token-bounded chunks and indexes every
+#    chunk in the BM25 index and the vector index. Re-ingesting a
+#    document only embeds chunks whose content changed.
+#  - Runs keyword search while the query embedding is computed, then
+#    fuses both rankings with reciprocal-rank fusion (RRF).
+#  - Applies metadata filters (e.g. tenant, category) to both
+#    retrievers through the vector store's field bitmaps.
+#  - Enforces a total latency budget: if vector search does not
+#    finish in time, keyword results are returned on their own.
+#  - Chunk vectors are also kept in a Redis embedding cache, so a
+#    process rebuilding its in-memory index does not re-embed them.
+#  - Vectors live in a namespace per embedding model. During a model
+#    migration new chunks are written to both the active and the target
+#    namespace, and queries move to the target in one atomic switch.
+#    The active model is shared between processes (see
+#    `app.services.embedding_model_registry`); the other processes
+#    follow a migration on their next index refresh.
+#
+# =================================================================
+
+import asyncio
+import logging
+import time
+from functools import lru_cache
+
+import redis
+from app.core.config import settings
+from app.services.bm25_index import BM25Index
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_model_registry import EmbeddingModelRegistry
+from app.services.embedding_service import EmbeddingService
+from app.services.vector_db_service import PineconeService, drop_namespace
+from app.utils.chunking import Chunk, NearDuplicateDetector, chunk_document
+
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[str]], k: int = 60
+) -> list[tuple[str, float]]:
+    """
+    Fuses several ranked id lists into one. Each id scores the sum of
+    1 / (k + rank) over the lists it appears in (ranks start at 1).
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class EmbeddingNamespace:
+    """An embedding model together with the vector index holding its vectors."""
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        vector_db: PineconeService,
+        embedding_cache: EmbeddingCache | None = None,
+    ):
+        self.embedding_service = embedding_service
+        self.vector_db = vector_db
+        self.embedding_cache = embedding_cache
+
+    @property
+    def name(self) -> str:
+        return self.embedding_service.model_name
+
+    async def vectors(self, chunks: list[tuple[str, str]]) -> tuple[dict, int]:
+        """
+        The vectors of (chunk id, text) pairs by chunk id. Vectors found in
+        the embedding cache are reused; the rest are embedded in one batch
+        and cached. Also returns how many chunks were embedded.
+        """
+        cached = {}
+        if chunks and self.embedding_cache is not None:
+            cached = await asyncio.to_thread(
+                self.embedding_cache.get_many,
+                self.name,
+                [id for id, _ in chunks],
+            )
+        to_embed = [(id, text) for id, text in chunks if id not in cached]
+        if to_embed:
+            vectors = await self.embedding_service.embed_text(
+                [text for _, text in to_embed]
+            )
+            embedded = {id: vector for (id, _), vector in zip(to_embed, vectors)}
+            if self.embedding_cache is not None:
+                await asyncio.to_thread(
+                    self.embedding_cache.set_many, self.name, embedded
+                )
+            cached.update(embedded)
+        return cached, len(to_embed)
+
+    async def write(self, chunks: list[tuple[Chunk, dict]]) -> int:
+        """
+        Embeds and stores the chunks this namespace does not have yet, and
+        refreshes the metadata of the ones it has. Returns how many chunks
+        were embedded.
+        """
+        index = self.vector_db.index
+        missing = []
+        for chunk, metadata in chunks:
+            if chunk.id not in index:
+                missing.append((chunk, metadata))
+            elif index.get_metadata(chunk.id) != metadata:
+                index.set_metadata(chunk.id, metadata)
+        vectors, embedded = await self.vectors(
+            [(chunk.id, chunk.text) for chunk, _ in missing]
+        )
+        for chunk, metadata in missing:
+            await self.vector_db.upsert_vector(
+                id=chunk.id, vector=vectors[chunk.id], metadata=metadata
+            )
+        return embedded
+
+
+class RetrievalService:
+    """
+    Hybrid BM25 + vector retrieval over the knowledge base.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService | None = None,
+        vector_db: PineconeService | None = None,
+        keyword_index: BM25Index | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        model_registry: EmbeddingModelRegistry | None = None,
+    ):
+        embedding_service = embedding_service or EmbeddingService()
+        self.embedding_cache = embedding_cache
+        # Shared active model; without it the model is this process's own.
+        self.model_registry = model_registry
+        self.active = EmbeddingNamespace(
+            embedding_service,
+            vector_db or PineconeService(namespace=embedding_service.model_name),
+            embedding_cache,
+        )
+        # Namespace being migrated to, written alongside the active one
+        self.target: EmbeddingNamespace | None = None
+        self.keyword_index = keyword_index if keyword_index is not None else BM25Index()
+        # Chunk ids currently indexed for each document
+        self._doc_chunks: dict[str, list[str]] = {}
+
+    @property
+    def embedding_service(self) -> EmbeddingService:
+        return self.active.embedding_service
+
+    @property
+    def vector_db(self) -> PineconeService:
+        return self.active.vector_db
+
+    def namespaces(self) -> list[EmbeddingNamespace]:
+        """The namespaces writes go to: the active one, plus any target."""
+        return [self.active] + ([self.target] if self.target else [])
+
+    def begin_migration(self, target: EmbeddingNamespace) -> None:
+        """Starts dual-writing new chunks to `target`."""
+        self.target = target
+
+    def abort_migration(self) -> EmbeddingNamespace | None:
+        target, self.target = self.target, None
+        return target
+
+    async def new_namespace(self, model_name: str) -> EmbeddingNamespace:
+        """
+        A namespace for `model_name`. Loading the model blocks, so it runs
+        in a worker thread.
+        """
+        return EmbeddingNamespace(
+            await asyncio.to_thread(EmbeddingService, model_name),
+            PineconeService(namespace=model_name),
+            self.embedding_cache,
+        )
+
+    async def sync_active_model(self) -> str:
+        """
+        Switches to the shared active model if another process migrated to
+        it, and returns the active model. The new namespace starts empty:
+        documents must be indexed again, which reads their vectors from the
+        embedding cache the migration filled.
+        """
+        if self.model_registry is None or self.target is not None:
+            return self.active.name
+        try:
+            model_name = await asyncio.to_thread(self.model_registry.active_model)
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Could not read the active embedding model: {e}")
+            return self.active.name
+        if model_name and model_name != self.active.name:
+            namespace = await self.new_namespace(model_name)
+            previous = self.switch_to(namespace)
+            drop_namespace(previous.vector_db.namespace)
+            logger.info(
+                f"Switched from embedding model '{previous.name}' to '{model_name}'."
+            )
+        return self.active.name
+
+    def switch_to(self, target: EmbeddingNamespace) -> EmbeddingNamespace:
+        """
+        Makes `target` the namespace queries and writes use. This is a plain
+        attribute swap with no await in between, so every query sees either
+        the old or the new namespace. Returns the previous namespace.
+        """
+        previous, self.active = self.active, target
+        if self.target is target:
+            self.target = None
+        return previous
+
+    def chunk(self, doc_id: str, text: str) -> list[Chunk]:
+        """Splits a document into chunks sized for the embedding model."""
+        return chunk_document(
+            doc_id,
+            text,
+            max_tokens=settings.CHUNK_MAX_TOKENS,
+            overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+            count_tokens=self.embedding_service.count_tokens,
+            detector=NearDuplicateDetector(settings.CHUNK_SIMHASH_MAX_DISTANCE),
+        )
+
+    async def index_document(
+        self, doc_id: str, text: str, metadata: dict | None = None
+    ) -> dict:
+        """Adds or replaces a document in both indexes."""
+        return await self.index_documents([(doc_id, text, metadata)])
+
+    async def index_documents(self, documents: list[tuple[str, str, dict]]) -> dict:
+        """
+        Adds or replaces (id, text, metadata) documents. Each document is
+        chunked; chunks whose id (and so content) is already indexed are
+        kept as they are, and only new chunks are embedded, in one batch.
+        Chunks that disappeared from a document are removed.
+        """
+        stats = dict(
+            documents=len(documents), chunks=0, embedded=0, skipped=0, removed=0
+        )
+        all_chunks: list[tuple[Chunk, dict]] = []
+        for doc_id, text, metadata in documents:
+            chunks = self.chunk(doc_id, text)
+            stats["chunks"] += len(chunks)
+            current = {chunk.id for chunk in chunks}
+            for stale in set(self._doc_chunks.get(doc_id, ())) - current:
+                await self._remove_chunk(stale)
+                stats["removed"] += 1
+            self._doc_chunks[doc_id] = [chunk.id for chunk in chunks]
+
+            for chunk in chunks:
+                chunk_metadata = {
+                    **(metadata or {}),
+                    "doc_id": doc_id,
+                    "chunk_index": chunk.index,
+                    "text": chunk.text,
+                }
+                all_chunks.append((chunk, chunk_metadata))
+
+        # Unchanged chunks only get their metadata refreshed, not re-embedded.
+        namespaces = self.namespaces()
+        stats["embedded"] = await namespaces[0].write(all_chunks)
+        for namespace in namespaces[1:]:
+            await namespace.write(all_chunks)
+        stats["skipped"] = len(all_chunks) - stats["embedded"]
+        for chunk, _ in all_chunks:
+            if chunk.id not in self.keyword_index:
+                self.keyword_index.add(chunk.id, chunk.text)
+        return stats
+
+    async def precompute_embeddings(self, doc_id: str, text: str) -> dict:
+        """
+        Chunks a document and puts its chunk vectors in the embedding cache
+        without indexing it in this process. The processes that index the
+        document later read the vectors from the cache.
+        """
+        chunks = self.chunk(doc_id, text)
+        embedded = 0
+        for namespace in self.namespaces():
+            _, count = await namespace.vectors(
+                [(chunk.id, chunk.text) for chunk in chunks]
+            )
+            embedded += count
+        return {"chunks": len(chunks), "embedded": embedded}
+
+    def is_indexed(self, doc_id: str) -> bool:
+        """Whether the document's chunks are in the active namespace."""
+        chunk_ids = self._doc_chunks.get(doc_id)
+        index = self.vector_db.index
+        return chunk_ids is not None and all(id in index for id in chunk_ids)
+
+    async def _remove_chunk(self, chunk_id: str) -> None:
+        for namespace in self.namespaces():
+            await namespace.vector_db.delete_vector(chunk_id)
+        self.keyword_index.remove(chunk_id)
+
+    async def remove_document(self, doc_id: str) -> bool:
+        """Removes all chunks of a document from both indexes."""
+        chunk_ids = self._doc_chunks.pop(doc_id, [])
+        for chunk_id in chunk_ids:
+            await self._remove_chunk(chunk_id)
+        return bool(chunk_ids)
+
+    @staticmethod
+    async def _vector_search(
+        namespace: EmbeddingNamespace, query: str, top_k: int, filter: dict | None
+    ) -> list[dict]:
+        vector = await namespace.embedding_service.embed_text(query)
+        return await namespace.vector_db.query_vectors(
+            vector, top_k=top_k, filter=filter
+        )
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        budget_ms: float | None = None,
+        filter: dict | None = None,
+    ) -> list[dict]:
+        """
+        Returns the `top_k` best chunks for `query` as id/score/metadata
+        dicts, where score is the fused RRF score and the metadata carries
+        the chunk text and its `doc_id`. `filter` restricts results
+        to documents whose metadata matches it (see InMemoryVectorIndex).
+        """
+        budget = (budget_ms or settings.RETRIEVAL_LATENCY_BUDGET_MS) / 1000
+        deadline = time.monotonic() + budget
+        depth = max(top_k, settings.RETRIEVAL_CANDIDATES)
+        # Pin the namespace so a concurrent switch cannot mix two models.
+        namespace = self.active
+        index = namespace.vector_db.index
+
+        # Start the embedding first and let it reach the embedding model
+        # (a worker thread or the inference pool) before BM25 takes the
+        # loop, so both run at the same time.
+        vector_task = asyncio.create_task(
+            self._vector_search(namespace, query, depth, filter)
+        )
+        await asyncio.sleep(0)
+        keyword_hits = self.keyword_index.search(
+            query, top_k=depth, allowed=index.matcher(filter)
+        )
+
+        vector_hits: list[dict] = []
+        try:
+            vector_hits = await asyncio.wait_for(
+                vector_task, timeout=max(0.0, deadline - time.monotonic())
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Vector search exceeded the {budget * 1000:.0f}ms retrieval budget; "
+                "returning keyword results only."
+            )
+        except Exception as e:
+            logger.error(f"Vector search failed: {e}")
+
+        fused = reciprocal_rank_fusion(
+            [
+                [doc_id for doc_id, _ in keyword_hits],
+                [hit["id"] for hit in vector_hits],
+            ],
+            k=settings.RETRIEVAL_RRF_K,
+        )
+
+        metadata = {hit["id"]: hit["metadata"] for hit in vector_hits}
+        results = []
+        for doc_id, score in fused[:top_k]:
+            if doc_id not in metadata:
+                metadata[doc_id] = index.get_metadata(doc_id) or {}
+            results.append({"id": doc_id, "score": score, "metadata": metadata[doc_id]})
+        return results
+
+
+@lru_cache
+def get_retrieval_service() -> RetrievalService:
+    """
+    Returns the process-wide retrieval service, using the embedding model
+    that is active across processes.
+    """
+    registry = EmbeddingModelRegistry()
+    try:
+        model_name = registry.active_model()
+    except redis.exceptions.RedisError as e:
+        logger.warning(f"Could not read the active embedding model: {e}")
+        model_name = None
+    return RetrievalService(
+        embedding_service=EmbeddingService(model_name),
+        embedding_cache=EmbeddingCache(),
+        model_registry=registry,
+    )
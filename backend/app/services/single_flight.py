@@ -0,0 +1,163 @@
+# backend/app/services/single_flight.py
+# =================================================================
+#
+#                  Single-Flight Request Coalescing
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Makes identical concurrent AI requests (same image, same prompt)
+#  share one provider call instead of each paying for their own while
+#  the cache is still empty.
+#
+#  Key Features:
+#  -------------
+#  - In-process: concurrent callers with the same key await one
+#    shared task.
+#  - Across processes: the first caller takes a short Redis lease
+#    (SET NX EX) and writes its result under the cache key; the
+#    others poll that key and return the leader's result.
+#  - If the leader fails or its lease expires without a result, a
+#    waiting follower takes over; if Redis is unavailable, callers
+#    fall back to in-process coalescing only.
+#  - Redis commands run in worker threads, so polling followers do
+#    not block the event loop.
+#
+# =================================================================
+
+import asyncio
+import logging
+import time
+import uuid
+from functools import lru_cache
+from typing import Awaitable, Callable
+
+import redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Deletes the lease only if it is still ours (it may have expired and been
+# taken over by another process meanwhile).
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a cache key.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        lease_seconds: float | None = None,
+        wait_seconds: float | None = None,
+        poll_interval: float | None = None,
+    ):
+        self.redis_client = redis_client
+        self.lease_seconds = lease_seconds or settings.SINGLE_FLIGHT_LEASE_SECONDS
+        self.wait_seconds = wait_seconds or settings.SINGLE_FLIGHT_WAIT_SECONDS
+        self.poll_interval = (
+            poll_interval or settings.SINGLE_FLIGHT_POLL_INTERVAL_MS / 1000
+        )
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[str]],
+        ttl: int,
+        should_store: Callable[[str], bool] | None = None,
+    ) -> str:
+        """
+        Returns the result of `fn()`, running it at most once at a time per
+        `key` across all callers. A truthy result (that passes
+        `should_store`) is stored under `key` for `ttl` seconds, where
+        callers in other processes pick it up.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            # The call runs in its own task, so cancelling one caller does not
+            # cancel it for the others.
+            task = loop.create_task(self._lead_or_follow(key, fn, ttl, should_store))
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda _: self._forget(flight_key, task))
+        return await asyncio.shield(task)
+
+    def _forget(self, flight_key: tuple, task: asyncio.Task) -> None:
+        if self._in_flight.get(flight_key) is task:
+            del self._in_flight[flight_key]
+        if not task.cancelled():
+            task.exception()  # Retrieved, even if every caller went away
+
+    async def _redis(self, command: str, *args, **kwargs):
+        """Runs a (blocking) Redis command in a worker thread."""
+        return await asyncio.to_thread(
+            getattr(self.redis_client, command), *args, **kwargs
+        )
+
+    async def _lead_or_follow(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[str]],
+        ttl: int,
+        should_store: Callable[[str], bool] | None,
+    ) -> str:
+        if self.redis_client is None:
+            return await fn()
+        lease_key = f"{key}:lease"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_seconds
+        try:
+            while True:
+                if await self._redis(
+                    "set", lease_key, token, nx=True, ex=int(self.lease_seconds)
+                ):
+                    break
+                # Another process is computing it; wait for its result.
+                result = await self._redis("get", key)
+                if result:
+                    logger.info(f"Single-flight: reused result for '{key}'.")
+                    return result
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Single-flight: gave up waiting for '{key}'.")
+                    return await fn()
+                await asyncio.sleep(self.poll_interval)
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Single-flight lease error: {e}. Calling directly.")
+            return await fn()
+
+        try:
+            # The result may have landed between our last poll and the lease.
+            try:
+                result = await self._redis("get", key)
+                if result:
+                    return result
+            except redis.exceptions.RedisError:
+                pass
+            result = await fn()
+            if result and (should_store is None or should_store(result)):
+                try:
+                    await self._redis("set", key, result, ex=ttl)
+                except redis.exceptions.RedisError as e:
+                    logger.error(f"Single-flight: could not store result: {e}")
+            return result
+        finally:
+            try:
+                await self._redis("eval", _RELEASE_LEASE_SCRIPT, 1, lease_key, token)
+            except redis.exceptions.RedisError as e:
+                logger.error(f"Single-flight: could not release lease: {e}")
+
+
+@lru_cache
+def get_single_flight() -> SingleFlight:
+    """Returns the process-wide single-flight group."""
+    return SingleFlight(redis.from_url(settings.REDIS_URL, decode_responses=True))
@@ -0,0 +1,175 @@
+# backend/app/services/task_events.py
+# =================================================================
+#
+#                  Background Task Event Channel
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Pushes background task progress and completion to clients as it
+#  happens, so they do not have to poll the task status endpoint.
+#
+#  Key Features:
+#  -------------
+#  - Celery tasks publish events (progress, retrying, completed,
+#    failed) to a Redis pub/sub channel per task.
+#  - Each API process holds one pub/sub connection and fans events
+#    out to any number of local subscribers; a channel is subscribed
+#    only while someone is listening to it.
+#  - Server-Sent Events stream per task: subscribes first, then checks
+#    the status once, so a task that finished before the client
+#    connected is still reported, without polling.
+#
+# =================================================================
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Callable
+
+import redis.asyncio as aioredis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "task-events:"
+TERMINAL_EVENTS = {"completed", "failed"}
+
+
+def channel(task_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{task_id}"
+
+
+def publish_task_event(client, task_id: str, event: str, **data) -> None:
+    """
+    Publishes `event` for `task_id` with a synchronous Redis client (as used
+    in Celery workers). Errors are logged, never raised: a lost notification
+    must not fail the task, and clients can still fetch the status.
+    """
+    message = json.dumps({"task_id": task_id, "event": event, **data})
+    try:
+        client.publish(channel(task_id), message)
+    except Exception as e:
+        logger.warning(f"Could not publish '{event}' event for task {task_id}: {e}")
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+class TaskEventBroker:
+    """
+    Shares one Redis pub/sub connection between all event subscribers of
+    this process.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or aioredis.from_url(
+            settings.REDIS_URL, decode_responses=True
+        )
+        self._pubsub = None
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._reader: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, task_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Yields a queue that receives the events of `task_id` as dicts."""
+        name = channel(task_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self.client.pubsub()
+            subscribers = self._subscribers.setdefault(name, set())
+            if not subscribers:
+                await self._pubsub.subscribe(name)
+            subscribers.add(queue)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+        try:
+            yield queue
+        finally:
+            async with self._lock:
+                subscribers.discard(queue)
+                if not subscribers:
+                    self._subscribers.pop(name, None)
+                    await self._pubsub.unsubscribe(name)
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except Exception as e:
+                logger.error(f"Task event subscription failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message is None:
+                continue
+            try:
+                event = json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+            for queue in self._subscribers.get(message["channel"], ()):
+                queue.put_nowait(event)
+
+
+async def stream_task_events(
+    task_id: str,
+    broker: TaskEventBroker,
+    get_status: Callable[[str], dict],
+    keepalive_seconds: float | None = None,
+    timeout_seconds: float | None = None,
+) -> AsyncIterator[str]:
+    """
+    Yields Server-Sent Events for `task_id` until it completes or fails.
+    `get_status` is the (blocking) status lookup, called once.
+    """
+    keepalive = keepalive_seconds or settings.TASK_EVENTS_KEEPALIVE_SECONDS
+    deadline = time.monotonic() + (
+        timeout_seconds or settings.TASK_EVENTS_STREAM_TIMEOUT_SECONDS
+    )
+    async with broker.subscribe(task_id) as events:
+        # Subscribed before the lookup, so a completion cannot slip between.
+        status = await asyncio.to_thread(get_status, task_id)
+        if status["status"] == "SUCCESS":
+            yield format_sse(
+                {"task_id": task_id, "event": "completed", "result": status["result"]}
+            )
+            return
+        if status["status"] == "FAILURE":
+            yield format_sse(
+                {"task_id": task_id, "event": "failed", "error": status["result"]}
+            )
+            return
+
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                event = await asyncio.wait_for(
+                    events.get(), timeout=min(keepalive, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+            if event["event"] in TERMINAL_EVENTS:
+                return
+
+
+@lru_cache
+def get_task_event_broker() -> TaskEventBroker:
+    return TaskEventBroker()
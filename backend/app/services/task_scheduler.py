@@ -0,0 +1,229 @@
+# backend/app/services/task_scheduler.py
+# =================================================================
+#
+#               Background Task Scheduling and Admission
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Keeps interactive background jobs fast while some users submit
+#  bulk work: Celery's broker queues are FIFO, so without this layer
+#  one user's 500 generations delay everyone queued behind them.
+#
+#  Key Features:
+#  -------------
+#  - Two priority classes. Interactive jobs go straight to their own
+#    Celery queue, served by dedicated workers. Batch jobs go to a
+#    separate batch queue.
+#  - Batch jobs first wait in a Redis list per user. They are released
+#    to Celery by deficit round-robin across users (optionally weighted
+#    per user), and only while fewer than SCHEDULER_BATCH_MAX_IN_FLIGHT
+#    batch jobs are running, so the broker queue never builds a backlog
+#    that fairness could not reorder.
+#  - Admission control: interactive jobs are deferred to the batch class
+#    when the interactive queue is too deep, and batch submissions are
+#    rejected (`AdmissionError`) past the per-user or total pending
+#    limits.
+#
+#  Notes:
+#  ------
+#  - Workers: `celery -A app.core.celery_app worker -Q interactive` and
+#    `... worker -Q batch`. Staged multimodal chains keep their
+#    per-stage queues; the scheduler decides when they start.
+#  - Per-user weights live in the Redis hash `scheduler:weights`
+#    (user id -> weight, default 1) and can be changed at runtime.
+#  - The pending limits are checked without a transaction, so they are
+#    soft limits under concurrent submissions.
+#
+# =================================================================
+
+import bisect
+import json
+import logging
+import time
+import uuid
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from celery import signature
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+ANONYMOUS_USER = "anonymous"
+
+WEIGHTS_KEY = "scheduler:weights"
+_ACTIVE_USERS_KEY = "scheduler:batch:active"
+_DEFICITS_KEY = "scheduler:batch:deficit"
+_CURSOR_KEY = "scheduler:batch:cursor"
+_PENDING_KEY = "scheduler:batch:pending"
+_IN_FLIGHT_KEY = "scheduler:batch:in_flight"
+_DISPATCH_LOCK_KEY = "scheduler:batch:dispatch-lock"
+
+
+def user_queue_key(user_id: str) -> str:
+    return f"scheduler:batch:queue:{user_id}"
+
+
+class AdmissionError(Exception):
+    """Raised when a submission is rejected because the queues are full."""
+
+
+class TaskScheduler:
+    """
+    Routes Celery signatures by priority and releases batch work fairly.
+    """
+
+    def __init__(self, redis_client, app=None):
+        self.redis_client = redis_client
+        self.app = app or celery_app
+
+    def submit(
+        self,
+        sig,
+        user_id: str | None = None,
+        priority: str = INTERACTIVE,
+        cost: float = 1.0,
+    ) -> str:
+        """
+        Schedules the Celery signature `sig` (with its task id set) for
+        `user_id` and returns the class it was scheduled in.
+
+        Raises:
+            AdmissionError: If the batch class is over its pending limits.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'.")
+        if priority == INTERACTIVE:
+            depth = self.queue_depth(settings.SCHEDULER_INTERACTIVE_QUEUE)
+            if depth < settings.SCHEDULER_INTERACTIVE_MAX_DEPTH:
+                self._send(sig, settings.SCHEDULER_INTERACTIVE_QUEUE)
+                return INTERACTIVE
+            logger.warning(
+                f"Interactive queue holds {depth} jobs; deferring a job of "
+                f"'{user_id or ANONYMOUS_USER}' to the batch class."
+            )
+        self._enqueue_batch(sig, user_id or ANONYMOUS_USER, cost)
+        self.dispatch()
+        return BATCH
+
+    def queue_depth(self, queue: str) -> int:
+        """Jobs waiting in a Celery queue (the Redis broker keeps it as a list)."""
+        return self.redis_client.llen(queue)
+
+    def pending(self, user_id: str | None = None) -> int:
+        """Batch jobs not yet released to Celery, for one user or in total."""
+        if user_id is not None:
+            return self.redis_client.llen(user_queue_key(user_id))
+        return int(self.redis_client.get(_PENDING_KEY) or 0)
+
+    def dispatch(self) -> int:
+        """
+        Releases waiting batch jobs while there are free in-flight slots and
+        returns how many were released. Only one process dispatches at a time.
+        """
+        token = uuid.uuid4().hex
+        if not self.redis_client.set(_DISPATCH_LOCK_KEY, token, nx=True, ex=30):
+            return 0
+        try:
+            return self._dispatch()
+        except Exception as e:
+            # Jobs that could not be sent stay queued for the next dispatch.
+            logger.error(f"Could not release batch jobs: {e}")
+            return 0
+        finally:
+            if self.redis_client.get(_DISPATCH_LOCK_KEY) == token:
+                self.redis_client.delete(_DISPATCH_LOCK_KEY)
+
+    def task_finished(self, task_id: str) -> None:
+        """Frees the in-flight slot of a finished batch job."""
+        if self.redis_client.zrem(_IN_FLIGHT_KEY, task_id):
+            self.dispatch()
+
+    def _enqueue_batch(self, sig, user_id: str, cost: float) -> None:
+        if self.pending(user_id) >= settings.SCHEDULER_MAX_PENDING_PER_USER:
+            raise AdmissionError(f"Too many pending background jobs for '{user_id}'.")
+        if self.pending() >= settings.SCHEDULER_MAX_PENDING_TOTAL:
+            raise AdmissionError("Too many pending background jobs.")
+        job = json.dumps({"signature": sig, "cost": cost})
+        self.redis_client.rpush(user_queue_key(user_id), job)
+        self.redis_client.incr(_PENDING_KEY)
+        self.redis_client.sadd(_ACTIVE_USERS_KEY, user_id)
+
+    def _dispatch(self) -> int:
+        now = time.time()
+        timeout = settings.SCHEDULER_IN_FLIGHT_TIMEOUT_SECONDS
+        self.redis_client.zremrangebyscore(_IN_FLIGHT_KEY, "-inf", now - timeout)
+        slots = settings.SCHEDULER_BATCH_MAX_IN_FLIGHT - self.redis_client.zcard(
+            _IN_FLIGHT_KEY
+        )
+        released = 0
+        while slots > 0:
+            users = sorted(self.redis_client.smembers(_ACTIVE_USERS_KEY))
+            if not users:
+                break
+            # Each round starts after the user served last.
+            cursor = self.redis_client.get(_CURSOR_KEY)
+            start = bisect.bisect_right(users, cursor) if cursor else 0
+            for user_id in users[start:] + users[:start]:
+                if slots <= 0:
+                    break
+                sent = self._serve(user_id, slots)
+                self.redis_client.set(_CURSOR_KEY, user_id)
+                slots -= sent
+                released += sent
+        return released
+
+    def _serve(self, user_id: str, slots: int) -> int:
+        """One deficit round-robin visit; returns the number of jobs released."""
+        weight = float(self.redis_client.hget(WEIGHTS_KEY, user_id) or 1)
+        deficit = float(self.redis_client.hget(_DEFICITS_KEY, user_id) or 0)
+        deficit += settings.SCHEDULER_QUANTUM * weight
+        queue_key = user_queue_key(user_id)
+        sent = 0
+        while sent < slots:
+            raw = self.redis_client.lindex(queue_key, 0)
+            if raw is None:
+                self._deactivate(user_id)
+                return sent
+            job = json.loads(raw)
+            if job["cost"] > deficit:
+                break
+            self.redis_client.lpop(queue_key)
+            self.redis_client.decr(_PENDING_KEY)
+            self._start(job, queue_key)
+            deficit -= job["cost"]
+            sent += 1
+        self.redis_client.hset(_DEFICITS_KEY, user_id, deficit)
+        return sent
+
+    def _deactivate(self, user_id: str) -> None:
+        self.redis_client.srem(_ACTIVE_USERS_KEY, user_id)
+        self.redis_client.hdel(_DEFICITS_KEY, user_id)
+        # A submission may have slipped in between; it re-adds the user only
+        # if it ran after the removal, so check again.
+        if self.redis_client.llen(user_queue_key(user_id)):
+            self.redis_client.sadd(_ACTIVE_USERS_KEY, user_id)
+
+    def _start(self, job: dict, queue_key: str) -> None:
+        sig = signature(job["signature"], app=self.app)
+        task_id = sig.options.get("task_id") or sig.freeze().id
+        try:
+            self._send(sig, settings.SCHEDULER_BATCH_QUEUE)
+        except Exception:
+            # Put the job back at the head of its queue.
+            self.redis_client.lpush(queue_key, json.dumps(job))
+            self.redis_client.incr(_PENDING_KEY)
+            raise
+        self.redis_client.zadd(_IN_FLIGHT_KEY, {task_id: time.time()})
+
+    @staticmethod
+    def _send(sig, queue: str) -> None:
+        # A chain (also one rebuilt from JSON) is a `_chain`, not a `chain`.
+        if sig.get("subtask_type") == "chain":
+            sig.apply_async()  # Stages are routed to their own queues.
+        else:
+            sig.apply_async(queue=queue)
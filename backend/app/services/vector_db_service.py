@@ -1,49 +1,331 @@
 # backend/app/services/vector_db_service.py
 # =================================================================
 #
-#                 Vector Database Service (Placeholder)
+#                 Vector Database Service (In-Process)
 #
 # =================================================================
 #
 #  Purpose:
 #  --------
-#  Provides a placeholder implementation for a vector database service.
-#  This allows the application to run without a concrete vector DB
-#  dependency (like Pinecone) while the architecture is being developed.
+#  Provides vector storage and similarity search for the knowledge
+#  base. Until a managed vector DB (like Pinecone) is wired in, vectors
+#  are kept in an in-process NumPy index shared by every instance of
+#  the service in the same process.
 #
 #  Key Features:
 #  -------------
-#  - Implements the same method signatures as a real service.
-#  - Returns empty or default data.
-#  - Logs warnings to indicate it's a placeholder.
+#  - Same method signatures a managed vector DB service would expose.
+#  - Cosine similarity over L2-normalised vectors with a single
+#    matrix-vector product per query.
+#  - Upserts overwrite in place; deleted rows are recycled.
+#  - One index per namespace. Namespaces are named after the embedding
+#    model, because vectors of different models are not comparable.
+#  - Metadata filters (equality / $in) backed by per-field NumPy bool
+#    bitmaps. Selective filters score only the matching rows
+#    (pre-filter); broad ones score everything and mask afterwards
+#    (post-filter), which is cheaper than gathering most rows.
+#
+#  Limitations:
+#  ------------
+#  - The index lives in process memory: it is not shared between API
+#    workers and is lost on restart.
 #
 # =================================================================
 
+from typing import Any, Callable
+
+import numpy as np
 from app.core.config import settings
 
+# Metadata fields that are stored but never filtered on
+_UNFILTERED_FIELDS = {"text"}
+
+
+class InMemoryVectorIndex:
+    """Brute-force cosine similarity index backed by a growable matrix."""
+
+    def __init__(
+        self,
+        initial_capacity: int = 1024,
+        prefilter_max_selectivity: float | None = None,
+        max_field_cardinality: int | None = None,
+    ):
+        self._initial_capacity = initial_capacity
+        self.prefilter_max_selectivity = (
+            settings.VECTOR_PREFILTER_MAX_SELECTIVITY
+            if prefilter_max_selectivity is None
+            else prefilter_max_selectivity
+        )
+        self.max_field_cardinality = (
+            max_field_cardinality or settings.VECTOR_FILTER_MAX_CARDINALITY
+        )
+        self._vectors: np.ndarray | None = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: list[str | None] = []
+        self._metadata: list[dict | None] = []
+        self._positions: dict[str, int] = {}
+        self._free: list[int] = []
+        # field -> value -> rows having that value. Fields whose cardinality
+        # outgrows the limit lose their bitmaps and are matched row by row.
+        self._bitmaps: dict[str, dict[Any, np.ndarray]] = {}
+        self._unindexed_fields: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._positions
+
+    def ids(self) -> list[str]:
+        return list(self._positions)
+
+    @property
+    def dimension(self) -> int | None:
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    def _allocate_row(self, dimension: int) -> int:
+        if self._vectors is None:
+            self._vectors = np.zeros(
+                (self._initial_capacity, dimension), dtype=np.float32
+            )
+            self._alive = np.zeros(self._initial_capacity, dtype=bool)
+        if self._free:
+            return self._free.pop()
+
+        row = len(self._ids)
+        if row >= self._vectors.shape[0]:
+            # Grow geometrically so appends stay amortised O(1).
+            capacity = self._vectors.shape[0] * 2
+            vectors = np.zeros((capacity, dimension), dtype=np.float32)
+            vectors[:row] = self._vectors[:row]
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:row] = self._alive[:row]
+            self._vectors, self._alive = vectors, alive
+            for values in self._bitmaps.values():
+                for value, bitmap in values.items():
+                    grown = np.zeros(capacity, dtype=bool)
+                    grown[:row] = bitmap[:row]
+                    values[value] = grown
+        self._ids.append(None)
+        self._metadata.append(None)
+        return row
+
+    @staticmethod
+    def _field_values(value: Any) -> list:
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        return [v for v in values if isinstance(v, (str, int, float, bool))]
+
+    def _set_bits(self, row: int, metadata: dict | None, on: bool) -> None:
+        for field, value in (metadata or {}).items():
+            if field in _UNFILTERED_FIELDS or field in self._unindexed_fields:
+                continue
+            bitmaps = self._bitmaps.setdefault(field, {})
+            for v in self._field_values(value):
+                bitmap = bitmaps.get(v)
+                if bitmap is None:
+                    if not on:
+                        continue
+                    if len(bitmaps) >= self.max_field_cardinality:
+                        # Too many distinct values to keep a bitmap each.
+                        del self._bitmaps[field]
+                        self._unindexed_fields.add(field)
+                        break
+                    bitmap = np.zeros(self._vectors.shape[0], dtype=bool)
+                    bitmaps[v] = bitmap
+                bitmap[row] = on
+
+    def upsert(self, id: str, vector: list[float], metadata: dict | None = None):
+        values = np.asarray(vector, dtype=np.float32)
+        if self.dimension is not None and values.shape[0] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {values.shape[0]} does not match "
+                f"index dimension {self.dimension}."
+            )
+        norm = np.linalg.norm(values)
+        if norm > 0:
+            values = values / norm
+
+        row = self._positions.get(id)
+        if row is None:
+            row = self._allocate_row(values.shape[0])
+            self._positions[id] = row
+        else:
+            self._set_bits(row, self._metadata[row], on=False)
+        self._vectors[row] = values
+        self._alive[row] = True
+        self._ids[row] = id
+        self._metadata[row] = dict(metadata or {})
+        self._set_bits(row, self._metadata[row], on=True)
+
+    def delete(self, id: str) -> bool:
+        row = self._positions.pop(id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._set_bits(row, self._metadata[row], on=False)
+        self._ids[row] = None
+        self._metadata[row] = None
+        self._free.append(row)
+        return True
+
+    def get_metadata(self, id: str) -> dict | None:
+        row = self._positions.get(id)
+        return None if row is None else self._metadata[row]
+
+    def set_metadata(self, id: str, metadata: dict) -> bool:
+        """Replaces the metadata of a stored vector without touching it."""
+        row = self._positions.get(id)
+        if row is None:
+            return False
+        self._set_bits(row, self._metadata[row], on=False)
+        self._metadata[row] = dict(metadata)
+        self._set_bits(row, self._metadata[row], on=True)
+        return True
+
+    def _field_mask(self, field: str, condition: Any, used: int) -> np.ndarray:
+        if isinstance(condition, dict):
+            if "$in" in condition:
+                accepted = list(condition["$in"])
+            elif "$eq" in condition:
+                accepted = [condition["$eq"]]
+            else:
+                raise ValueError(f"Unsupported filter operator for '{field}'.")
+        else:
+            accepted = [condition]
+
+        if field in self._unindexed_fields or field in _UNFILTERED_FIELDS:
+            wanted = set(accepted)
+            return np.fromiter(
+                (
+                    metadata is not None
+                    and not wanted.isdisjoint(self._field_values(metadata.get(field)))
+                    for metadata in self._metadata[:used]
+                ),
+                dtype=bool,
+                count=used,
+            )
+
+        mask = np.zeros(used, dtype=bool)
+        bitmaps = self._bitmaps.get(field, {})
+        for value in accepted:
+            bitmap = bitmaps.get(value)
+            if bitmap is not None:
+                mask |= bitmap[:used]
+        return mask
+
+    def filter_mask(self, filter: dict) -> np.ndarray:
+        """
+        Rows (among the used ones) matching `filter`, which maps fields to a
+        value, {"$eq": value} or {"$in": [values]}. Conditions are ANDed.
+        """
+        used = len(self._ids)
+        mask = self._alive[:used].copy()
+        for field, condition in filter.items():
+            if not mask.any():
+                break
+            mask &= self._field_mask(field, condition, used)
+        return mask
+
+    def matcher(self, filter: dict | None) -> Callable[[str], bool] | None:
+        """Returns a predicate telling whether a stored id matches `filter`."""
+        if not filter:
+            return None
+        mask = self.filter_mask(filter)
+        positions = self._positions
+        return lambda id: id in positions and bool(mask[positions[id]])
+
+    def query(
+        self, vector: list[float], top_k: int, filter: dict | None = None
+    ) -> list[dict]:
+        if self._vectors is None or not self._positions:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        used = len(self._ids)
+        if filter:
+            mask = self.filter_mask(filter)
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return []
+        else:
+            mask = self._alive[:used]
+            candidates = None
+
+        if (
+            candidates is not None
+            and candidates.size <= self.prefilter_max_selectivity * len(self._positions)
+        ):
+            # Pre-filter: only the matching rows are scored.
+            candidate_scores = self._vectors[candidates] @ query
+            k = min(top_k, candidates.size)
+            best = np.argpartition(-candidate_scores, k - 1)[:k]
+            best = best[np.argsort(-candidate_scores[best])]
+            top, top_scores = candidates[best], candidate_scores[best]
+        else:
+            # Post-filter: score every row, then drop the non-matching ones.
+            scores = self._vectors[:used] @ query
+            scores[~mask] = -np.inf
+            k = min(top_k, int(mask.sum()))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            top_scores = scores[top]
+
+        return [
+            {
+                "id": self._ids[row],
+                "score": float(score),
+                "metadata": self._metadata[row],
+            }
+            for row, score in zip(top, top_scores)
+        ]
+
+
+# Process-wide indexes shared by all service instances, keyed by namespace
+_indexes: dict[str, InMemoryVectorIndex] = {}
+
+
+def get_index(namespace: str) -> InMemoryVectorIndex:
+    """Returns the index of `namespace`, creating it on first use."""
+    index = _indexes.get(namespace)
+    if index is None:
+        index = _indexes[namespace] = InMemoryVectorIndex()
+    return index
+
+
+def drop_namespace(namespace: str) -> bool:
+    """Frees the index of `namespace` (e.g. after migrating away from it)."""
+    return _indexes.pop(namespace, None) is not None
+
 
 class PineconeService:  # Name is kept temporarily to avoid breaking imports
     """
-    Placeholder service for vector database interactions.
-    This service does NOT connect to a real vector database.
+    Service for vector database interactions, backed by the in-process index.
     """
 
-    def __init__(self):
-        # Check if keys exist to simulate a real service's setup logic
+    def __init__(
+        self, index: InMemoryVectorIndex | None = None, namespace: str | None = None
+    ):
         self.api_key = settings.PINECONE_API_KEY
-        if not self.api_key:
-            print(
-                "WARNING: Pinecone API key not set. Vector DB Service is in placeholder mode."
-            )
+        self.namespace = namespace or settings.DEFAULT_EMBEDDING_MODEL
+        self.index = index if index is not None else get_index(self.namespace)
 
     async def upsert_vector(self, id: str, vector: list[float], metadata: dict = None):
-        """Placeholder for upserting a vector."""
-        print(f"PLACEHOLDER: Upserting vector for id {id}. Not implemented.")
+        """Inserts or replaces the vector (and metadata) stored under `id`."""
+        self.index.upsert(id, vector, metadata)
         return True
 
+    async def delete_vector(self, id: str) -> bool:
+        """Removes the vector stored under `id`, if any."""
+        return self.index.delete(id)
+
     async def query_vectors(
-        self, query_vector: list[float], top_k: int = 5
+        self, query_vector: list[float], top_k: int = 5, filter: dict | None = None
     ) -> list[dict]:
-        """Placeholder for querying vectors."""
-        print("PLACEHOLDER: Querying vectors. Returning empty list. Not implemented.")
-        return []
+        """
+        Returns the `top_k` most similar vectors as id/score/metadata dicts,
+        optionally restricted to those whose metadata matches `filter`.
+        """
+        return self.index.query(query_vector, top_k, filter=filter)
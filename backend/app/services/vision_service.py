@@ -15,6 +15,8 @@
 #  -------------
 #  - Dynamically selects the vision adapter based on configuration.
 #  - Provides a single entry point (`get_image_description`) for the app.
+#  - Coalesces concurrent requests for the same image into one
+#    provider call (single-flight), in-process and across processes.
 #
 # =================================================================
 
@@ -25,6 +27,7 @@ import redis
 from app.core.config import settings
 from app.services.base.vision_adapter import BaseVisionAdapter
 from app.services.model_registry import get_model_registry
+from app.services.single_flight import get_single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -79,15 +82,14 @@ class VisionService:
 
         logger.info(f"Cache miss for image hash: {image_hash}. Calling adapter.")
 
-        # 2. If miss, call the adapter
-        description = await self.adapter.get_image_description(image_base64)
-
-        # 3. Store the new result in cache
-        if description:
-            try:
-                # Cache result for 24 hours
-                self.redis_client.set(cache_key, description, ex=86400)
-            except redis.exceptions.RedisError as e:
-                logger.error(f"Redis SET error: {e}. Failed to cache result.")
-
-        return description
+        # 2. If miss, call the adapter once for all identical in-flight
+        # requests; the result is cached for 24 hours. Error fallbacks are
+        # shared with waiting callers but not stored.
+        fallback = self.adapter.fallback_response
+        return await get_single_flight().do(
+            cache_key,
+            lambda: self.adapter.get_image_description(image_base64),
+            ttl=86400,
+            should_store=lambda description: bool(description)
+            and description != fallback,
+        )
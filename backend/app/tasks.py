@@ -11,19 +11,47 @@
 #  These tasks are designed for long-running or heavy computations
 #  that should not block the main application thread.
 #
+#  The multimodal pipeline can also run staged: one task per stage
+#  (vision, LLM, TTS), linked with a Celery chain and routed to a
+#  queue per stage. Stage outputs are checkpointed in Redis, so a
+#  retried or redelivered stage does not repeat a paid model call.
+#
+#  Images and synthesized audio travel as claim-check references to the
+#  blob store (see `app.services.blob_store`), not as base64 in broker
+#  messages and result records.
+#
+#  Coroutine tasks and the stages' model calls run on one persistent
+#  event loop per worker process, with services shared by all of the
+#  process's tasks (see `app.core.async_tasks`).
+#
+#  Tasks publish progress and completion events to Redis pub/sub (see
+#  `app.services.task_events`) so clients are notified without polling,
+#  and free their batch scheduling slot when they finish (see
+#  `app.services.task_scheduler`).
+#
 # =================================================================
 
 import json
 import logging
+import uuid
 
 import redis
+from app.core.async_tasks import async_task, run_async, shared
 from app.core.celery_app import celery_app
 from app.core.config import settings
+from app.services.blob_store import get_blob_store, load_base64, put_base64
+from app.services.database_service import DatabaseService
+from app.services.knowledge_base_indexer import TABLE_NAME, IncrementalIndexer
 from app.services.langchain_orchestrator import LangChainOrchestrator
 from app.services.llm_service import LLMService
 from app.services.multimodal_pipeline import MultimodalPipeline
+from app.services.result_cache import ResultCache
+from app.services.retrieval_service import get_retrieval_service
+from app.services.task_events import publish_task_event
+from app.services.task_scheduler import TaskScheduler
 from app.services.tts_service import TTSService
 from app.services.vision_service import VisionService
+from celery import chain, states
 
 # Get logger for tasks
 logger = logging.getLogger("celery.task")
@@ -32,31 +60,85 @@ logger = logging.getLogger("celery.task")
 # Note: In a large-scale app, you might manage this client connection
 # more carefully, e.g., using Celery signals.
 redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+result_cache = ResultCache()
+task_scheduler = TaskScheduler(redis_client)
 
 
-@celery_app.task(
+def submission_key(task_id: str) -> str:
+    """Redis key marking `task_id` as queued or running (idempotent submits)."""
+    return f"submission:{task_id}"
+
+
+class EventPublishingTask(celery_app.Task):
+    """
+    Base task that publishes "retrying" and "failed" events. Events go to
+    the id clients know the work by, which `event_id` returns.
+    """
+
+    def event_id(self, task_id: str, args: tuple, kwargs: dict) -> str:
+        return task_id
+
+    def on_retry(self, exc, task_id, args, kwargs, einfo):
+        publish_task_event(
+            redis_client,
+            self.event_id(task_id, args, kwargs),
+            "retrying",
+            error=str(exc),
+            attempt=self.request.retries + 1,
+        )
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        event_id = self.event_id(task_id, args, kwargs)
+        publish_task_event(redis_client, event_id, "failed", error=str(exc))
+        # Let a resubmission of the same job run again.
+        try:
+            redis_client.delete(submission_key(event_id))
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Could not clear submission marker of {event_id}: {e}")
+
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        event_id = self.event_id(task_id, args, kwargs)
+        # A job is done when its last task succeeds or any of its tasks fails;
+        # that frees its batch slot for the next waiting job.
+        if status == states.FAILURE or task_id == event_id:
+            try:
+                task_scheduler.task_finished(event_id)
+            except redis.exceptions.RedisError as e:
+                logger.warning(f"Could not release scheduler slot of {event_id}: {e}")
+
+
+class PipelineStageTask(EventPublishingTask):
+    """Stage of the staged multimodal pipeline; events use the pipeline id."""
+
+    def event_id(self, task_id: str, args: tuple, kwargs: dict) -> str:
+        first = args[0] if args else kwargs.get("state", kwargs.get("pipeline_id"))
+        return first["pipeline_id"] if isinstance(first, dict) else first
+
+
+@async_task(
     bind=True,
+    base=EventPublishingTask,
     autoretry_for=(Exception,),
     retry_backoff=True,
     max_retries=3,
-    task_time_limit=300,
+    soft_time_limit=270,
+    time_limit=300,
 )
 async def long_llm_generation_task(self, prompt: str, user_id: str = None):
     """
     Celery task to generate a response from an LLM in the background.
     The result is stored in Redis with the task ID as the key.
-    This task is now fully asynchronous.
+    It runs on the worker process's event loop (see `app.core.async_tasks`).
     """
     task_id = self.request.id
     logger.info(f"Starting async LLM generation task. Task ID: {task_id}")
 
     try:
-        # In a real-world scenario, service instantiation should also be optimized.
-        # For now, we instantiate it here for simplicity.
-        llm_service = LLMService()
+        llm_service = shared(LLMService)
         response = await llm_service.generate_response(prompt)
 
-        redis_client.set(task_id, response, ex=600)
+        result_cache.set(task_id, response, ex=600)
+        publish_task_event(redis_client, task_id, "completed", result=response)
         logger.info(f"Async LLM generation task completed. Task ID: {task_id}")
 
         return {"status": "SUCCESS", "result": response}
@@ -69,34 +151,35 @@ async def long_llm_generation_task(self, prompt: str, user_id: str = None):
         raise
 
 
-@celery_app.task(
+@async_task(
     bind=True,
+    base=EventPublishingTask,
     autoretry_for=(Exception,),
     retry_backoff=True,
     max_retries=3,
-    task_time_limit=600,  # Longer timeout for multi-step pipeline
+    soft_time_limit=570,  # Longer timeout for multi-step pipeline
+    time_limit=600,
 )
-async def multimodal_pipeline_task(self, image_base64: str, user_id: str = None):
+async def multimodal_pipeline_task(self, image_ref: str, user_id: str = None):
     """
     Celery task to run the full image-to-speech pipeline in the background.
-    The dictionary result is stored as a JSON string in Redis.
+    The image is a blob store reference (or, from older messages, base64).
+    The dictionary result, with the audio as a blob store reference
+    (`audio_ref`), is cached in Redis.
     """
     task_id = self.request.id
     logger.info(f"Starting async multimodal pipeline task. Task ID: {task_id}")
 
     try:
-        # Instantiate the pipeline and its dependencies.
-        # This could be optimized with a singleton pattern for workers.
         pipeline = MultimodalPipeline(
-            vision_service=VisionService(),
-            langchain_orchestrator=LangChainOrchestrator(),
-            tts_service=TTSService(),
+            vision_service=shared(VisionService),
+            langchain_orchestrator=shared(LangChainOrchestrator),
+            tts_service=shared(TTSService),
         )
-        result_dict = await pipeline.process_image(image_base64)
+        result_dict = _store_audio(await pipeline.process_image(load_base64(image_ref)))
 
-        # Serialize dictionary to JSON string for Redis storage
-        result_json = json.dumps(result_dict)
-        redis_client.set(task_id, result_json, ex=1200)
+        result_cache.set(task_id, result_dict, ex=1200)
+        publish_task_event(redis_client, task_id, "completed", result=result_dict)
         logger.info(f"Async multimodal pipeline task completed. Task ID: {task_id}")
 
         return {"status": "SUCCESS", "result": result_dict}
@@ -108,16 +191,210 @@ async def multimodal_pipeline_task(self, image_base64: str, user_id: str = None)
         raise
 
 
-# Placeholder for the embeddings task
-@celery_app.task(bind=True)
+def _store_audio(result_dict: dict) -> dict:
+    """Replaces the result's base64 audio with a blob store reference."""
+    result_dict = dict(result_dict)
+    audio_base64 = result_dict.pop("audio_base64", None)
+    result_dict["audio_ref"] = put_base64(audio_base64) if audio_base64 else None
+    return result_dict
+
+
+def _checkpointed(
+    pipeline_id: str, stage: str, run, timeout: float | None = None
+) -> object:
+    """
+    Returns the checkpointed output of `stage` if there is one, otherwise
+    runs the `run` coroutine function, cancelled after `timeout` seconds,
+    and checkpoints its output.
+    """
+    key = f"multimodal:{pipeline_id}:{stage}"
+    cached = redis_client.get(key)
+    if cached is not None:
+        logger.info(f"Resuming pipeline {pipeline_id}: '{stage}' stage already done.")
+        return json.loads(cached)
+    output = run_async(run(), timeout)
+    redis_client.set(
+        key, json.dumps(output), ex=settings.MULTIMODAL_CHECKPOINT_TTL_SECONDS
+    )
+    return output
+
+
+@celery_app.task(
+    bind=True,
+    base=PipelineStageTask,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3,
+    soft_time_limit=110,
+    time_limit=120,
+)
+def multimodal_vision_stage_task(self, pipeline_id: str, image_ref: str):
+    """Staged pipeline, step 1: describes the image (a blob store reference)."""
+    description = _checkpointed(
+        pipeline_id,
+        "vision",
+        lambda: MultimodalPipeline(vision_service=shared(VisionService)).describe_image(
+            load_base64(image_ref)
+        ),
+        self.soft_time_limit,
+    )
+    publish_task_event(
+        redis_client,
+        pipeline_id,
+        "progress",
+        stage="vision",
+        image_description=description,
+    )
+    return {"pipeline_id": pipeline_id, "image_description": description}
+
+
+@celery_app.task(
+    bind=True,
+    base=PipelineStageTask,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3,
+    soft_time_limit=280,
+    time_limit=300,
+)
+def multimodal_llm_stage_task(self, state: dict):
+    """Staged pipeline, step 2: writes a poem about the description."""
+    poem = _checkpointed(
+        state["pipeline_id"],
+        "llm",
+        lambda: MultimodalPipeline(
+            langchain_orchestrator=shared(LangChainOrchestrator)
+        ).write_poem(state["image_description"]),
+        self.soft_time_limit,
+    )
+    publish_task_event(
+        redis_client,
+        state["pipeline_id"],
+        "progress",
+        stage="llm",
+        response_text=poem["response_text"],
+    )
+    return {**state, **poem}
+
+
+@celery_app.task(
+    bind=True,
+    base=PipelineStageTask,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3,
+    soft_time_limit=110,
+    time_limit=120,
+)
+def multimodal_tts_stage_task(self, state: dict):
+    """
+    Staged pipeline, step 3: reads the poem aloud and stores the pipeline
+    result in Redis under the pipeline id (this task's id). The audio goes
+    to the blob store; the checkpoint and result hold its reference.
+    """
+
+    async def speak() -> str | None:
+        audio_base64 = await MultimodalPipeline(
+            tts_service=shared(TTSService)
+        ).synthesize_speech(state["response_text"])
+        return put_base64(audio_base64) if audio_base64 else None
+
+    audio_ref = _checkpointed(state["pipeline_id"], "tts", speak, self.soft_time_limit)
+    result_dict = {
+        "image_description": state["image_description"],
+        "response_text": state["response_text"],
+        "audio_ref": audio_ref,
+        "recommendations": state["recommendations"],
+    }
+    result_cache.set(self.request.id, result_dict, ex=1200)
+    publish_task_event(redis_client, self.request.id, "completed", result=result_dict)
+    logger.info(f"Staged multimodal pipeline completed. Task ID: {self.request.id}")
+    return {"status": "SUCCESS", "result": result_dict}
+
+
+def staged_multimodal_pipeline(image_ref: str, pipeline_id: str):
+    """
+    The staged multimodal pipeline as a Celery chain. Its last stage runs
+    under `pipeline_id` (so task status lookups work unchanged).
+    """
+    return chain(
+        multimodal_vision_stage_task.s(pipeline_id, image_ref),
+        multimodal_llm_stage_task.s(),
+        multimodal_tts_stage_task.s(),
+    ).set(task_id=pipeline_id)
+
+
+def submit_staged_multimodal_pipeline(
+    image_base64: str, pipeline_id: str | None = None
+) -> str:
+    """Starts the staged multimodal pipeline and returns its id."""
+    pipeline_id = pipeline_id or str(uuid.uuid4())
+    staged_multimodal_pipeline(put_base64(image_base64), pipeline_id).apply_async()
+    return pipeline_id
+
+
+@celery_app.task(
+    bind=True,
+    base=EventPublishingTask,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3,
+)
 def generate_embeddings_and_upsert_task(
     self, content_id: str, text: str, user_id: str = None
 ):
+    """
+    Celery task to add a document to the knowledge base. Its chunks are
+    embedded here, into the shared embedding cache, and the row is upserted
+    into the `knowledge_base` table. The API processes' incremental indexers
+    then pick the row up and reuse the cached vectors instead of embedding.
+    """
     task_id = self.request.id
     logger.info(
         f"Processing embeddings task. Task ID: {task_id}, Content ID: {content_id}"
     )
-    # This task will be implemented more fully later.
-    # 1. Create embedding from text.
-    # 2. Upsert vector to Pinecone using vector_db_service.
-    return {"status": "PENDING", "message": "Not yet implemented."}
+    metadata = {"user_id": user_id} if user_id else {}
+    stats = run_async(_ingest_document(content_id, text, metadata))
+    logger.info(
+        f"Embeddings task completed. Task ID: {task_id}, Content ID: {content_id}, "
+        f"embedded {stats['embedded']} of {stats['chunks']} chunks."
+    )
+    publish_task_event(redis_client, task_id, "completed", result=stats)
+    return {"status": "SUCCESS", **stats}
+
+
+async def _ingest_document(content_id: str, text: str, metadata: dict) -> dict:
+    retrieval = shared(get_retrieval_service)
+    await retrieval.sync_active_model()
+    # Embed first, so the row is never indexed before its vectors are cached.
+    stats = await retrieval.precompute_embeddings(content_id, text)
+    db = shared(DatabaseService)
+    await IncrementalIndexer(db=db, retrieval_service=retrieval).ensure_schema()
+    await db.bulk_insert(
+        TABLE_NAME,
+        [
+            {
+                "id": content_id,
+                "content": text,
+                "metadata": json.dumps(metadata),
+                "deleted_at": None,
+            }
+        ],
+        conflict_columns=["id"],
+    )
+    return stats
+
+
+@celery_app.task
+def dispatch_batch_tasks_task():
+    """
+    Celery beat job that releases waiting batch jobs, in case no submission
+    or completion has done so (e.g. after in-flight jobs timed out).
+    """
+    return {"released": task_scheduler.dispatch()}
+
+
+@celery_app.task
+def purge_expired_blobs_task():
+    """Celery beat job that deletes expired blobs (filesystem blob store)."""
+    return {"purged": get_blob_store().purge_expired()}
@@ -0,0 +1,227 @@
+# backend/app/utils/chunking.py
+# =================================================================
+#
+#                       Document Chunking
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Splits knowledge-base documents into chunks that fit the embedding
+#  model's input length, so long documents are not truncated and each
+#  vector covers one focused passage.
+#
+#  Key Features:
+#  -------------
+#  - Streaming: consumes text incrementally (e.g. lines or pages) and
+#    yields chunks as soon as they are full.
+#  - Token-aware: chunk size and overlap are measured with a pluggable
+#    token counter (the embedding model's tokenizer when available).
+#  - Sentence-aligned overlap between consecutive chunks.
+#  - SimHash near-duplicate detection across chunks.
+#  - Stable chunk ids derived from the document id and content hash,
+#    so unchanged chunks keep their id across re-ingestion.
+#
+# =================================================================
+
+import hashlib
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Counts words and punctuation marks, a close lower bound for subwords."""
+    return len(_WORD_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """The longest prefix of `text` with at most `max_tokens` (as counted above)."""
+    if max_tokens <= 0:
+        return ""
+    for count, match in enumerate(_WORD_RE.finditer(text), start=1):
+        if count == max_tokens:
+            return text[: match.end()]
+    return text
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of the whitespace-normalised text."""
+    return hashlib.sha256(normalize(text).encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class Chunk:
+    id: str
+    doc_id: str
+    index: int
+    text: str
+    tokens: int
+    content_hash: str
+
+
+def _iter_sentences(stream: Iterable[str]) -> Iterator[str]:
+    """Yields sentences from a stream of text pieces, buffering only the tail."""
+    buffer = ""
+    for piece in stream:
+        buffer += piece
+        parts = _SENTENCE_END_RE.split(buffer)
+        # The last part may still be an unfinished sentence.
+        buffer = parts.pop()
+        for part in parts:
+            if part.strip():
+                yield normalize(part)
+    if buffer.strip():
+        yield normalize(buffer)
+
+
+def _split_long_sentence(
+    sentence: str, max_tokens: int, count_tokens: Callable[[str], int]
+) -> Iterator[str]:
+    """Splits a sentence longer than `max_tokens` on word boundaries."""
+    words, current = sentence.split(), []
+    for word in words:
+        if current and count_tokens(" ".join(current + [word])) > max_tokens:
+            yield " ".join(current)
+            current = []
+        current.append(word)
+    if current:
+        yield " ".join(current)
+
+
+def iter_chunks(
+    text: str | Iterable[str],
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> Iterator[tuple[str, int]]:
+    """
+    Yields (chunk_text, token_count) pairs of at most `max_tokens` tokens.
+
+    Chunks are built from whole sentences. Each chunk after the first starts
+    with the trailing sentences of the previous one, up to `overlap_tokens`,
+    so passages that straddle a boundary are still retrievable.
+    """
+    stream = [text] if isinstance(text, str) else text
+    window: deque[tuple[str, int]] = deque()
+    window_tokens = 0
+    fresh = False  # Whether the window holds sentences not yet emitted
+
+    def units() -> Iterator[tuple[str, int]]:
+        for sentence in _iter_sentences(stream):
+            tokens = count_tokens(sentence)
+            if tokens <= max_tokens:
+                yield sentence, tokens
+            else:
+                for part in _split_long_sentence(sentence, max_tokens, count_tokens):
+                    yield part, count_tokens(part)
+
+    for sentence, tokens in units():
+        if fresh and window_tokens + tokens > max_tokens:
+            yield " ".join(s for s, _ in window), window_tokens
+            fresh = False
+            # Keep the tail of the emitted chunk as overlap for the next one.
+            while window and (
+                window_tokens > overlap_tokens or window_tokens + tokens > max_tokens
+            ):
+                window_tokens -= window.popleft()[1]
+        window.append((sentence, tokens))
+        window_tokens += tokens
+        fresh = True
+
+    if fresh:
+        yield " ".join(s for s, _ in window), window_tokens
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash over word shingles of `text`."""
+    words = normalize(text).lower().split()
+    shingles = [
+        " ".join(words[i : i + shingle_size])
+        for i in range(max(1, len(words) - shingle_size + 1))
+    ]
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big"
+        )
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+class NearDuplicateDetector:
+    """
+    Remembers SimHashes and flags texts within `max_distance` bits of one
+    already seen. Hashes are bucketed by (max_distance + 1) bands, so two
+    hashes within the distance always share a band and lookups only compare
+    against a handful of candidates.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+        self._buckets: dict[tuple[int, int], list[int]] = {}
+
+    def _keys(self, fingerprint: int) -> list[tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        return [
+            (band, fingerprint >> (band * self.band_bits) & mask)
+            for band in range(self.bands)
+        ]
+
+    def seen(self, text: str) -> bool:
+        """Returns True if `text` is a near-duplicate, otherwise records it."""
+        fingerprint = simhash(text)
+        keys = self._keys(fingerprint)
+        for key in keys:
+            for other in self._buckets.get(key, ()):
+                if (fingerprint ^ other).bit_count() <= self.max_distance:
+                    return True
+        for key in keys:
+            self._buckets.setdefault(key, []).append(fingerprint)
+        return False
+
+
+def chunk_document(
+    doc_id: str,
+    text: str | Iterable[str],
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+    detector: NearDuplicateDetector | None = None,
+) -> list[Chunk]:
+    """
+    Splits a document into chunks with stable ids, dropping chunks that are
+    near-duplicates of earlier ones (pass a shared `detector` to dedupe
+    across documents as well).
+    """
+    detector = detector or NearDuplicateDetector()
+    chunks = []
+    for chunk_text, tokens in iter_chunks(
+        text, max_tokens, overlap_tokens, count_tokens
+    ):
+        if detector.seen(chunk_text):
+            continue
+        digest = content_hash(chunk_text)
+        # Stable id: the document id plus a prefix of the content hash
+        chunks.append(
+            Chunk(
+                id=f"{doc_id}#{digest[:16]}",
+                doc_id=doc_id,
+                index=len(chunks),
+                text=chunk_text,
+                tokens=tokens,
+                content_hash=digest,
+            )
+        )
+    return chunks
@@ -0,0 +1,108 @@
+# backend/app/utils/envelope.py
+# =================================================================
+#
+#                    Binary Result Envelope
+#
+# =================================================================
+#
+#  Purpose:
+#  --------
+#  Compact, typed encoding for task results in the result cache and for
+#  Celery messages and results, replacing JSON text whose type had to
+#  be guessed by trying to parse it.
+#
+#  Key Features:
+#  -------------
+#  - A three-byte header: a marker byte, the format version, and the
+#    content type plus flags. The reader knows what it has without
+#    trial parsing.
+#  - Text is stored as UTF-8; other values (dicts, lists, numbers) as
+#    msgpack.
+#  - Payloads of at least RESULT_COMPRESSION_MIN_BYTES are zstd
+#    compressed when that makes them smaller.
+#  - Registered as the "envelope" serializer for kombu / Celery.
+#
+# =================================================================
+
+import ormsgpack
+import zstandard
+from app.core.config import settings
+
+# 0xC1 is never used by msgpack and never starts valid UTF-8 text, so an
+# envelope cannot be mistaken for a value stored in an older format.
+MARKER = 0xC1
+VERSION = 1
+
+CONTENT_TYPE_TEXT = 0x01
+CONTENT_TYPE_MSGPACK = 0x02
+FLAG_ZSTD = 0x80
+
+SERIALIZER_NAME = "envelope"
+MIME_TYPE = "application/x-siganteng-envelope"
+
+
+class EnvelopeError(ValueError):
+    """Raised for data that is not a (supported) envelope."""
+
+
+def is_envelope(data) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview)) and (
+        len(data) >= 3 and data[0] == MARKER
+    )
+
+
+def encode(value, compress_min_bytes: int | None = None) -> bytes:
+    """Encodes `value` (text or any msgpack-serializable value)."""
+    if isinstance(value, str):
+        content_type, payload = CONTENT_TYPE_TEXT, value.encode()
+    else:
+        content_type = CONTENT_TYPE_MSGPACK
+        payload = ormsgpack.packb(value, option=ormsgpack.OPT_NON_STR_KEYS)
+    threshold = (
+        settings.RESULT_COMPRESSION_MIN_BYTES
+        if compress_min_bytes is None
+        else compress_min_bytes
+    )
+    if threshold and len(payload) >= threshold:
+        compressed = zstandard.compress(payload)
+        if len(compressed) < len(payload):
+            content_type |= FLAG_ZSTD
+            payload = compressed
+    return bytes((MARKER, VERSION, content_type)) + payload
+
+
+def decode(data: bytes):
+    """
+    Decodes an envelope.
+
+    Raises:
+        EnvelopeError: If `data` is not an envelope or has an unknown
+            version or content type.
+    """
+    if not is_envelope(data):
+        raise EnvelopeError("Not an envelope.")
+    if data[1] != VERSION:
+        raise EnvelopeError(f"Unsupported envelope version {data[1]}.")
+    content_type = data[2]
+    payload = bytes(data[3:])
+    if content_type & FLAG_ZSTD:
+        payload = zstandard.decompress(payload)
+        content_type &= ~FLAG_ZSTD
+    if content_type == CONTENT_TYPE_TEXT:
+        return payload.decode()
+    if content_type == CONTENT_TYPE_MSGPACK:
+        return ormsgpack.unpackb(payload, option=ormsgpack.OPT_NON_STR_KEYS)
+    raise EnvelopeError(f"Unknown envelope content type {content_type}.")
+
+
+def register_kombu_serializer() -> None:
+    """Makes the envelope available to Celery as the "envelope" serializer."""
+    from kombu.serialization import register
+
+    register(
+        SERIALIZER_NAME,
+        encode,
+        decode,
+        content_type=MIME_TYPE,
+        content_encoding="binary",
+    )
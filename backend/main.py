@@ -1,5 +1,14 @@
+import asyncio
+import contextlib
+
 from app.api.v1.endpoints import ai_assistant, knowledge_base
 from app.core.config import settings
+from app.services.circuit_breaker import get_circuit_breaker_metrics
+from app.services.database_service import DatabaseService
+from app.services.inference_pool import get_inference_pool
+from app.services.knowledge_base_indexer import get_incremental_indexer
+from app.services.openai_client import close_openai_client
+from app.services.rate_limiter import get_rate_limiter_stats
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -38,9 +47,63 @@ app.add_middleware(
 )
 
 # --- API Routers ---
+app.include_router(ai_assistant.router, prefix=settings.API_V1_STR)
 app.include_router(knowledge_base.router, prefix=settings.API_V1_STR)
 
 
+@app.on_event("startup")
+async def start_inference_pool():
+    # Spawning the worker processes blocks, so it runs in a thread.
+    pool = get_inference_pool()
+    if pool is not None:
+        await asyncio.to_thread(pool.start)
+
+
+@app.on_event("startup")
+async def start_knowledge_base_indexer():
+    # The retrieval index is held in this process, so it is refreshed here.
+    app.state.knowledge_base_indexer = None
+    if settings.KNOWLEDGE_BASE_INDEX_INTERVAL_SECONDS > 0:
+        app.state.knowledge_base_indexer = asyncio.create_task(
+            get_incremental_indexer().run_periodically()
+        )
+
+
+@app.on_event("shutdown")
+async def stop_knowledge_base_indexer():
+    task = getattr(app.state, "knowledge_base_indexer", None)
+    if task is not None:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+@app.on_event("shutdown")
+async def stop_inference_pool():
+    pool = get_inference_pool()
+    if pool is not None:
+        await asyncio.to_thread(pool.shutdown)
+
+
+@app.on_event("shutdown")
+async def close_database_pool():
+    await DatabaseService.close()
+
+
+@app.on_event("shutdown")
+async def close_openai_http_client():
+    await close_openai_client()
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the AI Multi-Model Assistant Backend!"}
+
+
+@app.get("/health/dependencies")
+async def dependency_health():
+    """Reports circuit breaker states and rate limiter stats for this process."""
+    return {
+        "circuit_breakers": get_circuit_breaker_metrics(),
+        "rate_limiters": get_rate_limiter_stats(),
+    }
@@ -1,5 +1,5 @@
 # backend/tests/adapters/test_hf_llm_adapter.py
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from app.services.adapters.hf_llm_adapter import HuggingFaceLLMAdapter
@@ -41,3 +41,26 @@ async def test_hf_llm_generate_response_failure(mock_pipeline):
 
     # Assert
     assert "Sorry, I encountered an error" in response
+
+
+@pytest.mark.asyncio
+@patch("app.services.adapters.hf_llm_adapter.get_inference_pool")
+@patch("app.services.adapters.hf_llm_adapter.pipeline")
+async def test_hf_llm_uses_inference_pool_when_enabled(
+    mock_pipeline, mock_get_inference_pool
+):
+    # Arrange
+    inference_pool = mock_get_inference_pool.return_value
+    inference_pool.submit = AsyncMock(return_value=[[{"generated_text": "Pooled"}]])
+
+    adapter = HuggingFaceLLMAdapter(model_name="test-model")
+
+    # Act
+    response = await adapter.generate_response("Test prompt")
+
+    # Assert
+    assert response == "Pooled"
+    mock_pipeline.assert_not_called()
+    inference_pool.submit.assert_awaited_once_with(
+        "text-generation", "test-model", ["Test prompt"], max_new_tokens=150
+    )
@@ -6,8 +6,8 @@ from app.services.adapters.openai_llm_adapter import OpenAILLMAdapter
 
 
 @pytest.mark.asyncio
-@patch("app.services.adapters.openai_llm_adapter.AsyncOpenAI")
-async def test_openai_llm_generate_response_success(MockAsyncOpenAI):
+@patch("app.services.adapters.openai_llm_adapter.get_openai_client")
+async def test_openai_llm_generate_response_success(mock_get_openai_client):
     # Arrange
     mock_choice = MagicMock()
     mock_choice.message.content = "  Test response  "
@@ -15,7 +15,7 @@ async def test_openai_llm_generate_response_success(MockAsyncOpenAI):
     mock_completion = MagicMock()
     mock_completion.choices = [mock_choice]
 
-    mock_client = MockAsyncOpenAI.return_value
+    mock_client = mock_get_openai_client.return_value
     mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
 
     adapter = OpenAILLMAdapter(model_name="test-gpt")
@@ -33,10 +33,10 @@ async def test_openai_llm_generate_response_success(MockAsyncOpenAI):
 
 
 @pytest.mark.asyncio
-@patch("app.services.adapters.openai_llm_adapter.AsyncOpenAI")
-async def test_openai_llm_generate_response_failure(MockAsyncOpenAI):
+@patch("app.services.adapters.openai_llm_adapter.get_openai_client")
+async def test_openai_llm_generate_response_failure(mock_get_openai_client):
     # Arrange
-    mock_client = MockAsyncOpenAI.return_value
+    mock_client = mock_get_openai_client.return_value
     mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API error"))
 
     adapter = OpenAILLMAdapter(model_name="test-gpt")
@@ -6,10 +6,10 @@ from app.services.adapters.openai_stt_adapter import OpenAISTTAdapter
 
 
 @pytest.mark.asyncio
-@patch("app.services.adapters.openai_stt_adapter.AsyncOpenAI")
-async def test_transcribe_audio_success(MockAsyncOpenAI):
+@patch("app.services.adapters.openai_stt_adapter.get_openai_client")
+async def test_transcribe_audio_success(mock_get_openai_client):
     # Arrange
-    mock_client = MockAsyncOpenAI.return_value
+    mock_client = mock_get_openai_client.return_value
     mock_transcription = MagicMock()
     mock_transcription.text = "This is a test transcription."
 
@@ -30,10 +30,10 @@ async def test_transcribe_audio_success(MockAsyncOpenAI):
 
 
 @pytest.mark.asyncio
-@patch("app.services.adapters.openai_stt_adapter.AsyncOpenAI")
-async def test_transcribe_audio_failure(MockAsyncOpenAI):
+@patch("app.services.adapters.openai_stt_adapter.get_openai_client")
+async def test_transcribe_audio_failure(mock_get_openai_client):
     # Arrange
-    mock_client = MockAsyncOpenAI.return_value
+    mock_client = mock_get_openai_client.return_value
     mock_client.audio.transcriptions.create = AsyncMock(
         side_effect=Exception("API Error")
     )
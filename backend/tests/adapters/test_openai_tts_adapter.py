@@ -7,13 +7,13 @@ from app.services.adapters.openai_tts_adapter import OpenAITTSAdapter
 
 
 @pytest.mark.asyncio
-@patch("app.services.adapters.openai_tts_adapter.AsyncOpenAI")
-async def test_openai_tts_generate_audio_success(MockAsyncOpenAI):
+@patch("app.services.adapters.openai_tts_adapter.get_openai_client")
+async def test_openai_tts_generate_audio_success(mock_get_openai_client):
     # Arrange
     mock_response = AsyncMock()
     mock_response.aread.return_value = b"fake_openai_audio"
 
-    mock_client = MockAsyncOpenAI.return_value
+    mock_client = mock_get_openai_client.return_value
     mock_client.audio.speech.create = AsyncMock(return_value=mock_response)
 
     adapter = OpenAITTSAdapter(model_name="test-tts", voice="echo")
@@ -32,10 +32,10 @@ async def test_openai_tts_generate_audio_success(MockAsyncOpenAI):
 
 
 @pytest.mark.asyncio
-@patch("app.services.adapters.openai_tts_adapter.AsyncOpenAI")
-async def test_openai_tts_generate_audio_failure(MockAsyncOpenAI):
+@patch("app.services.adapters.openai_tts_adapter.get_openai_client")
+async def test_openai_tts_generate_audio_failure(mock_get_openai_client):
     # Arrange
-    mock_client = MockAsyncOpenAI.return_value
+    mock_client = mock_get_openai_client.return_value
     mock_client.audio.speech.create = AsyncMock(side_effect=Exception("API error"))
 
     adapter = OpenAITTSAdapter()
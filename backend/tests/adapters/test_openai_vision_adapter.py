@@ -6,8 +6,8 @@ from app.services.adapters.openai_vision_adapter import OpenAIVisionAdapter
 
 
 @pytest.mark.asyncio
-@patch("app.services.adapters.openai_vision_adapter.AsyncOpenAI")
-async def test_openai_vision_get_description_success(MockAsyncOpenAI):
+@patch("app.services.adapters.openai_vision_adapter.get_openai_client")
+async def test_openai_vision_get_description_success(mock_get_openai_client):
     # Arrange
     mock_choice = MagicMock()
     mock_choice.message.content = " A description of the image. "
@@ -15,7 +15,7 @@ async def test_openai_vision_get_description_success(MockAsyncOpenAI):
     mock_completion = MagicMock()
     mock_completion.choices = [mock_choice]
 
-    mock_client = MockAsyncOpenAI.return_value
+    mock_client = mock_get_openai_client.return_value
     mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
 
     adapter = OpenAIVisionAdapter(model_name="test-vision-gpt")
@@ -40,10 +40,10 @@ async def test_openai_vision_get_description_success(MockAsyncOpenAI):
 
 
 @pytest.mark.asyncio
-@patch("app.services.adapters.openai_vision_adapter.AsyncOpenAI")
-async def test_openai_vision_get_description_failure(MockAsyncOpenAI):
+@patch("app.services.adapters.openai_vision_adapter.get_openai_client")
+async def test_openai_vision_get_description_failure(mock_get_openai_client):
     # Arrange
-    mock_client = MockAsyncOpenAI.return_value
+    mock_client = mock_get_openai_client.return_value
     mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API error"))
 
     adapter = OpenAIVisionAdapter(model_name="test-vision-gpt")
@@ -1,16 +1,24 @@
 # backend/tests/test_ai_orchestrator.py
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
+import redis
 from app.services.ai_orchestrator import AIOrchestratorService
+from app.services.blob_store import FileBlobStore
+from app.services.task_scheduler import AdmissionError
+from app.utils import envelope
+from kombu.exceptions import OperationalError
 
 
 @patch("app.services.ai_orchestrator.long_llm_generation_task")
-def test_submit_long_llm_generation(mock_task):
+@patch("app.services.ai_orchestrator.redis.from_url")
+def test_submit_long_llm_generation(mock_redis_from_url, mock_task):
     # Arrange
-    mock_async_result = MagicMock()
-    mock_async_result.id = "test-task-id-abc"
-    mock_task.delay.return_value = mock_async_result
+    mock_redis_client = MagicMock()
+    mock_redis_client.exists.return_value = 0
+    mock_redis_client.set.return_value = True
+    mock_redis_client.llen.return_value = 0  # Interactive queue is empty
+    mock_redis_from_url.return_value = mock_redis_client
 
     orchestrator = AIOrchestratorService()
 
@@ -18,8 +26,162 @@ def test_submit_long_llm_generation(mock_task):
     task_id = orchestrator.submit_long_llm_generation("Test prompt")
 
     # Assert
-    assert task_id == "test-task-id-abc"
-    mock_task.delay.assert_called_once_with("Test prompt")
+    assert task_id.startswith("llm-")
+    mock_task.signature.assert_called_once_with(
+        args=("Test prompt", None), task_id=task_id
+    )
+    mock_task.signature.return_value.apply_async.assert_called_once_with(
+        queue="interactive"
+    )
+
+
+@patch("app.services.ai_orchestrator.long_llm_generation_task")
+@patch("app.services.ai_orchestrator.redis.from_url")
+def test_submit_long_llm_generation_deduplicates(mock_redis_from_url, mock_task):
+    # Arrange: the second submission finds the first one's marker
+    mock_redis_client = MagicMock()
+    mock_redis_client.exists.return_value = 0
+    mock_redis_client.set.side_effect = [True, None]
+    mock_redis_client.llen.return_value = 0
+    mock_redis_from_url.return_value = mock_redis_client
+
+    orchestrator = AIOrchestratorService()
+
+    # Act
+    first = orchestrator.submit_long_llm_generation("Test prompt")
+    second = orchestrator.submit_long_llm_generation("Test prompt")
+    other_user = orchestrator.task_id_for(
+        "llm", "Test prompt", {"provider": "openai"}, user_id="someone-else"
+    )
+
+    # Assert
+    assert first == second
+    assert other_user != first
+    mock_task.signature.assert_called_once()
+    mock_redis_client.set.assert_called_with(
+        f"submission:{first}", "1", nx=True, ex=ANY
+    )
+
+
+@patch("app.services.ai_orchestrator.long_llm_generation_task")
+@patch("app.services.ai_orchestrator.redis.from_url")
+def test_submit_with_idempotency_key_ignores_payload(mock_redis_from_url, mock_task):
+    # Arrange
+    mock_redis_client = MagicMock()
+    mock_redis_client.exists.side_effect = [0, 1]  # Then finished and cached
+    mock_redis_client.set.return_value = True
+    mock_redis_client.llen.return_value = 0
+    mock_redis_from_url.return_value = mock_redis_client
+
+    orchestrator = AIOrchestratorService()
+
+    # Act
+    first = orchestrator.submit_long_llm_generation("Prompt", idempotency_key="k-1")
+    retry = orchestrator.submit_long_llm_generation(
+        "Prompt, edited", idempotency_key="k-1"
+    )
+
+    # Assert
+    assert first == retry
+    mock_task.signature.assert_called_once()
+
+
+@patch("app.services.ai_orchestrator.long_llm_generation_task")
+@patch("app.services.ai_orchestrator.redis.from_url")
+def test_submit_falls_back_when_redis_is_down(mock_redis_from_url, mock_task):
+    # Arrange
+    mock_redis_client = MagicMock()
+    mock_redis_client.exists.side_effect = redis.exceptions.ConnectionError("down")
+    mock_redis_client.llen.side_effect = redis.exceptions.ConnectionError("down")
+    mock_redis_from_url.return_value = mock_redis_client
+
+    orchestrator = AIOrchestratorService()
+
+    # Act
+    task_id = orchestrator.submit_long_llm_generation("Test prompt")
+
+    # Assert
+    mock_task.signature.assert_called_once_with(
+        args=("Test prompt", None), task_id=task_id
+    )
+    mock_task.signature.return_value.apply_async.assert_called_once_with()
+
+
+@patch("app.services.ai_orchestrator.long_llm_generation_task")
+@patch("app.services.ai_orchestrator.redis.from_url")
+def test_rejected_submission_releases_its_claim(mock_redis_from_url, mock_task):
+    # Arrange
+    mock_redis_client = MagicMock()
+    mock_redis_client.exists.return_value = 0
+    mock_redis_client.set.return_value = True
+    mock_redis_from_url.return_value = mock_redis_client
+
+    orchestrator = AIOrchestratorService()
+    orchestrator.scheduler = MagicMock()
+    orchestrator.scheduler.submit.side_effect = AdmissionError("Queues are full.")
+
+    # Act
+    with pytest.raises(AdmissionError):
+        orchestrator.submit_long_llm_generation("Test prompt", priority="batch")
+
+    # Assert
+    task_id = mock_task.signature.call_args.kwargs["task_id"]
+    mock_redis_client.delete.assert_called_once_with(f"submission:{task_id}")
+    orchestrator.scheduler.submit.assert_called_once_with(
+        mock_task.signature.return_value, user_id=None, priority="batch"
+    )
+
+
+@patch("app.services.ai_orchestrator.long_llm_generation_task")
+@patch("app.services.ai_orchestrator.redis.from_url")
+def test_broker_failure_releases_the_claim(mock_redis_from_url, mock_task):
+    # Arrange: Redis is up for the claim, the scheduler falls back to the
+    # broker and the broker is down
+    mock_redis_client = MagicMock()
+    mock_redis_client.exists.return_value = 0
+    mock_redis_client.set.return_value = True
+    mock_redis_from_url.return_value = mock_redis_client
+    mock_task.signature.return_value.apply_async.side_effect = OperationalError(
+        "broker down"
+    )
+
+    orchestrator = AIOrchestratorService()
+    orchestrator.scheduler = MagicMock()
+    orchestrator.scheduler.submit.side_effect = redis.exceptions.ConnectionError()
+
+    # Act
+    with pytest.raises(OperationalError):
+        orchestrator.submit_long_llm_generation("Test prompt")
+
+    # Assert
+    task_id = mock_task.signature.call_args.kwargs["task_id"]
+    mock_redis_client.delete.assert_called_once_with(f"submission:{task_id}")
+
+
+@patch("app.services.ai_orchestrator.multimodal_pipeline_task")
+@patch("app.services.ai_orchestrator.put_base64")
+@patch("app.services.ai_orchestrator.redis.from_url")
+def test_blob_store_failure_releases_the_claim(
+    mock_redis_from_url, mock_put_base64, mock_task
+):
+    # Arrange
+    mock_redis_client = MagicMock()
+    mock_redis_client.exists.return_value = 0
+    mock_redis_client.set.return_value = True
+    mock_redis_from_url.return_value = mock_redis_client
+    mock_put_base64.side_effect = redis.exceptions.ConnectionError("down")
+
+    orchestrator = AIOrchestratorService()
+
+    # Act
+    with pytest.raises(redis.exceptions.ConnectionError):
+        orchestrator.submit_multimodal_pipeline("aW1hZ2U=")
+
+    # Assert
+    mock_redis_client.delete.assert_called_once()
+    released = mock_redis_client.delete.call_args.args[0]
+    assert released.startswith("submission:multimodal-")
+    mock_task.signature.assert_not_called()
 
 
 @patch("app.services.ai_orchestrator.AsyncResult")
@@ -27,7 +189,7 @@ def test_submit_long_llm_generation(mock_task):
 def test_get_task_status_cached(mock_redis_from_url, MockAsyncResult):
     # Arrange
     mock_redis_client = MagicMock()
-    mock_redis_client.get.return_value = "Cached result"
+    mock_redis_client.get.return_value = envelope.encode("Cached result")
     mock_redis_from_url.return_value = mock_redis_client
 
     orchestrator = AIOrchestratorService()
@@ -42,6 +204,30 @@ def test_get_task_status_cached(mock_redis_from_url, MockAsyncResult):
     MockAsyncResult.assert_not_called()
 
 
+@patch("app.services.ai_orchestrator.get_blob_store")
+@patch("app.services.ai_orchestrator.redis.from_url")
+def test_get_task_status_returns_stored_audio_inline(
+    mock_redis_from_url, mock_get_blob_store, tmp_path
+):
+    # Arrange
+    store = FileBlobStore(str(tmp_path), ttl_seconds=60)
+    mock_get_blob_store.return_value = store
+    audio_ref = store.put(b"audio")
+    mock_redis_client = MagicMock()
+    mock_redis_client.get.return_value = envelope.encode(
+        {"response_text": "A poem.", "audio_ref": audio_ref}
+    )
+    mock_redis_from_url.return_value = mock_redis_client
+
+    orchestrator = AIOrchestratorService()
+
+    # Act
+    result = orchestrator.get_task_status_and_result("test-task-id")
+
+    # Assert
+    assert result["result"] == {"response_text": "A poem.", "audio_base64": "YXVkaW8="}
+
+
 @patch("app.services.ai_orchestrator.AsyncResult")
 @patch("app.services.ai_orchestrator.redis.from_url")
 def test_get_task_status_pending(mock_redis_from_url, MockAsyncResult):
@@ -86,5 +272,47 @@ def test_get_task_status_success_not_cached(mock_redis_from_url, MockAsyncResult
     assert result["result"] == "Final result"
     # Verify that the result is cached after being fetched
     mock_redis_client.set.assert_called_once_with(
-        "test-task-id", "Final result", ex=600
+        "test-task-id", envelope.encode("Final result"), ex=1200
     )
+
+
+@patch("app.services.ai_orchestrator.celery_app")
+@patch("app.services.ai_orchestrator.redis.from_url")
+def test_get_task_statuses_uses_batched_lookups(mock_redis_from_url, mock_celery_app):
+    # Arrange
+    mock_redis_client = MagicMock()
+    # t2 holds a JSON value from before the envelope: it counts as missing
+    mock_redis_client.mget.return_value = [
+        envelope.encode("Cached result"),
+        '{"poem": "Hi"}',
+        None,
+        None,
+    ]
+    mock_redis_from_url.return_value = mock_redis_client
+
+    backend = mock_celery_app.backend
+    backend.get_key_for_task.side_effect = lambda task_id: f"meta-{task_id}"
+    backend.mget.return_value = ["done", "failed", None]
+    backend.decode_result.side_effect = lambda value: {
+        "done": {"status": "SUCCESS", "result": {"result": {"poem": "Hi"}}},
+        "failed": {"status": "FAILURE", "result": ValueError("boom")},
+    }[value]
+
+    orchestrator = AIOrchestratorService()
+
+    # Act
+    statuses = orchestrator.get_task_statuses(["t1", "t2", "t3", "t4", "t1"])
+
+    # Assert
+    assert statuses == [
+        {"task_id": "t1", "status": "SUCCESS", "result": "Cached result"},
+        {"task_id": "t2", "status": "SUCCESS", "result": {"poem": "Hi"}},
+        {"task_id": "t3", "status": "FAILURE", "result": "boom"},
+        {"task_id": "t4", "status": "PENDING", "result": None},
+    ]
+    mock_redis_client.mget.assert_called_once_with(["t1", "t2", "t3", "t4"])
+    backend.mget.assert_called_once_with(["meta-t2", "meta-t3", "meta-t4"])
+    pipeline = mock_redis_client.pipeline.return_value
+    pipeline.set.assert_called_once_with("t2", envelope.encode({"poem": "Hi"}), ex=1200)
+    pipeline.execute.assert_called_once()
+    mock_redis_client.get.assert_not_called()
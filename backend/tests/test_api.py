@@ -1,5 +1,9 @@
 # backend/tests/test_api.py
-from unittest.mock import MagicMock
+import asyncio
+import binascii
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from app.api.v1.endpoints.ai_assistant import (
@@ -9,6 +13,14 @@ from app.api.v1.endpoints.ai_assistant import (
     get_tts_service,
     get_vision_service,
 )
+from app.api.v1.endpoints.knowledge_base import get_db_service
+from app.core.config import settings
+from app.services.bm25_index import BM25Index
+from app.services.knowledge_base_indexer import get_incremental_indexer
+from app.services.retrieval_service import RetrievalService, get_retrieval_service
+from app.services.task_events import get_task_event_broker
+from app.services.vector_db_service import InMemoryVectorIndex, PineconeService
+from app.utils.chunking import estimate_tokens
 from fastapi.testclient import TestClient
 from main import app
 
@@ -19,6 +31,23 @@ mock_stt_service = MagicMock()
 mock_tts_service = MagicMock()
 mock_vision_service = MagicMock()
 
+
+class FakeTaskEventBroker:
+    """Delivers the given events to every subscriber."""
+
+    def __init__(self):
+        self.events = []
+
+    @asynccontextmanager
+    async def subscribe(self, task_id):
+        queue = asyncio.Queue()
+        for event in self.events:
+            queue.put_nowait(event)
+        yield queue
+
+
+fake_task_event_broker = FakeTaskEventBroker()
+
 # --- Dependency Overrides ---
 app.dependency_overrides[get_ai_orchestrator] = lambda: mock_ai_orchestrator
 app.dependency_overrides[get_langchain_orchestrator] = (
@@ -27,6 +56,7 @@ app.dependency_overrides[get_langchain_orchestrator] = (
 app.dependency_overrides[get_stt_service] = lambda: mock_stt_service
 app.dependency_overrides[get_tts_service] = lambda: mock_tts_service
 app.dependency_overrides[get_vision_service] = lambda: mock_vision_service
+app.dependency_overrides[get_task_event_broker] = lambda: fake_task_event_broker
 
 client = TestClient(app)
 
@@ -49,7 +79,10 @@ def test_submit_text_generation_task():
     assert data["task_id"] == "test-task-id-123"
     assert data["status"] == "PENDING"
     mock_ai_orchestrator.submit_long_llm_generation.assert_called_once_with(
-        "Generate a poem about FastAPI."
+        "Generate a poem about FastAPI.",
+        user_id=None,
+        idempotency_key=None,
+        priority="interactive",
     )
 
 
@@ -90,3 +123,166 @@ def test_get_task_status_pending():
     data = response.json()
     assert data["status"] == "PENDING"
     assert data["result"] is None
+
+
+def _sse_events(body: str) -> list[dict]:
+    return [
+        json.loads(line[len("data: ") :])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+def test_stream_task_status_returns_finished_result():
+    # Arrange
+    mock_ai_orchestrator.get_task_statuses.return_value = [
+        {"task_id": "done-task", "status": "SUCCESS", "result": "A poem."}
+    ]
+    fake_task_event_broker.events = []
+
+    # Act
+    response = client.get("/api/v1/background/tasks/done-task/events")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert _sse_events(response.text) == [
+        {"task_id": "done-task", "event": "completed", "result": "A poem."}
+    ]
+
+
+def test_stream_task_status_forwards_events_until_completion():
+    # Arrange
+    mock_ai_orchestrator.get_task_statuses.return_value = [
+        {"task_id": "running-task", "status": "PENDING", "result": None}
+    ]
+    fake_task_event_broker.events = [
+        {"task_id": "running-task", "event": "progress", "stage": "vision"},
+        {"task_id": "running-task", "event": "completed", "result": "A poem."},
+        {"task_id": "running-task", "event": "progress", "stage": "late"},
+    ]
+
+    # Act
+    response = client.get("/api/v1/background/tasks/running-task/events")
+
+    # Assert
+    assert response.status_code == 200
+    assert [event["event"] for event in _sse_events(response.text)] == [
+        "progress",
+        "completed",
+    ]
+
+
+def test_submit_image_with_invalid_base64_is_rejected():
+    # Arrange
+    mock_ai_orchestrator.submit_multimodal_pipeline.side_effect = binascii.Error(
+        "Invalid base64-encoded string"
+    )
+
+    # Act
+    response = client.post(
+        "/api/v1/background/process_image", json={"image_base64": "not base64!"}
+    )
+
+    # Assert
+    assert response.status_code == 400
+    mock_ai_orchestrator.submit_multimodal_pipeline.side_effect = None
+
+
+def test_get_task_statuses_returns_all_tasks():
+    # Arrange
+    statuses = [
+        {"task_id": "t1", "status": "SUCCESS", "result": "A poem."},
+        {"task_id": "t2", "status": "PENDING", "result": None},
+    ]
+    mock_ai_orchestrator.get_task_statuses.return_value = statuses
+
+    # Act
+    response = client.post(
+        "/api/v1/background/tasks/status", json={"task_ids": ["t1", "t2"]}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {"tasks": statuses}
+    mock_ai_orchestrator.get_task_statuses.assert_called_with(["t1", "t2"])
+
+
+def test_get_task_statuses_limits_the_batch_size():
+    # Arrange
+    task_ids = [f"t{i}" for i in range(settings.TASK_STATUS_BATCH_MAX_IDS + 1)]
+
+    # Act
+    response = client.post(
+        "/api/v1/background/tasks/status", json={"task_ids": task_ids}
+    )
+
+    # Assert
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def knowledge_base_overrides():
+    embedding_service = MagicMock()
+    embedding_service.count_tokens = estimate_tokens
+    embedding_service.embed_text = AsyncMock(
+        side_effect=lambda texts: [[float(len(text)), 1.0] for text in texts]
+    )
+    retrieval = RetrievalService(
+        embedding_service=embedding_service,
+        vector_db=PineconeService(index=InMemoryVectorIndex()),
+        keyword_index=BM25Index(),
+    )
+    db = MagicMock()
+    db.bulk_insert = AsyncMock(return_value={"rows": 1})
+    indexer = MagicMock()
+    indexer.ensure_schema = AsyncMock()
+    app.dependency_overrides[get_db_service] = lambda: db
+    app.dependency_overrides[get_retrieval_service] = lambda: retrieval
+    app.dependency_overrides[get_incremental_indexer] = lambda: indexer
+    yield db, embedding_service
+    for dependency in (get_db_service, get_retrieval_service, get_incremental_indexer):
+        app.dependency_overrides.pop(dependency)
+
+
+def test_adding_the_same_item_twice_upserts_and_skips_embedding(
+    knowledge_base_overrides,
+):
+    # Arrange
+    db, embedding_service = knowledge_base_overrides
+    item = {"id": "faq-1", "text": "Shipping takes three to five days."}
+
+    # Act
+    first = client.post("/api/v1/add_to_knowledge_base", json=item)
+    second = client.post("/api/v1/add_to_knowledge_base", json=item)
+
+    # Assert
+    assert first.status_code == second.status_code == 200
+    assert first.json()["embedded"] == 1
+    assert second.json()["embedded"] == 0
+    embedding_service.embed_text.assert_awaited_once()
+    assert db.bulk_insert.await_args.kwargs["conflict_columns"] == ["id"]
+
+
+def test_bulk_add_with_duplicate_ids_keeps_the_last_item(knowledge_base_overrides):
+    # Arrange
+    db, embedding_service = knowledge_base_overrides
+    payload = {
+        "items": [
+            {"id": "faq-1", "text": "Shipping takes three to five days."},
+            {"id": "faq-2", "text": "Returns are accepted for thirty days."},
+            {"id": "faq-1", "text": "Shipping takes two days."},
+        ]
+    }
+
+    # Act
+    response = client.post("/api/v1/add_to_knowledge_base/bulk", json=payload)
+
+    # Assert
+    assert response.status_code == 200
+    rows = list(db.bulk_insert.await_args.args[1])
+    assert [(row["id"], row["content"]) for row in rows] == [
+        ("faq-1", "Shipping takes two days."),
+        ("faq-2", "Returns are accepted for thirty days."),
+    ]
+    assert response.json()["indexed"]["documents"] == 2
@@ -0,0 +1,101 @@
+# backend/tests/test_async_tasks.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from app.core.async_tasks import (
+    WorkerLoop,
+    async_task,
+    coroutine_timeout,
+    run_async,
+    shared,
+)
+
+
+@pytest.fixture
+def worker_loop():
+    loop = WorkerLoop(concurrency=4)
+    yield loop
+    loop.close()
+
+
+def test_calls_from_many_threads_share_one_loop(worker_loop):
+    # Arrange
+    running = 0
+    peak = 0
+
+    async def call_provider():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return asyncio.get_running_loop()
+
+    # Act
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        loops = list(pool.map(lambda _: worker_loop.run(call_provider()), range(10)))
+
+    # Assert
+    assert set(loops) == {worker_loop.loop}
+    assert peak == 4  # Bounded by the loop's concurrency
+
+
+def test_timeout_cancels_the_coroutine(worker_loop):
+    # Arrange
+    cancelled = threading.Event()
+
+    async def hang():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    # Act / Assert
+    with pytest.raises(TimeoutError):
+        worker_loop.run(hang(), timeout=0.05)
+    assert cancelled.wait(1)
+
+
+def test_errors_are_raised_in_the_calling_thread(worker_loop):
+    # Arrange
+    async def fail():
+        raise ValueError("boom")
+
+    # Act / Assert
+    with pytest.raises(ValueError, match="boom"):
+        worker_loop.run(fail())
+
+
+def test_shared_instances_are_created_once():
+    # Arrange
+    class Service:
+        pass
+
+    # Act
+    first = shared(Service)
+    second = shared(Service)
+
+    # Assert
+    assert first is second
+    assert run_async(asyncio.sleep(0, result="done")) == "done"
+
+
+@async_task(time_limit=0.05)
+async def hanging_task():
+    await asyncio.sleep(10)
+
+
+def test_declared_time_limit_cancels_the_task_coroutine():
+    # Act / Assert
+    with pytest.raises(TimeoutError):
+        hanging_task.run()
+
+
+def test_coroutine_timeout_uses_the_earliest_declared_limit():
+    # Act / Assert
+    assert coroutine_timeout({"time_limit": 300, "soft_time_limit": 240}) == 240
+    assert coroutine_timeout({"time_limit": 60, "soft_time_limit": None}) == 60
+    assert coroutine_timeout({"time_limit": 60}) == 60
@@ -0,0 +1,86 @@
+# backend/tests/test_blob_store.py
+import binascii
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.services.blob_store import (
+    BlobNotFoundError,
+    FileBlobStore,
+    RedisBlobStore,
+    is_blob_ref,
+    put_base64,
+)
+
+
+def test_file_store_is_content_addressed(tmp_path):
+    # Arrange
+    store = FileBlobStore(str(tmp_path), ttl_seconds=60)
+
+    # Act
+    first = store.put(b"audio bytes")
+    second = store.put(b"audio bytes")
+
+    # Assert
+    assert first == second
+    assert is_blob_ref(first)
+    assert store.get(first) == b"audio bytes"
+    assert sum(len(files) for _, _, files in os.walk(tmp_path)) == 1
+
+
+def test_file_store_expires_blobs(tmp_path):
+    # Arrange
+    store = FileBlobStore(str(tmp_path), ttl_seconds=60)
+    ref = store.put(b"old")
+    kept = store.put(b"new")
+    path = store._path(ref[len("blob:") :])
+    os.utime(path, (time.time() - 120, time.time() - 120))
+
+    # Act / Assert
+    with pytest.raises(BlobNotFoundError):
+        store.get(ref)
+    assert store.purge_expired() == 1
+    assert not os.path.exists(path)
+    assert store.get(kept) == b"new"
+
+
+def test_invalid_references_are_not_found(tmp_path):
+    # Arrange
+    store = FileBlobStore(str(tmp_path), ttl_seconds=60)
+
+    # Act / Assert
+    with pytest.raises(BlobNotFoundError):
+        store.get("blob:../../etc/passwd")
+
+
+def test_redis_store_sets_once_and_refreshes_ttl():
+    # Arrange
+    redis_client = MagicMock()
+    redis_client.set.side_effect = [True, None]
+    store = RedisBlobStore(redis_client, ttl_seconds=60)
+
+    # Act
+    ref = store.put(b"image bytes")
+    store.put(b"image bytes")
+
+    # Assert
+    redis_client.set.assert_called_with(ref, b"image bytes", ex=60, nx=True)
+    redis_client.expire.assert_called_once_with(ref, 60)
+
+
+@patch("app.services.blob_store.get_blob_store")
+def test_put_base64_accepts_line_breaks_and_rejects_invalid_data(
+    mock_get_blob_store, tmp_path
+):
+    # Arrange
+    store = FileBlobStore(str(tmp_path), ttl_seconds=60)
+    mock_get_blob_store.return_value = store
+
+    # Act
+    ref = put_base64("aW1h\nZ2U=\n")
+
+    # Assert
+    assert store.get(ref) == b"image"
+    with pytest.raises(binascii.Error):
+        put_base64("not an image!")
@@ -0,0 +1,74 @@
+# backend/tests/test_bm25_index.py
+from app.services.bm25_index import BM25Index, tokenize
+
+
+def test_tokenize_keeps_compound_identifiers_and_parts():
+    # Act
+    tokens = tokenize("Printer shows ERR-1042 on SKU_77.B")
+
+    # Assert
+    assert "err-1042" in tokens
+    assert {"err", "1042"} <= set(tokens)
+    assert "sku_77.b" in tokens
+
+
+def test_search_ranks_exact_identifier_match_first():
+    # Arrange
+    index = BM25Index()
+    index.add("a", "Paper jam in the rear tray of the printer.")
+    index.add("b", "Error ERR-1042 means the toner cartridge is missing.")
+    index.add("c", "Error ERR-2001 means the printer is offline.")
+
+    # Act
+    results = index.search("ERR-1042", top_k=2)
+
+    # Assert
+    assert results[0][0] == "b"
+    assert all(doc_id != "a" for doc_id, _ in results)
+
+
+def test_add_replaces_and_remove_hides_documents():
+    # Arrange
+    index = BM25Index()
+    index.add("a", "old text about invoices")
+    index.add("b", "shipping policy")
+
+    # Act
+    index.add("a", "new text about refunds")
+    index.remove("b")
+
+    # Assert
+    assert index.search("invoices") == []
+    assert index.search("refunds")[0][0] == "a"
+    assert index.search("shipping") == []
+    assert len(index) == 1
+
+
+def test_compaction_keeps_results_consistent():
+    # Arrange
+    index = BM25Index(compact_ratio=0.1)
+    for i in range(20):
+        index.add(f"doc{i}", f"common word item{i}")
+
+    # Act
+    for i in range(10):
+        index.remove(f"doc{i}")
+
+    # Assert
+    assert index.search("item15")[0][0] == "doc15"
+    assert {doc_id for doc_id, _ in index.search("common", top_k=50)} == {
+        f"doc{i}" for i in range(10, 20)
+    }
+
+
+def test_search_respects_allowed_filter():
+    # Arrange
+    index = BM25Index()
+    index.add("a", "refund policy")
+    index.add("b", "refund form")
+
+    # Act
+    results = index.search("refund", allowed=lambda doc_id: doc_id == "b")
+
+    # Assert
+    assert [doc_id for doc_id, _ in results] == ["b"]
@@ -0,0 +1,91 @@
+# backend/tests/test_chunking.py
+from app.utils.chunking import (
+    NearDuplicateDetector,
+    chunk_document,
+    estimate_tokens,
+    iter_chunks,
+    simhash,
+)
+
+TEXT = " ".join(f"Sentence number {i} talks about topic {i}." for i in range(30))
+
+
+def test_iter_chunks_respects_max_tokens_and_overlap():
+    # Act
+    chunks = list(iter_chunks(TEXT, max_tokens=40, overlap_tokens=10))
+
+    # Assert
+    assert len(chunks) > 1
+    assert all(tokens <= 40 for _, tokens in chunks)
+    assert all(estimate_tokens(text) == tokens for text, tokens in chunks)
+    # Each chunk starts with the last sentence of the previous one.
+    for (previous, _), (current, _) in zip(chunks, chunks[1:]):
+        last_sentence = previous.rsplit(". ", 1)[-1]
+        assert current.startswith(last_sentence.rstrip("."))
+
+
+def test_iter_chunks_streaming_matches_whole_text():
+    # Arrange
+    pieces = [TEXT[i : i + 17] for i in range(0, len(TEXT), 17)]
+
+    # Act & Assert
+    assert list(iter_chunks(pieces, 40, 10)) == list(iter_chunks(TEXT, 40, 10))
+
+
+def test_iter_chunks_splits_overlong_sentences():
+    # Arrange
+    sentence = " ".join(["word"] * 100)
+
+    # Act
+    chunks = list(iter_chunks(sentence, max_tokens=30))
+
+    # Assert
+    assert [tokens for _, tokens in chunks] == [30, 30, 30, 10]
+
+
+def test_simhash_is_close_for_near_duplicates():
+    # Arrange
+    base = "The quick brown fox jumps over the lazy dog near the river bank today"
+
+    # Act
+    near = simhash(base + " again")
+    far = simhash("Completely unrelated text about invoices and refunds policy")
+
+    # Assert
+    assert (simhash(base) ^ near).bit_count() < (simhash(base) ^ far).bit_count()
+
+
+def test_near_duplicate_detector_flags_repeats():
+    # Arrange
+    detector = NearDuplicateDetector(max_distance=3)
+
+    # Act & Assert
+    assert detector.seen("Refunds are processed within five business days.") is False
+    assert detector.seen("Refunds are processed within five business days.") is True
+    assert detector.seen("Shipping is free for orders over fifty dollars.") is False
+
+
+def test_chunk_document_ids_are_stable_and_content_addressed():
+    # Act
+    first = chunk_document("doc", TEXT, max_tokens=40, overlap_tokens=10)
+    second = chunk_document("doc", TEXT, max_tokens=40, overlap_tokens=10)
+    edited = chunk_document(
+        "doc", TEXT.replace("topic 29", "topic X"), max_tokens=40, overlap_tokens=10
+    )
+
+    # Assert
+    assert [c.id for c in first] == [c.id for c in second]
+    assert all(c.id.startswith("doc#") for c in first)
+    assert [c.id for c in first][:-1] == [c.id for c in edited][:-1]
+    assert first[-1].id != edited[-1].id
+
+
+def test_chunk_document_drops_duplicate_chunks():
+    # Arrange
+    paragraph = "This paragraph is repeated verbatim in the document body."
+
+    # Act
+    chunks = chunk_document("doc", f"{paragraph}\n\n{paragraph}", max_tokens=12)
+
+    # Assert
+    assert len(chunks) == 1
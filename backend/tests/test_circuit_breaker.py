@@ -0,0 +1,97 @@
+# backend/tests/test_circuit_breaker.py
+import asyncio
+
+import pytest
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+async def _fail(breaker: CircuitBreaker, error: Exception):
+    with pytest.raises(type(error)):
+        async with breaker.guard():
+            raise error
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_threshold_and_fails_fast():
+    # Arrange
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+
+    # Act
+    await _fail(breaker, ConnectionError("down"))
+    await _fail(breaker, ConnectionError("down"))
+
+    # Assert
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        async with breaker.guard():
+            pass
+    assert breaker.metrics()["rejections_total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_opens_after_timeout_and_closes_on_success():
+    # Arrange
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.01)
+    await _fail(breaker, ConnectionError("down"))
+    await asyncio.sleep(0.02)
+
+    # Act & Assert
+    assert breaker.state == CircuitState.HALF_OPEN
+    async with breaker.guard():
+        pass
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_reopens_on_half_open_failure():
+    # Arrange
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.01)
+    await _fail(breaker, ConnectionError("down"))
+    await asyncio.sleep(0.02)
+
+    # Act
+    await _fail(breaker, ConnectionError("still down"))
+
+    # Assert
+    assert breaker.metrics()["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_breaker_ignores_throttling_and_client_errors():
+    # Arrange
+    breaker = CircuitBreaker("test", failure_threshold=1)
+
+    # Act
+    await _fail(breaker, FakeStatusError(429))
+    await _fail(breaker, FakeStatusError(400))
+
+    # Assert
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_background_probe_moves_breaker_to_half_open():
+    # Arrange
+    probe_calls = []
+
+    async def probe():
+        probe_calls.append(True)
+        return True
+
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, recovery_timeout=0.01, probe=probe
+    )
+
+    # Act
+    await _fail(breaker, ConnectionError("down"))
+    await asyncio.sleep(0.05)
+
+    # Assert
+    assert probe_calls
+    assert breaker.state == CircuitState.HALF_OPEN
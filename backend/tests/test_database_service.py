@@ -0,0 +1,239 @@
+# backend/tests/test_database_service.py
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services.database_service import DatabaseService
+
+
+def _make_pool(conn):
+    pool = MagicMock()
+
+    @asynccontextmanager
+    async def acquire(timeout=None):
+        yield conn
+
+    pool.acquire = acquire
+    return pool
+
+
+class _NullTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def reset_pool():
+    # IMPORTANT: Reset the shared pool so each test creates its own mock pool
+    DatabaseService._pool = None
+    DatabaseService._pool_task = None
+    DatabaseService._pool_loop = None
+    yield
+    DatabaseService._pool = None
+    DatabaseService._pool_task = None
+    DatabaseService._pool_loop = None
+
+
+@pytest.mark.asyncio
+@patch("app.services.database_service.asyncpg.create_pool", new_callable=AsyncMock)
+async def test_insert_data_uses_numbered_placeholders(mock_create_pool):
+    # Arrange
+    conn = MagicMock()
+    conn.fetchrow = AsyncMock(return_value={"id": "doc-1"})
+    mock_create_pool.return_value = _make_pool(conn)
+
+    service = DatabaseService()
+
+    # Act
+    result = await service.insert_data(
+        "knowledge_base", {"id": "doc-1", "content": "hello"}
+    )
+
+    # Assert
+    assert result == {"id": "doc-1"}
+    conn.fetchrow.assert_awaited_once_with(
+        "INSERT INTO knowledge_base (id, content) VALUES ($1, $2) RETURNING id",
+        "doc-1",
+        "hello",
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.services.database_service.asyncpg.create_pool", new_callable=AsyncMock)
+async def test_fetch_data_reuses_pool(mock_create_pool):
+    # Arrange
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[{"id": "doc-1", "content": "hello"}])
+    mock_create_pool.return_value = _make_pool(conn)
+
+    service = DatabaseService()
+
+    # Act
+    await service.fetch_data("knowledge_base", {"id": "doc-1"})
+    rows = await service.fetch_data("knowledge_base", {"id": "doc-1"})
+
+    # Assert
+    assert rows == [{"id": "doc-1", "content": "hello"}]
+    conn.fetch.assert_awaited_with(
+        "SELECT * FROM knowledge_base WHERE id = $1", "doc-1"
+    )
+    mock_create_pool.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.services.database_service.asyncpg.create_pool",
+    new_callable=AsyncMock,
+    side_effect=OSError("connection refused"),
+)
+async def test_insert_data_returns_none_when_pool_unavailable(mock_create_pool):
+    # Arrange
+    service = DatabaseService()
+
+    # Act
+    result = await service.insert_data("knowledge_base", {"id": "doc-1"})
+
+    # Assert
+    assert result is None
+
+
+@pytest.mark.asyncio
+@patch("app.services.database_service.asyncpg.create_pool", new_callable=AsyncMock)
+async def test_bulk_insert_copies_in_batches(mock_create_pool):
+    # Arrange
+    conn = MagicMock()
+    conn.copy_records_to_table = AsyncMock()
+    conn.transaction = MagicMock(return_value=_NullTransaction())
+    mock_create_pool.return_value = _make_pool(conn)
+
+    service = DatabaseService()
+    rows = ({"id": f"doc-{i}", "content": f"text {i}"} for i in range(5))
+
+    # Act
+    result = await service.bulk_insert("knowledge_base", rows, batch_size=2)
+
+    # Assert
+    assert result["rows"] == 5
+    assert result["batches"] == 3
+    assert conn.copy_records_to_table.await_count == 3
+    first_call = conn.copy_records_to_table.await_args_list[0]
+    assert first_call.kwargs["records"] == [
+        ("doc-0", "text 0"),
+        ("doc-1", "text 1"),
+    ]
+    assert first_call.kwargs["columns"] == ["id", "content"]
+
+
+@pytest.mark.asyncio
+@patch("app.services.database_service.asyncpg.create_pool", new_callable=AsyncMock)
+async def test_bulk_insert_upserts_through_staging_table(mock_create_pool):
+    # Arrange
+    conn = MagicMock()
+    conn.execute = AsyncMock()
+    conn.copy_records_to_table = AsyncMock()
+    conn.transaction = MagicMock(return_value=_NullTransaction())
+    mock_create_pool.return_value = _make_pool(conn)
+
+    service = DatabaseService()
+
+    # Act
+    await service.bulk_insert(
+        "knowledge_base",
+        [{"id": "doc-1", "content": "updated"}],
+        conflict_columns=["id"],
+    )
+
+    # Assert
+    conn.copy_records_to_table.assert_awaited_once()
+    assert conn.copy_records_to_table.await_args.args[0] == "_stage_knowledge_base"
+    merge_sql = conn.execute.await_args_list[-1].args[0]
+    assert (
+        'ON CONFLICT ("id") DO UPDATE SET "content" = EXCLUDED."content"' in merge_sql
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.services.database_service.asyncpg.create_pool", new_callable=AsyncMock)
+async def test_bulk_upsert_merges_duplicate_keys_within_a_batch(mock_create_pool):
+    # Arrange
+    conn = MagicMock()
+    conn.execute = AsyncMock()
+    conn.copy_records_to_table = AsyncMock()
+    conn.transaction = MagicMock(return_value=_NullTransaction())
+    mock_create_pool.return_value = _make_pool(conn)
+
+    service = DatabaseService()
+    rows = [
+        {"id": "doc-1", "content": "first"},
+        {"id": "doc-2", "content": "other"},
+        {"id": "doc-1", "content": "second"},
+    ]
+
+    # Act
+    result = await service.bulk_insert("knowledge_base", rows, conflict_columns=["id"])
+
+    # Assert
+    assert conn.copy_records_to_table.await_args.kwargs["records"] == [
+        ("doc-1", "second"),
+        ("doc-2", "other"),
+    ]
+    assert result["rows"] == 2
+
+
+@pytest.mark.asyncio
+@patch("app.services.database_service.asyncpg.create_pool", new_callable=AsyncMock)
+async def test_stream_data_uses_projected_keyset_cursor(mock_create_pool):
+    # Arrange
+    records = [{"id": "doc-1", "content": "a"}, {"id": "doc-2", "content": "b"}]
+
+    async def cursor(query, *params, prefetch=None):
+        for record in records:
+            yield record
+
+    conn = MagicMock()
+    conn.cursor = MagicMock(side_effect=cursor)
+    conn.transaction = MagicMock(return_value=_NullTransaction())
+    mock_create_pool.return_value = _make_pool(conn)
+
+    service = DatabaseService()
+
+    # Act
+    rows = [
+        row
+        async for row in service.stream_data(
+            "knowledge_base", columns=["id", "content"], after="doc-0", fetch_size=50
+        )
+    ]
+
+    # Assert
+    assert rows == records
+    conn.cursor.assert_called_once_with(
+        'SELECT "id", "content" FROM "knowledge_base" WHERE "id" > $1 ORDER BY "id"',
+        "doc-0",
+        prefetch=50,
+    )
+    conn.transaction.assert_called_once_with(readonly=True)
+
+
+@pytest.mark.asyncio
+@patch("app.services.database_service.asyncpg.create_pool", new_callable=AsyncMock)
+async def test_fetch_page_returns_next_key(mock_create_pool):
+    # Arrange
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[{"id": "doc-1"}, {"id": "doc-2"}])
+    mock_create_pool.return_value = _make_pool(conn)
+
+    service = DatabaseService()
+
+    # Act
+    rows, next_after = await service.fetch_page("knowledge_base", limit=2)
+
+    # Assert
+    assert len(rows) == 2
+    assert next_after == "doc-2"
+    conn.fetch.assert_awaited_once_with(
+        'SELECT * FROM "knowledge_base" ORDER BY "id" LIMIT 2'
+    )
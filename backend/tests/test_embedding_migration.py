@@ -0,0 +1,260 @@
+# backend/tests/test_embedding_migration.py
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.services import retrieval_service
+from app.services.bm25_index import BM25Index
+from app.services.embedding_migration import EmbeddingMigration
+from app.services.embedding_model_registry import EmbeddingModelRegistry
+from app.services.retrieval_service import EmbeddingNamespace, RetrievalService
+from app.services.vector_db_service import InMemoryVectorIndex, PineconeService
+from app.utils.chunking import estimate_tokens
+
+DOCUMENTS = [
+    ("login", "How do I change my login credentials?", {}),
+    ("toner", "Error ERR-1042 means the toner cartridge is missing.", {}),
+    ("shipping", "Shipping takes three to five days.", {}),
+]
+
+
+def _embedding_service(model_name: str, dimension: int, delay: float = 0.0):
+    async def embed_text(texts):
+        await asyncio.sleep(delay)
+        if isinstance(texts, list):
+            return [[float(len(text))] * dimension for text in texts]
+        return [float(len(texts))] * dimension
+
+    service = MagicMock()
+    service.model_name = model_name
+    service.embed_text = AsyncMock(side_effect=embed_text)
+    service.count_tokens = estimate_tokens
+    return service
+
+
+def _namespace(model_name: str, dimension: int, delay: float = 0.0):
+    return EmbeddingNamespace(
+        _embedding_service(model_name, dimension, delay),
+        PineconeService(index=InMemoryVectorIndex(), namespace=model_name),
+    )
+
+
+async def _seeded_service() -> RetrievalService:
+    service = RetrievalService(
+        embedding_service=_embedding_service("old-model", 3),
+        vector_db=PineconeService(index=InMemoryVectorIndex(), namespace="old-model"),
+        keyword_index=BM25Index(),
+    )
+    await service.index_documents(DOCUMENTS)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_migration_backfills_and_switches_queries_to_new_model():
+    # Arrange
+    service = await _seeded_service()
+    target = _namespace("new-model", 5)
+    migration = EmbeddingMigration(service, batch_size=2, rate=1000)
+
+    # Act
+    await migration.start("new-model", namespace=target)
+    await migration._task
+    results = await service.search("toner cartridge", top_k=1)
+
+    # Assert
+    assert migration.progress["state"] == "completed"
+    assert migration.progress["done"] == migration.progress["total"] == 3
+    assert service.active is target
+    assert service.target is None
+    assert len(target.vector_db.index) == 3
+    assert target.vector_db.index.dimension == 5
+    assert results[0]["metadata"]["doc_id"] == "toner"
+
+
+@pytest.mark.asyncio
+async def test_writes_during_migration_go_to_both_namespaces():
+    # Arrange
+    service = await _seeded_service()
+    source = service.active
+    target = _namespace("new-model", 5, delay=0.05)
+    migration = EmbeddingMigration(service, batch_size=1, rate=1000)
+    await migration.start("new-model", namespace=target)
+
+    # Act
+    await service.index_document("faq", "Returns are accepted for thirty days.")
+    in_source = len(source.vector_db.index)
+    await service.remove_document("shipping")
+    await migration._task
+
+    # Assert
+    assert in_source == 4
+    ids = target.vector_db.index.ids()
+    assert sorted(id.split("#")[0] for id in ids) == ["faq", "login", "toner"]
+
+
+@pytest.mark.asyncio
+async def test_queries_use_old_model_until_cutover():
+    # Arrange
+    service = await _seeded_service()
+    source = service.active
+    migration = EmbeddingMigration(service, batch_size=1, rate=1000)
+    await migration.start("new-model", namespace=_namespace("new-model", 5, delay=0.05))
+
+    # Act
+    await asyncio.sleep(0.01)
+    results = await service.search("toner cartridge", top_k=1)
+    await migration.abort()
+
+    # Assert
+    assert migration.progress["state"] == "aborted"
+    assert results[0]["metadata"]["doc_id"] == "toner"
+    assert service.active is source
+    assert service.target is None
+
+
+@pytest.mark.asyncio
+async def test_failed_backfill_keeps_old_model_active():
+    # Arrange
+    service = await _seeded_service()
+    source = service.active
+    target = _namespace("new-model", 5)
+    target.embedding_service.embed_text.side_effect = RuntimeError("model crashed")
+    migration = EmbeddingMigration(service, batch_size=2, rate=1000)
+
+    # Act
+    await migration.start("new-model", namespace=target)
+    await migration._task
+
+    # Assert
+    assert migration.progress["state"] == "failed"
+    assert "model crashed" in migration.progress["error"]
+    assert service.active is source
+    assert service.target is None
+
+
+@pytest.mark.asyncio
+async def test_start_rejects_active_model_and_concurrent_migrations():
+    # Arrange
+    service = await _seeded_service()
+    migration = EmbeddingMigration(service, batch_size=1, rate=1000)
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        await migration.start("old-model")
+    await migration.start("new-model", namespace=_namespace("new-model", 5, delay=0.05))
+    with pytest.raises(ValueError):
+        await migration.start("other-model", namespace=_namespace("other-model", 4))
+    await migration.abort()
+
+
+class FakeRedis:
+    """The subset of Redis commands the model registry uses (no expiry)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+async def _shared_service(registry: EmbeddingModelRegistry) -> RetrievalService:
+    service = await _seeded_service()
+    service.model_registry = registry
+    return service
+
+
+@pytest.mark.asyncio
+async def test_completed_migration_is_shared_with_other_processes():
+    # Arrange
+    registry = EmbeddingModelRegistry(FakeRedis())
+    service = await _shared_service(registry)
+    other = await _shared_service(registry)
+    other_target = _namespace("new-model", 5)
+    other.new_namespace = AsyncMock(return_value=other_target)
+    migration = EmbeddingMigration(service, batch_size=2, rate=1000)
+
+    # Act
+    await migration.start("new-model", namespace=_namespace("new-model", 5))
+    await migration._task
+    progress = await EmbeddingMigration(other).status()
+    model = await other.sync_active_model()
+
+    # Assert
+    assert registry.active_model() == "new-model"
+    assert progress["state"] == "completed"
+    assert progress["done"] == 3
+    assert model == "new-model"
+    assert other.active is other_target
+
+
+@pytest.mark.asyncio
+async def test_start_rejects_migration_running_in_another_process():
+    # Arrange
+    registry = EmbeddingModelRegistry(FakeRedis())
+    registry.acquire_migration_lock()
+    migration = EmbeddingMigration(await _shared_service(registry), rate=1000)
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        await migration.start("new-model", namespace=_namespace("new-model", 5))
+    assert not migration.running
+
+
+@pytest.mark.asyncio
+async def test_abort_from_another_process_stops_the_backfill():
+    # Arrange
+    registry = EmbeddingModelRegistry(FakeRedis())
+    service = await _shared_service(registry)
+    source = service.active
+    migration = EmbeddingMigration(service, batch_size=1, rate=1000)
+    await migration.start("new-model", namespace=_namespace("new-model", 5, 0.05))
+
+    # Act
+    aborting = await EmbeddingMigration(await _shared_service(registry)).abort()
+    await migration._task
+
+    # Assert
+    assert aborting["state"] == "aborting"
+    assert migration.progress["state"] == "aborted"
+    assert registry.migration()["state"] == "aborted"
+    assert registry.active_model() is None
+    assert service.active is source
+    assert registry.acquire_migration_lock()
+
+
+@pytest.mark.asyncio
+async def test_new_model_is_loaded_off_the_event_loop(monkeypatch):
+    # Arrange
+    service = await _seeded_service()
+    loaded_in = []
+
+    def load(model_name):
+        loaded_in.append(threading.current_thread())
+        return _embedding_service(model_name, 5)
+
+    monkeypatch.setattr(retrieval_service, "EmbeddingService", load)
+    migration = EmbeddingMigration(service, batch_size=2, rate=1000)
+
+    # Act
+    await migration.start("new-model")
+    await migration._task
+
+    # Assert
+    assert loaded_in and loaded_in[0] is not threading.main_thread()
+    assert service.active.name == "new-model"
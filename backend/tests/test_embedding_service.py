@@ -74,3 +74,26 @@ async def test_embedding_service_model_not_loaded_on_init(
     # Act & Assert - subsequent embed_text call should raise RuntimeError
     with pytest.raises(RuntimeError, match="Embedding model is not loaded."):
         await service.embed_text("test")
+
+
+@pytest.mark.asyncio
+@patch("app.services.embedding_service.SentenceTransformer")
+@patch("app.services.embedding_service.OnnxSentenceEncoder")
+async def test_embedding_service_uses_onnx_backend_when_configured(
+    MockOnnxSentenceEncoder, MockSentenceTransformerConstructor
+):
+    # Arrange
+    EmbeddingService._model = None
+    onnx_model = MockOnnxSentenceEncoder.from_pretrained.return_value
+    onnx_model.encode.return_value = np.array([0.5, 0.25])
+
+    # Act
+    with patch("app.services.embedding_service.settings.EMBEDDING_BACKEND", "onnx"):
+        service = EmbeddingService(model_name="test-model")
+    embedding = await service.embed_text("hello")
+    EmbeddingService._model = None
+
+    # Assert
+    assert embedding == [0.5, 0.25]
+    MockOnnxSentenceEncoder.from_pretrained.assert_called_once_with("test-model")
+    MockSentenceTransformerConstructor.assert_not_called()
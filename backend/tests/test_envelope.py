@@ -0,0 +1,47 @@
+# backend/tests/test_envelope.py
+import json
+
+import pytest
+from app.utils import envelope
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "A long generated response.",
+        "",
+        {"response_text": "A poem.", "audio_ref": None, "recommendations": ["x"]},
+        [1, 2.5, None, True],
+    ],
+)
+def test_round_trip_keeps_the_type(value):
+    # Act
+    data = envelope.encode(value)
+
+    # Assert
+    assert data[:2] == bytes((envelope.MARKER, envelope.VERSION))
+    assert envelope.decode(data) == value
+
+
+def test_large_payloads_are_compressed():
+    # Arrange
+    result = {"response_text": "la " * 2000, "recommendations": []}
+
+    # Act
+    small = envelope.encode(result, compress_min_bytes=0)
+    compressed = envelope.encode(result, compress_min_bytes=1024)
+
+    # Assert
+    assert compressed[2] & envelope.FLAG_ZSTD
+    assert not small[2] & envelope.FLAG_ZSTD
+    assert len(compressed) < len(small) < len(json.dumps(result))
+    assert envelope.decode(compressed) == result
+
+
+def test_foreign_data_is_rejected():
+    # Act / Assert
+    assert not envelope.is_envelope(b'{"poem": "Hi"}')
+    with pytest.raises(envelope.EnvelopeError):
+        envelope.decode(b'{"poem": "Hi"}')
+    with pytest.raises(envelope.EnvelopeError):
+        envelope.decode(bytes((envelope.MARKER, 99, envelope.CONTENT_TYPE_TEXT)))
@@ -0,0 +1,125 @@
+# backend/tests/test_inference_pool.py
+import asyncio
+import os
+
+import pytest
+from app.services.inference_pool import InferenceError, InferencePool, _core_groups
+
+LOADERS = {
+    "echo": "tests.test_inference_pool:load_echo",
+    "crash": "tests.test_inference_pool:load_crash",
+}
+
+
+def load_echo(task, model_name):
+    """Test model: tags each input with the model, batch size and worker pid."""
+
+    def run(inputs, suffix=""):
+        if "fail" in inputs:
+            raise ValueError("bad input")
+        return [
+            {
+                "text": f"{model_name}:{text}{suffix}",
+                "batch": len(inputs),
+                "pid": os.getpid(),
+            }
+            for text in inputs
+        ]
+
+    return run
+
+
+def load_crash(task, model_name):
+    def run(inputs):
+        os._exit(1)
+
+    return run
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = InferencePool(workers=2, max_batch_size=8, max_wait_ms=50, loaders=LOADERS)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_core_groups_split_available_cores():
+    # Act
+    groups = _core_groups(2)
+
+    # Assert
+    assert len(groups) == 2
+    assert all(groups)
+    if len(os.sched_getaffinity(0)) >= 2:
+        assert not set(groups[0]) & set(groups[1])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_batched_in_a_worker(pool):
+    # Act
+    results = await asyncio.gather(
+        pool.submit("echo", "m", ["a"]),
+        pool.submit("echo", "m", ["b", "c"]),
+        pool.submit("echo", "m", ["d"], suffix="!"),
+    )
+
+    # Assert
+    assert [r["text"] for r in results[0]] == ["m:a"]
+    assert [r["text"] for r in results[1]] == ["m:b", "m:c"]
+    assert [r["text"] for r in results[2]] == ["m:d!"]
+    # Same arguments share one batch; different keyword arguments do not
+    assert results[0][0]["batch"] == results[1][0]["batch"] == 3
+    assert results[2][0]["batch"] == 1
+    assert results[0][0]["pid"] != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting(pool):
+    # Act
+    results = await asyncio.wait_for(
+        pool.submit("echo", "m", [str(i) for i in range(8)]), timeout=10
+    )
+
+    # Assert
+    assert len(results) == 8
+    assert results[0]["batch"] == 8
+
+
+@pytest.mark.asyncio
+async def test_model_errors_are_raised_to_the_caller(pool):
+    # Act / Assert
+    with pytest.raises(InferenceError, match="bad input"):
+        await pool.submit("echo", "m", ["fail"])
+    assert await pool.submit("echo", "m", ["ok"])
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_fails_its_batch_and_is_replaced(pool):
+    # Act
+    with pytest.raises(InferenceError, match="died"):
+        await asyncio.wait_for(pool.submit("crash", "m", ["x"]), timeout=20)
+    results = await asyncio.wait_for(
+        asyncio.gather(*(pool.submit("echo", "m", [str(i)]) for i in range(4))),
+        timeout=20,
+    )
+
+    # Assert
+    assert len(results) == 4
+    assert all(worker.process.is_alive() for worker in pool._workers)
+
+
+@pytest.mark.asyncio
+async def test_jobs_queued_when_the_pool_shuts_down_fail():
+    # Arrange
+    pool = InferencePool(workers=1, max_batch_size=8, max_wait_ms=200, loaders=LOADERS)
+    await asyncio.to_thread(pool.start)
+    job = asyncio.create_task(pool.submit("echo", "m", ["a"]))
+    await asyncio.sleep(0.01)
+
+    # Act
+    await asyncio.to_thread(pool.shutdown)
+
+    # Assert
+    with pytest.raises(InferenceError, match="not running"):
+        await asyncio.wait_for(job, timeout=5)
@@ -0,0 +1,300 @@
+# backend/tests/test_knowledge_base_indexer.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.services.bm25_index import BM25Index
+from app.services.embedding_cache import EmbeddingCache
+from app.services.knowledge_base_indexer import IncrementalIndexer, row_hash
+from app.services.retrieval_service import EmbeddingNamespace, RetrievalService
+from app.services.vector_db_service import InMemoryVectorIndex, PineconeService
+from app.utils.chunking import estimate_tokens
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeKnowledgeBaseTable:
+    """Answers the indexer's watermark and bookkeeping queries from a dict."""
+
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+        self.selects = 0
+
+    def put(self, id, content, minutes, deleted=False, metadata=None, **extra):
+        self.rows[id] = {
+            "id": id,
+            "content": content,
+            "metadata": metadata or {},
+            "content_hash": None,
+            "embedding_model": None,
+            "updated_at": T0 + timedelta(minutes=minutes),
+            "deleted_at": T0 if deleted else None,
+            **extra,
+        }
+
+    async def execute(self, query, params=None, fetch=None):
+        if query.lstrip().startswith("SELECT"):
+            self.selects += 1
+            after_ts, after_id, until = params
+            limit = int(query.rsplit("LIMIT", 1)[1])
+            rows = sorted(
+                (
+                    row
+                    for row in self.rows.values()
+                    if (row["updated_at"], row["id"]) > (after_ts, after_id)
+                    and row["updated_at"] <= until
+                ),
+                key=lambda row: (row["updated_at"], row["id"]),
+            )
+            return [dict(row) for row in rows[:limit]]
+        if query.lstrip().startswith("UPDATE"):
+            ids, hashes, model = params
+            for id, digest in zip(ids, hashes):
+                self.rows[id].update(content_hash=digest, embedding_model=model)
+        return None
+
+
+class FakeBinaryRedis:
+    """The subset of Redis commands the embedding cache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def execute(self):
+        pass
+
+
+class FakeModelRegistry:
+    def __init__(self, model_name=None):
+        self.model_name = model_name
+
+    def active_model(self):
+        return self.model_name
+
+
+def _embedding_service(model_name: str):
+    embedding_service = MagicMock()
+    embedding_service.model_name = model_name
+    embedding_service.count_tokens = estimate_tokens
+    embedding_service.embed_text = AsyncMock(
+        side_effect=lambda texts: (
+            [[float(len(t)), 1.0] for t in texts]
+            if isinstance(texts, list)
+            else [float(len(texts)), 1.0]
+        )
+    )
+    return embedding_service
+
+
+def _make_indexer(
+    table: FakeKnowledgeBaseTable,
+    batch_size: int = 2,
+    embedding_cache: EmbeddingCache | None = None,
+):
+    retrieval = RetrievalService(
+        embedding_service=_embedding_service("model-v1"),
+        vector_db=PineconeService(index=InMemoryVectorIndex()),
+        keyword_index=BM25Index(),
+        embedding_cache=embedding_cache,
+        model_registry=FakeModelRegistry(),
+    )
+    indexer = IncrementalIndexer(
+        db=table, retrieval_service=retrieval, batch_size=batch_size, lag_seconds=0
+    )
+    IncrementalIndexer._schema_ready = True
+    return indexer
+
+
+@pytest.mark.asyncio
+async def test_first_run_indexes_all_rows_and_records_hashes():
+    # Arrange
+    table = FakeKnowledgeBaseTable()
+    table.put("a", "Alpha document.", 1, metadata={"tenant": "x"})
+    table.put("b", "Beta document.", 2)
+    table.put("c", "Gamma document.", 3)
+    indexer = _make_indexer(table)
+
+    # Act
+    stats = await indexer.run_once()
+
+    # Assert
+    assert stats["scanned"] == 3
+    assert stats["indexed"] == 3
+    assert table.rows["a"]["content_hash"] == row_hash(
+        "Alpha document.", {"tenant": "x"}
+    )
+    assert table.rows["a"]["embedding_model"] == "model-v1"
+    assert indexer.watermark == (table.rows["c"]["updated_at"], "c")
+    assert indexer.retrieval_service.is_indexed("c")
+
+
+@pytest.mark.asyncio
+async def test_second_run_only_touches_changed_and_deleted_rows():
+    # Arrange
+    table = FakeKnowledgeBaseTable()
+    table.put("a", "Alpha document.", 1)
+    table.put("b", "Beta document.", 2)
+    indexer = _make_indexer(table)
+    await indexer.run_once()
+    embed = indexer.retrieval_service.embedding_service.embed_text
+    embed.reset_mock()
+
+    table.put("b", "Beta document, revised.", 10)
+    table.put("a", "Alpha document.", 11, deleted=True)
+    table.put("d", "Delta document.", 12)
+
+    # Act
+    stats = await indexer.run_once()
+
+    # Assert
+    assert stats["scanned"] == 3
+    assert stats["indexed"] == 2
+    assert stats["tombstoned"] == 1
+    assert not indexer.retrieval_service.is_indexed("a")
+    embedded = [text for call in embed.await_args_list for text in call.args[0]]
+    assert sorted(embedded) == ["Beta document, revised.", "Delta document."]
+
+
+@pytest.mark.asyncio
+async def test_touched_rows_with_same_hash_are_not_reembedded():
+    # Arrange
+    table = FakeKnowledgeBaseTable()
+    table.put("a", "Alpha document.", 1)
+    indexer = _make_indexer(table)
+    await indexer.run_once()
+    indexer.retrieval_service.embedding_service.embed_text.reset_mock()
+    table.rows["a"]["updated_at"] = T0 + timedelta(minutes=5)
+
+    # Act
+    stats = await indexer.run_once()
+
+    # Assert
+    assert stats["unchanged"] == 1
+    indexer.retrieval_service.embedding_service.embed_text.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_follows_model_migrated_by_another_process():
+    # Arrange
+    table = FakeKnowledgeBaseTable()
+    table.put("a", "Alpha document.", 1)
+    indexer = _make_indexer(table)
+    await indexer.run_once()
+    retrieval = indexer.retrieval_service
+    target = EmbeddingNamespace(
+        _embedding_service("model-v2"),
+        PineconeService(index=InMemoryVectorIndex(), namespace="model-v2"),
+    )
+    retrieval.new_namespace = AsyncMock(return_value=target)
+    retrieval.model_registry.model_name = "model-v2"
+
+    # Act
+    stats = await indexer.run_once()
+
+    # Assert
+    retrieval.new_namespace.assert_awaited_once_with("model-v2")
+    assert retrieval.active is target
+    assert stats["indexed"] == 1
+    assert stats["embedded_chunks"] == 1
+    assert table.rows["a"]["embedding_model"] == "model-v2"
+    results = await retrieval.search("Alpha", top_k=1)
+    assert results[0]["metadata"]["doc_id"] == "a"
+
+
+@pytest.mark.asyncio
+async def test_rows_backfilled_by_a_migration_are_only_relabelled():
+    # Arrange: the migration put the row's chunks in the new namespace
+    table = FakeKnowledgeBaseTable()
+    table.put("a", "Alpha document.", 1)
+    indexer = _make_indexer(table)
+    await indexer.run_once()
+    retrieval = indexer.retrieval_service
+    retrieval.active.embedding_service.model_name = "model-v2"
+
+    # Act
+    stats = await indexer.run_once()
+
+    # Assert
+    assert stats["unchanged"] == 1
+    assert stats["embedded_chunks"] == 0
+    assert table.rows["a"]["embedding_model"] == "model-v2"
+
+
+@pytest.mark.asyncio
+async def test_restarted_process_rebuilds_index_from_embedding_cache():
+    # Arrange: a first process indexed the table, filling the cache
+    table = FakeKnowledgeBaseTable()
+    table.put("a", "Alpha document.", 1)
+    table.put("b", "Beta document.", 2)
+    cache = EmbeddingCache(FakeBinaryRedis(), ttl_seconds=60)
+    await _make_indexer(table, embedding_cache=cache).run_once()
+
+    # Act: a fresh process starts with an empty index and watermark
+    restarted = _make_indexer(table, embedding_cache=cache)
+    stats = await restarted.run_once()
+
+    # Assert
+    assert stats["indexed"] == 2
+    assert stats["embedded_chunks"] == 0
+    restarted.retrieval_service.embedding_service.embed_text.assert_not_awaited()
+    results = await restarted.retrieval_service.search("Alpha", top_k=1)
+    assert results[0]["metadata"]["doc_id"] == "a"
+
+
+@pytest.mark.asyncio
+async def test_rows_embedded_by_a_worker_are_indexed_without_embedding():
+    # Arrange: a worker embeds the document into the cache, then writes the row
+    table = FakeKnowledgeBaseTable()
+    cache = EmbeddingCache(FakeBinaryRedis(), ttl_seconds=60)
+    worker = _make_indexer(table, embedding_cache=cache).retrieval_service
+    precomputed = await worker.precompute_embeddings("a", "Alpha document.")
+    table.put("a", "Alpha document.", 1)
+    api = _make_indexer(table, embedding_cache=cache)
+
+    # Act
+    stats = await api.run_once()
+
+    # Assert
+    assert precomputed == {"chunks": 1, "embedded": 1}
+    assert not worker.is_indexed("a")
+    assert stats["indexed"] == 1
+    assert stats["embedded_chunks"] == 0
+    results = await api.retrieval_service.search("Alpha", top_k=1)
+    assert results[0]["metadata"]["doc_id"] == "a"
+
+
+@pytest.mark.asyncio
+async def test_periodic_runs_survive_failures():
+    # Arrange
+    table = FakeKnowledgeBaseTable()
+    indexer = _make_indexer(table)
+    runs = []
+
+    async def run_once():
+        runs.append(len(runs))
+        if len(runs) == 1:
+            raise ConnectionError("database down")
+        return {}
+
+    indexer.run_once = run_once
+
+    # Act
+    task = asyncio.create_task(indexer.run_periodically(interval_seconds=0.01))
+    while len(runs) < 3:
+        await asyncio.sleep(0.01)
+    task.cancel()
+
+    # Assert
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert len(runs) >= 3
@@ -0,0 +1,82 @@
+# backend/tests/test_langchain_orchestrator.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services.langchain_orchestrator import LangChainOrchestrator
+
+
+@pytest.mark.asyncio
+@patch("app.services.langchain_orchestrator.RAGService")
+@patch("app.services.langchain_orchestrator.RecommendationService")
+@patch("app.services.langchain_orchestrator.LLMService")
+async def test_run_text_pipeline_uses_context_and_reports_timings(
+    MockLLMService, MockRecommendationService, MockRAGService
+):
+    # Arrange
+    started = []
+
+    async def get_context(text):
+        started.append("retrieval")
+        await asyncio.sleep(0.05)
+        return [{"id": "doc1", "text": "Refunds take five days."}]
+
+    async def get_recommendations(text):
+        started.append("recommendations")
+        await asyncio.sleep(0.05)
+        return ["Laptop"]
+
+    rag = MockRAGService.return_value
+    rag.get_context = AsyncMock(side_effect=get_context)
+    rag.build_prompt = MagicMock(return_value="PROMPT")
+    MockRecommendationService.return_value.get_recommendations = AsyncMock(
+        side_effect=get_recommendations
+    )
+    llm = MockLLMService.return_value
+    llm.generate_response = AsyncMock(return_value="Five days.")
+    orchestrator = LangChainOrchestrator()
+
+    # Act
+    response = await orchestrator.run_text_pipeline(
+        "How long do refunds take?", use_rag=True
+    )
+
+    # Assert
+    assert response.response_text == "Five days."
+    assert response.recommendations == ["Laptop"]
+    assert response.sources == ["doc1"]
+    llm.generate_response.assert_awaited_once_with("PROMPT")
+    assert set(response.timings) == {"retrieval", "recommendations", "llm", "total"}
+    # Both stages ran concurrently, so the total is well under their sum.
+    assert response.timings["total"] < (
+        response.timings["retrieval"] + response.timings["recommendations"]
+    )
+    assert sorted(started) == ["recommendations", "retrieval"]
+
+
+@pytest.mark.asyncio
+@patch("app.services.langchain_orchestrator.RAGService")
+@patch("app.services.langchain_orchestrator.RecommendationService")
+@patch("app.services.langchain_orchestrator.LLMService")
+async def test_run_text_pipeline_sends_prompt_unchanged_without_rag(
+    MockLLMService, MockRecommendationService, MockRAGService
+):
+    # Arrange
+    rag = MockRAGService.return_value
+    rag.get_context = AsyncMock()
+    rag.build_prompt = MagicMock(side_effect=lambda question, context: question)
+    MockRecommendationService.return_value.get_recommendations = AsyncMock(
+        return_value=[]
+    )
+    llm = MockLLMService.return_value
+    llm.generate_response = AsyncMock(return_value="A poem.")
+    orchestrator = LangChainOrchestrator()
+
+    # Act
+    response = await orchestrator.run_text_pipeline("Write a short poem.")
+
+    # Assert
+    assert response.response_text == "A poem."
+    assert response.sources == []
+    rag.get_context.assert_not_called()
+    llm.generate_response.assert_awaited_once_with("Write a short poem.")
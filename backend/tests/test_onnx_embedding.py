@@ -0,0 +1,77 @@
+# backend/tests/test_onnx_embedding.py
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from app.services.onnx_embedding import OnnxSentenceEncoder
+from sentence_transformers import SentenceTransformer, models
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+SENTENCES = [
+    "reset my password",
+    "the printer shows an error",
+    "shipping takes three to five days and returns are free",
+]
+WORDS = sorted({word for sentence in SENTENCES for word in sentence.split()})
+
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    """A small random BERT sentence-transformer, so no download is needed."""
+    path = tmp_path_factory.mktemp("tiny-model")
+    vocab = path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS))
+    BertTokenizerFast(vocab_file=str(vocab)).save_pretrained(str(path))
+    config = BertConfig(
+        vocab_size=5 + len(WORDS),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+    )
+    BertModel(config).save_pretrained(str(path))
+    model = SentenceTransformer(
+        modules=[
+            models.Transformer(str(path), max_seq_length=32),
+            models.Pooling(32),
+            models.Normalize(),
+        ]
+    )
+    model.save(str(path / "sentence-transformer"))
+    return str(path / "sentence-transformer")
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a * b).sum(axis=1) / np.linalg.norm(a, axis=1) / np.linalg.norm(b, axis=1)
+
+
+def test_onnx_fp32_matches_pytorch(tiny_model_dir, tmp_path):
+    # Arrange
+    expected = SentenceTransformer(tiny_model_dir, device="cpu").encode(SENTENCES)
+    encoder = OnnxSentenceEncoder.from_pretrained(
+        tiny_model_dir, cache_dir=str(tmp_path), quantize=False, threads=1
+    )
+
+    # Act
+    actual = encoder.encode(SENTENCES)
+
+    # Assert
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=1e-4)
+    np.testing.assert_allclose(encoder.encode(SENTENCES[0]), expected[0], atol=1e-4)
+
+
+def test_onnx_int8_stays_close_to_pytorch(tiny_model_dir, tmp_path):
+    # Arrange
+    pytest.importorskip("onnx")
+    expected = SentenceTransformer(tiny_model_dir, device="cpu").encode(SENTENCES)
+    encoder = OnnxSentenceEncoder.from_pretrained(
+        tiny_model_dir, cache_dir=str(tmp_path), quantize=True, threads=1
+    )
+
+    # Act
+    actual = encoder.encode(SENTENCES)
+
+    # Assert
+    assert _cosine(actual, expected).min() > 0.98
@@ -0,0 +1,82 @@
+# backend/tests/test_openai_client.py
+import asyncio
+import threading
+
+import pytest
+from app.core.config import settings
+from app.services import openai_client
+from app.services.adapters.openai_llm_adapter import OpenAILLMAdapter
+from app.services.adapters.openai_tts_adapter import OpenAITTSAdapter
+from app.services.adapters.openai_vision_adapter import OpenAIVisionAdapter
+
+
+@pytest.fixture(autouse=True)
+def fresh_client(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(openai_client, "_client", None)
+    monkeypatch.setattr(openai_client, "_client_loop", None)
+    monkeypatch.setattr(openai_client, "_client_pid", None)
+
+
+@pytest.mark.asyncio
+async def test_adapters_of_all_modalities_share_one_client():
+    # Act
+    llm = OpenAILLMAdapter(model_name="test-gpt")
+    vision = OpenAIVisionAdapter()
+    tts = OpenAITTSAdapter()
+
+    # Assert
+    assert llm.client is vision.client is tts.client
+    assert OpenAILLMAdapter(model_name="test-gpt").client is llm.client
+    await openai_client.close_openai_client()
+
+
+def test_client_uses_http2_pool_limits_and_timeouts():
+    # Act
+    client = openai_client.get_openai_client()
+
+    # Assert
+    http_client = client._client
+    pool = http_client._transport._pool
+    assert pool._http2 is True
+    assert pool._max_connections == 100
+    assert pool._max_keepalive_connections == 20
+    assert client.timeout.connect == 5
+    assert client.timeout.read == 120
+
+
+def test_new_event_loop_gets_a_new_client():
+    # Arrange
+    async def fetch():
+        return openai_client.get_openai_client()
+
+    # Act
+    first = asyncio.run(fetch())
+    second = asyncio.run(fetch())
+
+    # Assert
+    assert first is not second
+
+
+def test_client_of_a_replaced_loop_is_closed_on_that_loop():
+    # Arrange: a client created on a loop that keeps running in a thread
+    old_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=old_loop.run_forever, daemon=True)
+    thread.start()
+
+    async def fetch():
+        return openai_client.get_openai_client()
+
+    old = asyncio.run_coroutine_threadsafe(fetch(), old_loop).result(timeout=5)
+
+    # Act
+    new = asyncio.run(fetch())
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), old_loop).result(timeout=5)
+
+    # Assert
+    assert new is not old
+    assert old.is_closed()
+    assert not new.is_closed()
+    old_loop.call_soon_threadsafe(old_loop.stop)
+    thread.join(timeout=5)
+    old_loop.close()
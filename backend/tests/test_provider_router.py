@@ -0,0 +1,163 @@
+# backend/tests/test_provider_router.py
+import asyncio
+import threading
+import time
+
+import pytest
+from app.services.base.llm_adapter import BaseLLMAdapter
+from app.services.provider_router import (
+    LatencyTracker,
+    ProviderRouter,
+    RoutedLLMAdapter,
+)
+
+
+def _make_adapter_class(response: str, delay: float = 0.0, fail: bool = False):
+    class FakeAdapter(BaseLLMAdapter):
+        fallback_response = "Sorry, I encountered an error."
+        calls = 0
+        cancelled = False
+
+        async def generate_response(self, prompt: str) -> str:
+            type(self).calls += 1
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                type(self).cancelled = True
+                raise
+            if fail:
+                return self.fallback_response
+            return response
+
+    return FakeAdapter
+
+
+def _make_router(adapter_classes: dict, **overrides) -> ProviderRouter:
+    params = dict(
+        modality="llm",
+        adapter_classes=adapter_classes,
+        providers=list(adapter_classes),
+        min_delay=0.01,
+        max_delay=0.05,
+    )
+    params.update(overrides)
+    return ProviderRouter(**params)
+
+
+@pytest.mark.asyncio
+async def test_router_returns_primary_result_without_hedging():
+    # Arrange
+    primary = _make_adapter_class("primary answer")
+    secondary = _make_adapter_class("secondary answer")
+    router = _make_router({"openai": primary, "huggingface": secondary})
+
+    # Act
+    result = await router.call("generate_response", "Hello")
+
+    # Assert
+    assert result == "primary answer"
+    assert secondary.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_router_fails_over_on_error():
+    # Arrange
+    primary = _make_adapter_class("unused", fail=True)
+    secondary = _make_adapter_class("secondary answer")
+    router = _make_router({"openai": primary, "huggingface": secondary})
+
+    # Act
+    result = await router.call("generate_response", "Hello")
+
+    # Assert
+    assert result == "secondary answer"
+    assert primary.calls == 1
+    assert secondary.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_router_hedges_slow_primary_and_cancels_loser():
+    # Arrange
+    primary = _make_adapter_class("slow answer", delay=1.0)
+    secondary = _make_adapter_class("fast answer")
+    router = _make_router({"openai": primary, "huggingface": secondary})
+
+    # Act
+    result = await router.call("generate_response", "Hello")
+    await asyncio.sleep(0)
+
+    # Assert
+    assert result == "fast answer"
+    assert primary.cancelled
+
+
+@pytest.mark.asyncio
+async def test_router_returns_fallback_when_all_providers_fail():
+    # Arrange
+    primary = _make_adapter_class("unused", fail=True)
+    secondary = _make_adapter_class("unused", fail=True)
+    router = _make_router({"openai": primary, "huggingface": secondary})
+
+    # Act
+    result = await router.call("generate_response", "Hello")
+
+    # Assert
+    assert result == "Sorry, I encountered an error."
+
+
+@pytest.mark.asyncio
+async def test_adapters_are_created_off_the_event_loop():
+    # Arrange
+    created_in = []
+
+    class SlowLoadingAdapter(_make_adapter_class("local answer")):
+        def __init__(self):
+            created_in.append(threading.current_thread())
+            time.sleep(0.2)  # e.g. loading a local pipeline
+
+    primary = _make_adapter_class("unused", fail=True)
+    router = _make_router({"openai": primary, "huggingface": SlowLoadingAdapter})
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+
+    # Act
+    result = await router.call("generate_response", "Hello")
+    ticker.cancel()
+
+    # Assert
+    assert result == "local answer"
+    assert created_in[0] is not threading.main_thread()
+    assert ticks > 5
+
+
+def test_hedge_delay_follows_observed_latency():
+    # Arrange
+    tracker = LatencyTracker()
+    for seconds in [0.1, 0.2, 0.3, 0.4]:
+        tracker.record("openai", seconds)
+    router = _make_router(
+        {"openai": _make_adapter_class("x")},
+        latency_tracker=tracker,
+        min_delay=0.05,
+        max_delay=5.0,
+    )
+
+    # Act & Assert
+    assert router.hedge_delay("openai") == 0.4
+    assert router.hedge_delay("huggingface") == 5.0
+
+
+def test_routed_adapter_reports_the_primary_fallback_response():
+    # Arrange
+    primary = _make_adapter_class("unused")
+    router = _make_router({"openai": primary})
+
+    # Act / Assert
+    assert RoutedLLMAdapter(router).fallback_response == primary.fallback_response
@@ -0,0 +1,93 @@
+# backend/tests/test_rag_service.py
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.services.rag_service import RAGService
+from app.utils.chunking import estimate_tokens
+
+
+def _chunk(id: str, text: str) -> dict:
+    return {"id": id, "score": 0.1, "metadata": {"text": text}}
+
+
+def test_deduplicate_drops_exact_and_near_duplicates():
+    # Arrange
+    chunks = [
+        _chunk("a", "Reset your password from the account settings page."),
+        _chunk("b", "reset your password   from the account settings page."),
+        _chunk("c", "Reset your password from the account settings page today."),
+        _chunk("d", "Refunds are processed within five business days."),
+    ]
+
+    # Act
+    unique = RAGService.deduplicate(chunks, max_similarity=0.8)
+
+    # Assert
+    assert [chunk["id"] for chunk in unique] == ["a", "d"]
+
+
+def test_pack_respects_budget_and_skips_oversized_chunks():
+    # Arrange
+    chunks = [
+        _chunk("a", "x " * 10),  # 10 tokens
+        _chunk("b", "y " * 100),  # 100 tokens
+        _chunk("c", "z " * 5),  # 5 tokens
+    ]
+
+    # Act
+    packed = RAGService.pack(chunks, token_budget=20)
+
+    # Assert
+    assert [chunk["id"] for chunk in packed] == ["a", "c"]
+    assert sum(chunk["tokens"] for chunk in packed) <= 20
+
+
+def test_pack_truncates_best_chunk_when_nothing_fits():
+    # Arrange
+    chunks = [_chunk("a", "First sentence is here. " * 50)]
+
+    # Act
+    packed = RAGService.pack(chunks, token_budget=30)
+
+    # Assert
+    assert packed[0]["id"] == "a"
+    assert estimate_tokens(packed[0]["text"]) <= 30
+
+
+def test_build_prompt_without_context_returns_question():
+    # Act & Assert
+    assert RAGService.build_prompt("hi?", []) == "hi?"
+    assert "[1] ctx" in RAGService.build_prompt("hi?", [{"text": "ctx"}])
+
+
+@pytest.mark.asyncio
+async def test_get_context_returns_empty_on_retrieval_error():
+    # Arrange
+    retrieval = MagicMock()
+    retrieval.search = AsyncMock(side_effect=RuntimeError("index down"))
+    service = RAGService(retrieval_service=retrieval)
+
+    # Act
+    context = await service.get_context("question")
+
+    # Assert
+    assert context == []
+
+
+@pytest.mark.asyncio
+async def test_get_context_reranks_a_deeper_candidate_list():
+    # Arrange
+    chunks = [_chunk("a", "alpha text"), _chunk("b", "beta text")]
+    retrieval = MagicMock()
+    retrieval.search = AsyncMock(return_value=chunks)
+    reranker = MagicMock()
+    reranker.rerank = AsyncMock(return_value=[chunks[1]])
+    service = RAGService(retrieval_service=retrieval, rerank_service=reranker)
+
+    # Act
+    context = await service.get_context("question", top_k=1)
+
+    # Assert
+    assert retrieval.search.await_args.kwargs["top_k"] > 1
+    reranker.rerank.assert_awaited_once_with("question", chunks, top_n=1)
+    assert [chunk["id"] for chunk in context] == ["b"]
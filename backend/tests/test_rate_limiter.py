@@ -0,0 +1,172 @@
+# backend/tests/test_rate_limiter.py
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from app.services.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    ProviderRateLimiter,
+    RateLimitExceeded,
+    TokenBucket,
+    is_overload_error,
+    is_rate_limit_error,
+)
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: str | None = None):
+        super().__init__("Too Many Requests")
+        self.response = MagicMock()
+        self.response.headers = {"retry-after": retry_after} if retry_after else {}
+
+
+class FakeServerError(Exception):
+    status_code = 503
+
+
+class FakeBadRequestError(Exception):
+    status_code = 400
+
+
+def _make_limiter(**overrides) -> ProviderRateLimiter:
+    params = dict(
+        name="test:model",
+        rate=100.0,
+        burst=100,
+        max_concurrency=4,
+        queue_timeout=1.0,
+    )
+    params.update(overrides)
+    return ProviderRateLimiter(**params)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_rejects_when_refill_exceeds_deadline():
+    # Arrange
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    await bucket.acquire(deadline=time.monotonic() + 1)
+
+    # Act & Assert - the next token needs ~1s, but only 0.1s is allowed
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire(deadline=time.monotonic() + 0.1)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_queues_and_times_out():
+    # Arrange
+    limiter = AdaptiveConcurrencyLimiter(max_limit=1, initial_limit=1)
+    await limiter.acquire(deadline=time.monotonic() + 1)
+
+    # Act & Assert - the single slot is taken, so the waiter expires
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire(deadline=time.monotonic() + 0.05)
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_hands_slot_to_waiter_on_release():
+    # Arrange
+    limiter = AdaptiveConcurrencyLimiter(max_limit=1, initial_limit=1)
+    await limiter.acquire(deadline=time.monotonic() + 1)
+    waiter = asyncio.create_task(limiter.acquire(deadline=time.monotonic() + 1))
+    await asyncio.sleep(0)
+
+    # Act
+    limiter.release(latency=0.01)
+    await waiter
+
+    # Assert
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_backs_off_on_429_and_grows_on_success():
+    # Arrange
+    limiter = _make_limiter(max_concurrency=8)
+    initial_limit = limiter.concurrency.limit
+
+    # Act - a throttled call halves the concurrency limit
+    with pytest.raises(FakeRateLimitError):
+        async with limiter.slot():
+            raise FakeRateLimitError()
+
+    # Assert
+    assert limiter.concurrency.limit == initial_limit // 2
+    assert limiter.stats()["throttled_total"] == 1
+
+    # Act - healthy calls increase it again
+    for _ in range(20):
+        async with limiter.slot():
+            pass
+
+    # Assert
+    assert limiter.concurrency.limit > initial_limit // 2
+    assert limiter.concurrency.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_honours_retry_after():
+    # Arrange
+    limiter = _make_limiter(rate=10.0, burst=10, queue_timeout=0.2)
+
+    # Act
+    with pytest.raises(FakeRateLimitError):
+        async with limiter.slot():
+            raise FakeRateLimitError(retry_after="5")
+
+    # Assert - the bucket is drained for ~5s, so a short deadline fails fast
+    with pytest.raises(RateLimitExceeded):
+        async with limiter.slot():
+            pass
+    assert limiter.stats()["rejected_total"] == 1
+
+
+def test_is_rate_limit_error():
+    assert is_rate_limit_error(FakeRateLimitError())
+    assert not is_rate_limit_error(Exception("API error"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error", [FakeServerError(), asyncio.TimeoutError(), ConnectionResetError()]
+)
+async def test_limiter_backs_off_on_overload_errors(error):
+    # Arrange
+    limiter = _make_limiter(max_concurrency=8)
+    initial_limit = limiter.concurrency.limit
+
+    # Act
+    with pytest.raises(type(error)):
+        async with limiter.slot():
+            raise error
+
+    # Assert
+    assert limiter.concurrency.limit == initial_limit // 2
+    assert limiter.stats()["throttled_total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_does_not_grow_on_other_failures():
+    # Arrange
+    limiter = _make_limiter(max_concurrency=8)
+    initial_limit = limiter.concurrency.limit
+
+    # Act
+    for _ in range(20):
+        with pytest.raises(FakeBadRequestError):
+            async with limiter.slot():
+                raise FakeBadRequestError()
+
+    # Assert
+    assert limiter.concurrency.limit == initial_limit
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_is_overload_error():
+    assert is_overload_error(FakeServerError())
+    assert is_overload_error(TimeoutError())
+    assert not is_overload_error(FakeBadRequestError())
+    assert not is_overload_error(FakeRateLimitError())
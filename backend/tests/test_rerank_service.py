@@ -0,0 +1,86 @@
+# backend/tests/test_rerank_service.py
+from unittest.mock import MagicMock
+
+import pytest
+from app.services.rerank_service import RerankService
+
+
+@pytest.fixture
+def reranker():
+    # Reset the shared model and score cache so each test starts clean
+    model = MagicMock()
+    RerankService._model = model
+    RerankService._scores.clear()
+    yield RerankService(model_name="test-model")
+    RerankService._model = None
+    RerankService._scores.clear()
+
+
+def _chunks(*texts: str) -> list[dict]:
+    return [
+        {"id": f"c{i}", "score": 1.0, "metadata": {"text": text}}
+        for i, text in enumerate(texts)
+    ]
+
+
+def _score_by_length(pairs, batch_size):
+    return [float(len(text)) for _, text in pairs]
+
+
+@pytest.mark.asyncio
+async def test_rerank_scores_all_pairs_in_one_forward_pass(reranker):
+    # Arrange
+    reranker._model.predict.side_effect = _score_by_length
+    chunks = _chunks("aa", "aaaa", "a")
+
+    # Act
+    results = await reranker.rerank("query", chunks, top_n=2)
+
+    # Assert
+    assert [chunk["id"] for chunk in results] == ["c1", "c0"]
+    assert results[0]["rerank_score"] == 4.0
+    reranker._model.predict.assert_called_once()
+    assert len(reranker._model.predict.call_args.args[0]) == 3
+
+
+@pytest.mark.asyncio
+async def test_rerank_uses_cached_scores(reranker):
+    # Arrange
+    reranker._model.predict.side_effect = _score_by_length
+    chunks = _chunks("aa", "aaaa")
+    await reranker.rerank("Query", chunks, top_n=2)
+
+    # Act
+    results = await reranker.rerank("  query ", chunks, top_n=2)
+
+    # Assert
+    assert [chunk["id"] for chunk in results] == ["c1", "c0"]
+    reranker._model.predict.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_rerank_stops_once_top_n_is_settled(reranker, monkeypatch):
+    # Arrange
+    monkeypatch.setattr("app.services.rerank_service.settings.RERANK_BATCH_SIZE", 2)
+    reranker._model.predict.side_effect = _score_by_length
+    chunks = _chunks("aaaaaa", "aaaaa", "aa", "a", "aaaaaaa", "b")
+
+    # Act
+    results = await reranker.rerank("query", chunks, top_n=2)
+
+    # Assert
+    # The second batch did not change the top-2, so the third was skipped.
+    assert reranker._model.predict.call_count == 2
+    assert [chunk["id"] for chunk in results] == ["c0", "c1"]
+
+
+@pytest.mark.asyncio
+async def test_rerank_without_model_keeps_retrieval_order(reranker):
+    # Arrange
+    RerankService._model = None
+
+    # Act
+    results = await reranker.rerank("query", _chunks("a", "b", "c"), top_n=2)
+
+    # Assert
+    assert [chunk["id"] for chunk in results] == ["c0", "c1"]
@@ -0,0 +1,198 @@
+# backend/tests/test_retrieval_service.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.services.bm25_index import BM25Index
+from app.services.retrieval_service import RetrievalService, reciprocal_rank_fusion
+from app.services.vector_db_service import InMemoryVectorIndex, PineconeService
+from app.utils.chunking import estimate_tokens
+
+VECTORS = {
+    "reset password": [1.0, 0.0, 0.0],
+    "How do I change my login credentials?": [0.9, 0.1, 0.0],
+    "Error ERR-1042 means the toner cartridge is missing.": [0.0, 1.0, 0.0],
+    "Shipping takes three to five days.": [0.0, 0.0, 1.0],
+    "ERR-1042": [0.0, 0.2, 0.9],
+}
+
+
+def _make_service(embed_delay: float = 0.0) -> RetrievalService:
+    async def embed_text(texts):
+        await asyncio.sleep(embed_delay)
+        if isinstance(texts, list):
+            return [VECTORS[text] for text in texts]
+        return VECTORS[texts]
+
+    embedding_service = MagicMock()
+    embedding_service.embed_text = AsyncMock(side_effect=embed_text)
+    embedding_service.count_tokens = estimate_tokens
+    return RetrievalService(
+        embedding_service=embedding_service,
+        vector_db=PineconeService(index=InMemoryVectorIndex()),
+        keyword_index=BM25Index(),
+    )
+
+
+async def _seed(service: RetrievalService):
+    await service.index_documents(
+        [
+            ("login", "How do I change my login credentials?", {"topic": "account"}),
+            ("toner", "Error ERR-1042 means the toner cartridge is missing.", {}),
+            ("shipping", "Shipping takes three to five days.", {}),
+        ]
+    )
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    # Act
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]], k=60)
+
+    # Assert
+    assert [doc_id for doc_id, _ in fused[:2]] in (["a", "b"], ["b", "a"])
+    assert fused[-1][0] in ("c", "d")
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+@pytest.mark.asyncio
+async def test_search_finds_semantic_match_without_shared_keywords():
+    # Arrange
+    service = _make_service()
+    await _seed(service)
+
+    # Act
+    results = await service.search("reset password", top_k=1)
+
+    # Assert
+    assert results[0]["metadata"]["doc_id"] == "login"
+    assert results[0]["metadata"]["topic"] == "account"
+    assert results[0]["metadata"]["text"].startswith("How do I change")
+
+
+@pytest.mark.asyncio
+async def test_search_finds_exact_error_code():
+    # Arrange
+    service = _make_service()
+    await _seed(service)
+
+    # Act
+    results = await service.search("ERR-1042", top_k=1)
+
+    # Assert
+    assert results[0]["metadata"]["doc_id"] == "toner"
+
+
+@pytest.mark.asyncio
+async def test_keyword_search_runs_while_query_is_embedded():
+    # Arrange
+    service = _make_service()
+    await _seed(service)
+    embedding_started = asyncio.Event()
+    overlapped = []
+
+    async def embed(texts):
+        embedding_started.set()
+        await asyncio.sleep(0.01)
+        return VECTORS[texts]
+
+    service.embedding_service.embed_text.side_effect = embed
+    keyword_search = service.keyword_index.search
+
+    def search(*args, **kwargs):
+        overlapped.append(embedding_started.is_set())
+        return keyword_search(*args, **kwargs)
+
+    service.keyword_index.search = search
+
+    # Act
+    await service.search("ERR-1042", top_k=3)
+
+    # Assert
+    assert overlapped == [True]
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_keywords_when_budget_is_exceeded():
+    # Arrange
+    service = _make_service()
+    await _seed(service)
+
+    async def slow_embed(_):
+        await asyncio.sleep(1)
+
+    service.embedding_service.embed_text.side_effect = slow_embed
+
+    # Act
+    results = await service.search("ERR-1042", top_k=3, budget_ms=20)
+
+    # Assert
+    assert [result["metadata"]["doc_id"] for result in results] == ["toner"]
+    assert results[0]["metadata"]["text"].startswith("Error ERR-1042")
+
+
+@pytest.mark.asyncio
+async def test_remove_document_drops_it_from_both_indexes():
+    # Arrange
+    service = _make_service()
+    await _seed(service)
+
+    # Act
+    removed = await service.remove_document("toner")
+    results = await service.search("ERR-1042", top_k=3)
+
+    # Assert
+    assert removed is True
+    assert "toner" not in [result["metadata"]["doc_id"] for result in results]
+
+
+@pytest.mark.asyncio
+async def test_search_applies_metadata_filter_to_both_retrievers():
+    # Arrange
+    service = _make_service()
+    await _seed(service)
+
+    # Act
+    results = await service.search("ERR-1042", top_k=3, filter={"topic": "account"})
+
+    # Assert
+    assert [result["metadata"]["doc_id"] for result in results] == ["login"]
+
+
+@pytest.mark.asyncio
+async def test_reindexing_unchanged_document_skips_embedding():
+    # Arrange
+    service = _make_service()
+    await _seed(service)
+    service.embedding_service.embed_text.reset_mock()
+
+    # Act
+    stats = await service.index_document(
+        "login", "How do I change my login credentials?", {"topic": "security"}
+    )
+
+    # Assert
+    assert stats["embedded"] == 0
+    assert stats["skipped"] == 1
+    service.embedding_service.embed_text.assert_not_awaited()
+    results = await service.search("reset password", top_k=1)
+    assert results[0]["metadata"]["topic"] == "security"
+
+
+@pytest.mark.asyncio
+async def test_reindexing_changed_document_replaces_stale_chunks():
+    # Arrange
+    service = _make_service()
+    await _seed(service)
+
+    # Act
+    stats = await service.index_document("toner", "Shipping takes three to five days.")
+
+    # Assert
+    assert stats == {
+        "documents": 1,
+        "chunks": 1,
+        "embedded": 1,
+        "skipped": 0,
+        "removed": 1,
+    }
+    assert service.keyword_index.search("ERR-1042") == []
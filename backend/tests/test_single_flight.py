@@ -0,0 +1,228 @@
+# backend/tests/test_single_flight.py
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import redis
+from app.services.llm_service import LLMService
+from app.services.single_flight import SingleFlight
+from app.services.vision_service import VisionService
+
+
+class FakeRedis:
+    """Shared by several SingleFlight instances to stand in for processes."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise redis.exceptions.ConnectionError("redis down")
+
+        return fail
+
+
+def _slow_call(result="a caption", delay=0.05):
+    async def call(*args):
+        await asyncio.sleep(delay)
+        return result
+
+    return AsyncMock(side_effect=call)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_call_in_process():
+    # Arrange
+    flight = SingleFlight(FakeRedis(), poll_interval=0.01)
+    call = _slow_call()
+
+    # Act
+    results = await asyncio.gather(
+        *(flight.do("cache:vision:abc", call, ttl=60) for _ in range(20))
+    )
+
+    # Assert
+    assert results == ["a caption"] * 20
+    assert call.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_other_process_reads_leader_result_from_redis():
+    # Arrange
+    shared_redis = FakeRedis()
+    leader = SingleFlight(shared_redis, poll_interval=0.01)
+    follower = SingleFlight(shared_redis, poll_interval=0.01)
+    leader_call, follower_call = _slow_call(), _slow_call("never used")
+
+    # Act
+    results = await asyncio.gather(
+        leader.do("cache:vision:abc", leader_call, ttl=60),
+        follower.do("cache:vision:abc", follower_call, ttl=60),
+    )
+
+    # Assert
+    assert results == ["a caption", "a caption"]
+    assert leader_call.await_count == 1
+    follower_call.assert_not_awaited()
+    assert shared_redis.data == {"cache:vision:abc": "a caption"}
+
+
+class SlowRedis(FakeRedis):
+    """Every command takes a blocking round trip."""
+
+    def get(self, key):
+        time.sleep(0.02)
+        return super().get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        time.sleep(0.02)
+        return super().set(key, value, ex=ex, nx=nx)
+
+
+@pytest.mark.asyncio
+async def test_polling_follower_does_not_block_the_event_loop():
+    # Arrange
+    shared_redis = SlowRedis()
+    shared_redis.data["cache:vision:abc:lease"] = "another-process"
+    follower = SingleFlight(shared_redis, wait_seconds=0.3, poll_interval=0.01)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    # Act
+    ticking = asyncio.create_task(ticker())
+    result = await follower.do("cache:vision:abc", _slow_call(delay=0), ttl=60)
+    ticking.cancel()
+
+    # Assert: the loop kept running while Redis calls were in flight
+    assert result == "a caption"
+    assert ticks > 20
+
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_when_leader_fails():
+    # Arrange
+    shared_redis = FakeRedis()
+    leader = SingleFlight(shared_redis, poll_interval=0.01)
+    follower = SingleFlight(shared_redis, poll_interval=0.01)
+    failing_call = AsyncMock(side_effect=RuntimeError("provider down"))
+
+    async def fail_later():
+        await asyncio.sleep(0.05)
+        return await failing_call()
+
+    # Act
+    leader_result, follower_result = await asyncio.gather(
+        leader.do("cache:llm:x", fail_later, ttl=60),
+        follower.do("cache:llm:x", _slow_call("recovered"), ttl=60),
+        return_exceptions=True,
+    )
+
+    # Assert
+    assert isinstance(leader_result, RuntimeError)
+    assert follower_result == "recovered"
+    assert "cache:llm:x:lease" not in shared_redis.data
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    # Arrange
+    flight = SingleFlight(FakeRedis(), poll_interval=0.01)
+    call = _slow_call(delay=0.1)
+    first = asyncio.create_task(flight.do("k", call, ttl=60))
+    second = asyncio.create_task(flight.do("k", call, ttl=60))
+    await asyncio.sleep(0.01)
+
+    # Act
+    first.cancel()
+    result = await second
+
+    # Assert
+    assert result == "a caption"
+    assert call.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_fall_back_to_direct_call():
+    # Arrange
+    flight = SingleFlight(BrokenRedis())
+    call = _slow_call(delay=0)
+
+    # Act
+    result = await flight.do("k", call, ttl=60)
+
+    # Assert
+    assert result == "a caption"
+
+
+@pytest.mark.asyncio
+@patch("app.services.llm_service.get_single_flight")
+@patch("app.services.llm_service.get_model_registry")
+async def test_llm_service_coalesces_identical_prompts(
+    mock_get_model_registry, mock_get_single_flight
+):
+    # Arrange
+    shared_redis = FakeRedis()
+    mock_get_single_flight.return_value = SingleFlight(shared_redis)
+    adapter = MagicMock(model_name="gpt", fallback_response="Sorry")
+    adapter.generate_response = _slow_call("Hello!")
+    mock_get_model_registry.return_value.get_llm_adapter.return_value = adapter
+    service = LLMService()
+
+    # Act
+    results = await asyncio.gather(
+        *(service.generate_response("Hi") for _ in range(5)),
+        service.generate_response("Bye"),
+    )
+
+    # Assert
+    assert results == ["Hello!"] * 6
+    assert adapter.generate_response.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.services.vision_service.get_single_flight")
+@patch("app.services.vision_service.get_model_registry")
+async def test_vision_service_does_not_cache_fallback_description(
+    mock_get_model_registry, mock_get_single_flight
+):
+    # Arrange
+    shared_redis = FakeRedis()
+    mock_get_single_flight.return_value = SingleFlight(shared_redis)
+    fallback = "Could not generate a description for the image."
+    adapter = MagicMock(fallback_response=fallback)
+    adapter.get_image_description = _slow_call(fallback)
+    mock_get_model_registry.return_value.get_vision_adapter.return_value = adapter
+    service = VisionService()
+    service.redis_client = shared_redis
+
+    # Act
+    first = await service.get_image_description("aW1hZ2U=")
+    second = await service.get_image_description("aW1hZ2U=")
+
+    # Assert
+    assert first == second == fallback
+    assert adapter.get_image_description.await_count == 2
+    assert shared_redis.data == {}
@@ -0,0 +1,141 @@
+# backend/tests/test_task_events.py
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from app.services.task_events import (
+    TaskEventBroker,
+    channel,
+    publish_task_event,
+    stream_task_events,
+)
+
+
+class FakePubSub:
+    def __init__(self):
+        self.channels = set()
+        self.subscribe_calls = 0
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, name):
+        self.subscribe_calls += 1
+        self.channels.add(name)
+
+    async def unsubscribe(self, name):
+        self.channels.discard(name)
+
+    async def get_message(self, ignore_subscribe_messages, timeout):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def publish(self, name, data):
+        if name in self.channels:
+            self.messages.put_nowait({"channel": name, "data": data})
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.pubsub_instance = FakePubSub()
+
+    def pubsub(self):
+        return self.pubsub_instance
+
+
+def _event(task_id, event, **data):
+    return json.dumps({"task_id": task_id, "event": event, **data})
+
+
+def test_publish_task_event_sends_json_and_swallows_errors():
+    # Arrange
+    client = MagicMock()
+
+    # Act
+    publish_task_event(client, "t1", "completed", result="done")
+    client.publish.side_effect = ConnectionError("redis down")
+    publish_task_event(client, "t1", "completed", result="done")
+
+    # Assert
+    name, message = client.publish.call_args_list[0].args
+    assert name == channel("t1")
+    assert json.loads(message) == {
+        "task_id": "t1",
+        "event": "completed",
+        "result": "done",
+    }
+
+
+@pytest.mark.asyncio
+async def test_broker_fans_out_over_one_subscription():
+    # Arrange
+    client = FakeAsyncRedis()
+    broker = TaskEventBroker(client)
+    pubsub = client.pubsub_instance
+
+    # Act
+    async with broker.subscribe("t1") as first, broker.subscribe("t1") as second:
+        pubsub.publish(channel("t1"), _event("t1", "progress", stage="vision"))
+        events = await asyncio.wait_for(
+            asyncio.gather(first.get(), second.get()), timeout=2
+        )
+    await broker.close()
+
+    # Assert
+    assert [event["stage"] for event in events] == ["vision", "vision"]
+    assert pubsub.subscribe_calls == 1
+    assert pubsub.channels == set()
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_already_finished_task_without_waiting():
+    # Arrange
+    broker = TaskEventBroker(FakeAsyncRedis())
+
+    # Act
+    events = [
+        chunk
+        async for chunk in stream_task_events(
+            "t1", broker, lambda task_id: {"status": "SUCCESS", "result": "hi"}
+        )
+    ]
+    await broker.close()
+
+    # Assert
+    assert len(events) == 1
+    assert events[0].startswith("event: completed\n")
+    assert json.loads(events[0].split("data: ")[1])["result"] == "hi"
+
+
+@pytest.mark.asyncio
+async def test_stream_pushes_progress_until_completion():
+    # Arrange
+    client = FakeAsyncRedis()
+    broker = TaskEventBroker(client)
+    pending = lambda task_id: {"status": "PENDING", "result": None}
+
+    async def worker():
+        await asyncio.sleep(0.05)
+        client.pubsub_instance.publish(channel("t1"), _event("t1", "progress"))
+        await asyncio.sleep(0.15)
+        client.pubsub_instance.publish(
+            channel("t1"), _event("t1", "completed", result="hi")
+        )
+
+    # Act
+    publisher = asyncio.create_task(worker())
+    events = [
+        chunk
+        async for chunk in stream_task_events(
+            "t1", broker, pending, keepalive_seconds=0.1
+        )
+    ]
+    await publisher
+    await broker.close()
+
+    # Assert
+    names = [chunk.split("\n")[0] for chunk in events]
+    assert names[0] == "event: progress"
+    assert ": keep-alive" in names
+    assert names[-1] == "event: completed"
@@ -0,0 +1,233 @@
+# backend/tests/test_task_scheduler.py
+from unittest.mock import PropertyMock, patch
+
+import pytest
+from app.core.celery_app import celery_app
+from app.services.task_scheduler import (
+    BATCH,
+    INTERACTIVE,
+    WEIGHTS_KEY,
+    AdmissionError,
+    TaskScheduler,
+)
+
+
+class FakeRedis:
+    """The subset of Redis commands the scheduler uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+
+    def decr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) - 1)
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+    def rpush(self, key, value):
+        self.data.setdefault(key, []).append(value)
+
+    def lpush(self, key, value):
+        self.data.setdefault(key, []).insert(0, value)
+
+    def lpop(self, key):
+        return self.data[key].pop(0)
+
+    def lindex(self, key, index):
+        items = self.data.get(key, [])
+        return items[index] if index < len(items) else None
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def srem(self, key, member):
+        self.data.get(key, set()).discard(member)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = str(value)
+
+    def hdel(self, key, field):
+        self.data.get(key, {}).pop(field, None)
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, member):
+        return self.data.get(key, {}).pop(member, None) is not None
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.data.get(key, {})
+        for member in [m for m, score in zset.items() if score <= high]:
+            del zset[member]
+
+
+def _job(task_id: str):
+    return celery_app.signature(
+        "app.tasks.long_llm_generation_task", args=("prompt", None), task_id=task_id
+    )
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = TaskScheduler(FakeRedis())
+    with patch.object(TaskScheduler, "_send") as send:
+        scheduler.sent = send
+        yield scheduler
+
+
+def _sent_ids(scheduler) -> list[str]:
+    return [call.args[0].options["task_id"] for call in scheduler.sent.call_args_list]
+
+
+@patch("app.services.task_scheduler.settings.SCHEDULER_BATCH_MAX_IN_FLIGHT", 2)
+def test_batch_jobs_are_released_round_robin_across_users(scheduler):
+    # Arrange: a bulk user submits first, then a second user
+    for i in range(6):
+        scheduler.submit(_job(f"bulk-{i}"), user_id="bulk", priority=BATCH)
+    scheduler.submit(_job("small-0"), user_id="small", priority=BATCH)
+    scheduler.submit(_job("small-1"), user_id="small", priority=BATCH)
+
+    # Act: jobs finish one at a time
+    for task_id in ["bulk-0", "bulk-1", "small-0", "bulk-2"]:
+        scheduler.task_finished(task_id)
+
+    # Assert: the second user did not wait behind the whole bulk backlog
+    assert _sent_ids(scheduler) == [
+        "bulk-0",
+        "bulk-1",
+        "small-0",
+        "bulk-2",
+        "small-1",
+        "bulk-3",
+    ]
+    assert scheduler.pending() == 2
+
+
+@patch("app.services.task_scheduler.settings.SCHEDULER_BATCH_MAX_IN_FLIGHT", 3)
+def test_user_weights_scale_their_share(scheduler):
+    # Arrange
+    scheduler.redis_client.hset(WEIGHTS_KEY, "gold", 2)
+    with patch.object(TaskScheduler, "dispatch"):  # Submit everything first
+        for i in range(4):
+            scheduler.submit(_job(f"gold-{i}"), user_id="gold", priority=BATCH)
+            scheduler.submit(_job(f"std-{i}"), user_id="std", priority=BATCH)
+
+    # Act
+    released = scheduler.dispatch()
+
+    # Assert
+    assert released == 3
+    assert _sent_ids(scheduler) == ["gold-0", "gold-1", "std-0"]
+
+
+def test_interactive_jobs_bypass_the_batch_queues(scheduler):
+    # Act
+    scheduled = scheduler.submit(_job("chat-0"), user_id="u1")
+
+    # Assert
+    assert scheduled == INTERACTIVE
+    assert scheduler.sent.call_args.args[1] == "interactive"
+    assert scheduler.pending() == 0
+
+
+@patch("app.services.task_scheduler.settings.SCHEDULER_INTERACTIVE_MAX_DEPTH", 2)
+def test_interactive_jobs_are_deferred_when_their_queue_is_deep(scheduler):
+    # Arrange
+    scheduler.redis_client.data["interactive"] = ["queued", "queued"]
+
+    # Act
+    scheduled = scheduler.submit(_job("chat-0"), user_id="u1")
+
+    # Assert
+    assert scheduled == BATCH
+    assert scheduler.sent.call_args.args[1] == "batch"
+
+
+@patch("app.services.task_scheduler.settings.SCHEDULER_MAX_PENDING_PER_USER", 2)
+@patch("app.services.task_scheduler.settings.SCHEDULER_BATCH_MAX_IN_FLIGHT", 1)
+def test_admission_control_rejects_past_the_per_user_limit(scheduler):
+    # Arrange: one job runs, two wait
+    for i in range(3):
+        scheduler.submit(_job(f"bulk-{i}"), user_id="bulk", priority=BATCH)
+
+    # Act / Assert
+    with pytest.raises(AdmissionError):
+        scheduler.submit(_job("bulk-3"), user_id="bulk", priority=BATCH)
+    assert scheduler.submit(_job("other-0"), user_id="other", priority=BATCH) == BATCH
+
+
+@patch("app.services.task_scheduler.settings.SCHEDULER_BATCH_MAX_IN_FLIGHT", 1)
+def test_failed_send_puts_the_job_back(scheduler):
+    # Arrange
+    scheduler.sent.side_effect = ConnectionError("broker down")
+
+    # Act
+    scheduled = scheduler.submit(_job("bulk-0"), user_id="bulk", priority=BATCH)
+
+    # Assert
+    assert scheduled == BATCH
+    assert scheduler.pending() == 1
+    assert scheduler.pending("bulk") == 1
+    scheduler.sent.side_effect = None
+    assert scheduler.dispatch() == 1
+
+
+def test_staged_pipeline_keeps_its_stage_queues():
+    # Arrange
+    from app.tasks import staged_multimodal_pipeline
+
+    scheduler = TaskScheduler(FakeRedis())
+    pipeline = staged_multimodal_pipeline("blob:" + "0" * 64, "pipeline-1")
+
+    # Act
+    with (
+        patch.object(celery_app.amqp, "send_task_message") as send,
+        patch.object(celery_app, "producer_or_acquire"),
+        patch("celery.app.base.Celery.backend", new_callable=PropertyMock),
+    ):
+        scheduler.submit(pipeline, user_id="alice", priority=BATCH)
+
+    # Assert: the first stage went out on its own queue, not on "batch"
+    name, message = send.call_args.args[1:3]
+    assert name == message.headers["task"] == "app.tasks.multimodal_vision_stage_task"
+    assert send.call_args.kwargs["queue"].name == "multimodal.vision"
+
+
+@pytest.mark.parametrize(
+    "task_name, queue",
+    [
+        ("app.tasks.generate_embeddings_and_upsert_task", "batch"),
+        ("app.tasks.purge_expired_blobs_task", "batch"),
+        ("app.tasks.dispatch_batch_tasks_task", "interactive"),
+    ],
+)
+def test_maintenance_tasks_are_routed_to_scheduler_queues(task_name, queue):
+    # Act
+    route = celery_app.amqp.router.route({}, task_name)
+
+    # Assert
+    assert route["queue"].name == queue
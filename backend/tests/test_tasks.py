@@ -1,13 +1,53 @@
 # backend/tests/test_tasks.py
-from unittest.mock import MagicMock, patch
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from app.tasks import long_llm_generation_task
+from app.models.schemas import ChatResponse
+from app.services.blob_store import FileBlobStore
+from app.services.result_cache import ResultCache
+from app.tasks import (
+    generate_embeddings_and_upsert_task,
+    long_llm_generation_task,
+    multimodal_llm_stage_task,
+    multimodal_tts_stage_task,
+    multimodal_vision_stage_task,
+    submit_staged_multimodal_pipeline,
+)
 
 
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    store = FileBlobStore(str(tmp_path), ttl_seconds=60)
+    with patch("app.services.blob_store.get_blob_store", return_value=store):
+        yield store
+
+
+@patch("app.tasks.result_cache")
 @patch("app.tasks.redis_client")
 @patch("app.tasks.LLMService")
-def test_long_llm_generation_task_success(MockLLMService, mock_redis_client):
+def test_long_llm_generation_task_success(
+    MockLLMService, mock_redis_client, mock_result_cache
+):
     # Arrange
     mock_llm_instance = MockLLMService.return_value
 
@@ -48,3 +88,206 @@ def test_long_llm_generation_task_failure(MockLLMService, mock_retry):
 
     assert "Celery retry called" in str(excinfo.value)
     mock_retry.assert_called_once()
+
+
+@patch("app.tasks.redis_client", new_callable=FakeRedis)
+@patch("app.tasks.IncrementalIndexer")
+@patch("app.tasks.DatabaseService")
+@patch("app.tasks.get_retrieval_service")
+def test_generate_embeddings_and_upsert_task_caches_vectors_and_writes_row(
+    mock_get_retrieval_service, MockDatabaseService, MockIncrementalIndexer, fake_redis
+):
+    # Arrange
+    stats = {"chunks": 3, "embedded": 1}
+    retrieval = mock_get_retrieval_service.return_value
+    retrieval.precompute_embeddings = AsyncMock(return_value=stats)
+    retrieval.sync_active_model = AsyncMock(return_value="model-v1")
+    db = MockDatabaseService.return_value
+    db.bulk_insert = AsyncMock(return_value={"rows": 1})
+    MockIncrementalIndexer.return_value.ensure_schema = AsyncMock()
+
+    # Act
+    result = generate_embeddings_and_upsert_task.run("doc1", "Some text.", "user1")
+
+    # Assert
+    assert result == {"status": "SUCCESS", **stats}
+    retrieval.precompute_embeddings.assert_awaited_once_with("doc1", "Some text.")
+    table, rows = db.bulk_insert.await_args.args
+    assert table == "knowledge_base"
+    assert rows == [
+        {
+            "id": "doc1",
+            "content": "Some text.",
+            "metadata": json.dumps({"user_id": "user1"}),
+            "deleted_at": None,
+        }
+    ]
+    assert db.bulk_insert.await_args.kwargs["conflict_columns"] == ["id"]
+
+
+@pytest.mark.parametrize(
+    "task",
+    [
+        multimodal_vision_stage_task,
+        multimodal_llm_stage_task,
+        multimodal_tts_stage_task,
+    ],
+)
+def test_stage_tasks_declare_celery_time_limits(task):
+    # Assert
+    assert 0 < task.soft_time_limit < task.time_limit
+
+
+@patch("app.tasks.redis_client", new_callable=FakeRedis)
+@patch("app.tasks.VisionService")
+def test_hanging_stage_is_cancelled_after_its_soft_time_limit(
+    MockVisionService, fake_redis
+):
+    # Arrange
+    async def hang(image_base64):
+        await asyncio.sleep(10)
+
+    MockVisionService.return_value.get_image_description = hang
+
+    # Act / Assert
+    with patch.object(multimodal_vision_stage_task, "soft_time_limit", 0.05):
+        with pytest.raises(TimeoutError):
+            multimodal_vision_stage_task.run("pipe1", "aW1hZ2U=")
+    assert "multimodal:pipe1:vision" not in fake_redis.data
+
+
+@patch("app.tasks.redis_client", new_callable=FakeRedis)
+@patch("app.tasks.VisionService")
+def test_vision_stage_checkpoints_and_resumes(MockVisionService, fake_redis):
+    # Arrange
+    MockVisionService.return_value.get_image_description = AsyncMock(
+        return_value="A cat on a sofa."
+    )
+
+    # Act
+    first = multimodal_vision_stage_task.run("pipe1", "aW1hZ2U=")
+    # A retry or redelivery of the same stage must not call the model again
+    second = multimodal_vision_stage_task.run("pipe1", "aW1hZ2U=")
+
+    # Assert
+    assert (
+        first
+        == second
+        == {
+            "pipeline_id": "pipe1",
+            "image_description": "A cat on a sofa.",
+        }
+    )
+    MockVisionService.return_value.get_image_description.assert_awaited_once()
+    assert "multimodal:pipe1:vision" in fake_redis.data
+    assert fake_redis.published[0][0] == "task-events:pipe1"
+    assert fake_redis.published[0][1]["stage"] == "vision"
+
+
+@patch("app.tasks.redis_client", new_callable=FakeRedis)
+@patch("app.tasks.LangChainOrchestrator")
+def test_llm_stage_adds_poem_to_state(MockLangChainOrchestrator, fake_redis):
+    # Arrange
+    MockLangChainOrchestrator.return_value.run_text_pipeline = AsyncMock(
+        return_value=ChatResponse(
+            response_text="Soft paws at rest.", recommendations=["More cats"]
+        )
+    )
+    state = {"pipeline_id": "pipe1", "image_description": "A cat on a sofa."}
+
+    # Act
+    result = multimodal_llm_stage_task.run(state)
+
+    # Assert
+    assert result == {
+        **state,
+        "response_text": "Soft paws at rest.",
+        "recommendations": ["More cats"],
+    }
+
+
+@patch("app.tasks.result_cache", new_callable=lambda: ResultCache(FakeRedis()))
+@patch("app.tasks.redis_client", new_callable=FakeRedis)
+@patch("app.tasks.TTSService")
+def test_tts_stage_stores_audio_once_as_a_blob(
+    MockTTSService, fake_redis, result_cache, blob_store
+):
+    # Arrange
+    MockTTSService.return_value.generate_audio = AsyncMock(return_value="YXVkaW8=")
+    state = {
+        "pipeline_id": "pipe1",
+        "image_description": "A cat on a sofa.",
+        "response_text": "Soft paws at rest.",
+        "recommendations": [],
+    }
+
+    # Act
+    multimodal_tts_stage_task.push_request(id="pipe1")
+    try:
+        result = multimodal_tts_stage_task.run(state)
+    finally:
+        multimodal_tts_stage_task.pop_request()
+
+    # Assert
+    assert result["status"] == "SUCCESS"
+    audio_ref = result["result"]["audio_ref"]
+    assert "audio_base64" not in result["result"]
+    assert blob_store.get(audio_ref) == b"audio"
+    assert json.loads(fake_redis.data["multimodal:pipe1:tts"]) == audio_ref
+    assert result_cache.get("pipe1") == result["result"]
+    assert fake_redis.published == [
+        (
+            "task-events:pipe1",
+            {"task_id": "pipe1", "event": "completed", "result": result["result"]},
+        )
+    ]
+
+
+@patch("app.tasks.redis_client", new_callable=FakeRedis)
+def test_stage_failure_is_published_under_pipeline_id(fake_redis):
+    # Act
+    multimodal_llm_stage_task.on_failure(
+        ValueError("no text"), "stage-task-id", ({"pipeline_id": "pipe1"},), {}, None
+    )
+
+    # Assert
+    assert fake_redis.published == [
+        (
+            "task-events:pipe1",
+            {"task_id": "pipe1", "event": "failed", "error": "no text"},
+        )
+    ]
+
+
+@patch("app.tasks.redis_client", new_callable=FakeRedis)
+def test_failure_releases_submission_marker(fake_redis):
+    # Arrange
+    fake_redis.set("submission:pipe1", "1")
+
+    # Act
+    multimodal_llm_stage_task.on_failure(
+        ValueError("no text"), "stage-task-id", ({"pipeline_id": "pipe1"},), {}, None
+    )
+
+    # Assert: the same job can be submitted again
+    assert "submission:pipe1" not in fake_redis.data
+
+
+@patch("app.tasks.chain")
+def test_submit_staged_pipeline_uses_pipeline_id_for_last_stage(mock_chain, blob_store):
+    # Act
+    pipeline_id = submit_staged_multimodal_pipeline("aW1hZ2U=")
+
+    # Assert
+    signatures = mock_chain.call_args.args
+    assert [signature.task for signature in signatures] == [
+        "app.tasks.multimodal_vision_stage_task",
+        "app.tasks.multimodal_llm_stage_task",
+        "app.tasks.multimodal_tts_stage_task",
+    ]
+    # The image travels as a blob reference, not as base64
+    image_ref = signatures[0].args[1]
+    assert signatures[0].args[0] == pipeline_id
+    assert blob_store.get(image_ref) == b"image"
+    mock_chain.return_value.set.assert_called_once_with(task_id=pipeline_id)
+    mock_chain.return_value.set.return_value.apply_async.assert_called_once_with()
@@ -0,0 +1,116 @@
+# backend/tests/test_vector_db_service.py
+import numpy as np
+import pytest
+from app.services.vector_db_service import InMemoryVectorIndex, PineconeService
+
+
+def _seed(index: InMemoryVectorIndex, count: int = 40):
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        index.upsert(
+            f"doc{i}",
+            rng.normal(size=8).tolist(),
+            {"tenant": f"t{i % 4}", "category": "faq" if i % 2 else "manual"},
+        )
+
+
+def _brute_force(index: InMemoryVectorIndex, vector, predicate, top_k):
+    query = np.asarray(vector) / np.linalg.norm(vector)
+    scored = []
+    for doc_id in list(index._positions):
+        row = index._positions[doc_id]
+        if predicate(index.get_metadata(doc_id)):
+            scored.append((float(index._vectors[row] @ query), doc_id))
+    return [doc_id for _, doc_id in sorted(scored, reverse=True)[:top_k]]
+
+
+@pytest.mark.parametrize("selectivity", [0.0, 1.0])
+def test_filtered_query_matches_brute_force_in_both_modes(selectivity):
+    # Arrange
+    # 0.0 forces post-filtering, 1.0 forces pre-filtering.
+    index = InMemoryVectorIndex(prefilter_max_selectivity=selectivity)
+    _seed(index)
+    vector = [0.3, -0.1, 0.5, 0.2, 0.0, 0.4, -0.6, 0.1]
+
+    # Act
+    results = index.query(vector, top_k=3, filter={"tenant": "t1", "category": "faq"})
+
+    # Assert
+    expected = _brute_force(
+        index,
+        vector,
+        lambda m: m["tenant"] == "t1" and m["category"] == "faq",
+        top_k=3,
+    )
+    assert [result["id"] for result in results] == expected
+
+
+def test_in_filter_and_missing_values():
+    # Arrange
+    index = InMemoryVectorIndex()
+    _seed(index, count=8)
+
+    # Act
+    results = index.query([1.0] * 8, top_k=10, filter={"tenant": {"$in": ["t0", "t3"]}})
+    missing = index.query([1.0] * 8, top_k=10, filter={"tenant": "nobody"})
+
+    # Assert
+    assert {r["metadata"]["tenant"] for r in results} == {"t0", "t3"}
+    assert len(results) == 4
+    assert missing == []
+
+
+def test_upsert_and_delete_keep_bitmaps_in_sync():
+    # Arrange
+    index = InMemoryVectorIndex(initial_capacity=2)
+    _seed(index, count=5)
+
+    # Act
+    index.upsert("doc1", [1.0] * 8, {"tenant": "t9"})
+    index.delete("doc0")
+
+    # Assert
+    assert [r["id"] for r in index.query([1.0] * 8, 10, {"tenant": "t9"})] == ["doc1"]
+    assert [r["id"] for r in index.query([1.0] * 8, 10, {"tenant": "t1"})] == []
+    assert [r["id"] for r in index.query([1.0] * 8, 10, {"tenant": "t0"})] == ["doc4"]
+
+
+def test_high_cardinality_field_falls_back_to_row_matching():
+    # Arrange
+    index = InMemoryVectorIndex(max_field_cardinality=3)
+    _seed(index, count=6)
+    for i in range(6):
+        index.upsert(f"doc{i}", [float(i + 1)] + [0.0] * 7, {"sku": f"SKU-{i}"})
+
+    # Act
+    results = index.query([1.0] + [0.0] * 7, 5, {"sku": "SKU-4"})
+
+    # Assert
+    assert "sku" in index._unindexed_fields
+    assert [r["id"] for r in results] == ["doc4"]
+
+
+def test_unsupported_operator_raises():
+    # Arrange
+    index = InMemoryVectorIndex()
+    _seed(index, count=2)
+
+    # Act & Assert
+    with pytest.raises(ValueError):
+        index.query([1.0] * 8, 1, {"tenant": {"$gt": 1}})
+
+
+@pytest.mark.asyncio
+async def test_service_stores_metadata_and_filters():
+    # Arrange
+    service = PineconeService(index=InMemoryVectorIndex())
+    await service.upsert_vector("a", [1.0, 0.0], {"tenant": "acme"})
+    await service.upsert_vector("b", [1.0, 0.1], {"tenant": "globex"})
+
+    # Act
+    results = await service.query_vectors(
+        [1.0, 0.0], top_k=5, filter={"tenant": "globex"}
+    )
+
+    # Assert
+    assert [(r["id"], r["metadata"]) for r in results] == [("b", {"tenant": "globex"})]